@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import Optional, Dict
 import os
 
 class GlobalConfig(BaseSettings):
@@ -21,6 +21,20 @@ class GlobalConfig(BaseSettings):
     # ===== CONFIGURACIÓN DE LOGGING =====
     log_level: str = Field("INFO", env="LOG_LEVEL")
     
+    # ===== TRAZAS =====
+    # Spans por etapa de cada comparación, exportados en memoria (ver app/tracing.py)
+    tracing_enabled: bool = Field(True, env="TRACING_ENABLED")
+    trace_buffer_size: int = 100  # Trazas guardadas por worker
+    
+    # ===== LIMITADOR DE TASA (ver LLMConfig.rate_limits) =====
+    rate_limit_enabled: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    # JSON con los límites de la cuenta, p. ej. {"anthropic": {"rpm": 1000, "tpm": 80000}}
+    llm_rate_limits: Dict[str, Dict[str, int]] = Field(default_factory=dict, env="LLM_RATE_LIMITS")
+    
+    # ===== PROVEEDOR SIMULADO =====
+    # Todas las llamadas LLM van al proveedor simulado (sin API keys ni coste real)
+    fake_llm: bool = Field(False, env="FAKE_LLM")
+    
     # ===== API KEYS GLOBALES =====
     # Estas son las únicas configuraciones que necesitan estar aquí
     # porque las usan múltiples módulos
@@ -56,6 +70,8 @@ def get_available_providers() -> list[str]:
         providers.append("anthropic")
     if settings.google_api_key:
         providers.append("google")
+    if settings.fake_llm:
+        providers.append("fake")
     return providers
 
 def is_provider_available(provider: str) -> bool:
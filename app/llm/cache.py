@@ -0,0 +1,146 @@
+from typing import Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import time
+from app.llm.config import llm_config
+from app.llm.models import LLMRequestConfig, LLMResponse
+
+class ResponseCache:
+    """
+    Cache LRU en memoria para respuestas de LLMService.generate.
+    - Clave: modelo + hash del prompt + LLMRequestConfig normalizada.
+    - Presupuesto de memoria en bytes con expulsión LRU y TTL por entrada.
+    - Solo cachea llamadas (casi) determinísticas, según la temperatura.
+    - Las llamadas idénticas concurrentes comparten una única generación.
+    """
+
+    # Campos que no afectan al texto generado
+    NON_SEMANTIC_FIELDS = {"stream", "bypass_cache", "hedge"}
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.current_bytes = 0
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def is_cacheable(self, request_config: LLMRequestConfig) -> bool:
+        """Decide si una llamada puede servirse desde cache"""
+        return (
+            self.config.response_cache_enabled
+            and not request_config.bypass_cache
+            and not request_config.stream
+            and request_config.temperature <= self.config.response_cache_max_temperature
+        )
+
+    def make_key(self, model: str, prompt: str, request_config: LLMRequestConfig) -> str:
+        """Construye la clave de cache"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        normalized = request_config.model_dump(exclude=self.NON_SEMANTIC_FIELDS)
+        config_json = json.dumps(normalized, sort_keys=True)
+        return f"{model}:{prompt_hash}:{config_json}"
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Retorna la respuesta cacheada (marcada cached) o None (actualiza el orden LRU)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - entry["created_at"] > self.config.response_cache_ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["value"].model_copy(update={"cached": True})
+
+    def set(self, key: str, value: LLMResponse):
+        """Guarda una respuesta respetando el presupuesto de memoria"""
+        size = len(key) + len(value.text.encode("utf-8"))
+        if size > self.config.response_cache_max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = {"value": value, "size": size, "created_at": time.monotonic()}
+        self.current_bytes += size
+
+        while self.current_bytes > self.config.response_cache_max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry["size"]
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """
+        Retorna la respuesta cacheada o la genera una sola vez.
+        Si ya hay una generación en curso para la misma clave, se espera a ella
+        (esa copia se marca cached: solo quien la generó paga los tokens).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_and_store(key, compute))
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._finish_pending(key, t))
+            # shield: si un llamador se cancela, la generación sigue para los demás
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        response = await asyncio.shield(task)
+        return response.model_copy(update={"cached": True})
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def _finish_pending(self, key: str, task: asyncio.Task):
+        self._pending.pop(key, None)
+        # Marcar la excepción como recuperada aunque ya nadie espere la tarea
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        """Vacía la cache"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de la cache"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.config.response_cache_enabled,
+            "entries": len(self._entries),
+            "current_bytes": self.current_bytes,
+            "max_bytes": self.config.response_cache_max_bytes,
+            "ttl": self.config.response_cache_ttl,
+            "max_temperature": self.config.response_cache_max_temperature,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+# Instancia global
+response_cache = ResponseCache()
@@ -0,0 +1,134 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+import asyncio
+import time
+from app.llm.config import llm_config
+
+class FallbackModels(list):
+    """
+    Lista de modelos conocidos que el loader usa cuando falla el listado de un
+    proveedor. El catálogo la guarda con model_catalog_fallback_ttl (corto):
+    no son datos reales y hay que reintentar el descubrimiento pronto.
+    """
+
+class ModelCatalog:
+    """
+    Catálogo de modelos en memoria con TTL.
+    - Dentro del TTL se sirve directamente desde memoria.
+    - Con datos caducados (pero dentro de stale_ttl) se sirven los datos
+      viejos y se lanza un refresco en segundo plano (stale-while-revalidate).
+    - Los refrescos concurrentes comparten una única tarea (single-flight).
+    - Si algún proveedor devolvió FallbackModels, los datos caducan con
+      model_catalog_fallback_ttl y la siguiente lectura espera al reintento.
+    """
+
+    def __init__(self,
+                 loader: Callable[[List[str]], Awaitable[Dict[str, List[str]]]],
+                 config=None):
+        self.config = config or llm_config
+        self._loader = loader
+        self._models_by_provider: Dict[str, List[str]] = {}
+        self._models: List[str] = []
+        self._providers_key: Optional[Tuple[str, ...]] = None
+        self._loaded_at: Optional[float] = None
+        self._fallback_providers: List[str] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Estadísticas
+        self.hits = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.fallback_refreshes = 0
+
+    def _age(self) -> Optional[float]:
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    async def _ensure_fresh(self):
+        """Decide si servir de memoria, refrescar en segundo plano o esperar"""
+        providers_key = tuple(self.config.get_available_providers())
+        age = self._age()
+
+        # Sin datos (o cambiaron los proveedores configurados): hay que esperar
+        if age is None or providers_key != self._providers_key or age > self.config.model_catalog_stale_ttl:
+            await self.refresh(wait=True)
+            return
+
+        # Listado de respaldo: no se sirve más allá del TTL corto (puede tener modelos retirados)
+        if self._fallback_providers:
+            if age <= self.config.model_catalog_fallback_ttl:
+                self.hits += 1
+            else:
+                await self.refresh(wait=True)
+            return
+
+        if age <= self.config.model_catalog_ttl:
+            self.hits += 1
+            return
+
+        # Datos caducados pero utilizables: servir y revalidar en segundo plano
+        self.stale_hits += 1
+        await self.refresh(wait=False)
+
+    async def refresh(self, wait: bool = True):
+        """Refresca el catálogo; las llamadas concurrentes comparten la misma tarea"""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.get_running_loop().create_task(self._do_refresh())
+            self._refresh_task = task
+
+        if wait:
+            # shield: si se cancela un llamador, el refresco sigue para los demás
+            await asyncio.shield(task)
+
+    async def _do_refresh(self):
+        providers = self.config.get_available_providers()
+        try:
+            models_by_provider = await self._loader(providers)
+        except Exception as e:
+            self.refresh_errors += 1
+            print(f"Error refrescando catálogo de modelos: {e}")
+            return
+
+        self._models_by_provider = models_by_provider
+        self._models = [model for provider in providers for model in models_by_provider.get(provider, [])]
+        self._fallback_providers = [
+            provider for provider, models in models_by_provider.items() if isinstance(models, FallbackModels)
+        ]
+        self._providers_key = tuple(providers)
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+        if self._fallback_providers:
+            self.fallback_refreshes += 1
+
+    async def get_models(self) -> List[str]:
+        """Retorna todos los modelos disponibles"""
+        await self._ensure_fresh()
+        return list(self._models)
+
+    async def get_provider_models(self, provider: str) -> List[str]:
+        """Retorna los modelos disponibles de un proveedor"""
+        await self._ensure_fresh()
+        return list(self._models_by_provider.get(provider, []))
+
+    def invalidate(self):
+        """Fuerza que la próxima lectura recargue el catálogo"""
+        self._loaded_at = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del catálogo"""
+        return {
+            "models": len(self._models),
+            "age_seconds": self._age(),
+            "ttl": self.config.model_catalog_ttl,
+            "stale_ttl": self.config.model_catalog_stale_ttl,
+            "fallback_ttl": self.config.model_catalog_fallback_ttl,
+            "fallback_providers": list(self._fallback_providers),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "fallback_refreshes": self.fallback_refreshes,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done()
+        }
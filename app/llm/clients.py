@@ -0,0 +1,150 @@
+from typing import Dict, Any, Tuple, Optional
+from app.llm.config import llm_config
+from app.llm.executor import blocking_executor
+
+class ProviderClientRegistry:
+    """
+    Registro de clientes de proveedores LLM de larga duración.
+    Mantiene un cliente con pool HTTP (HTTP/2 si está disponible) por
+    proveedor y API key, para reutilizar conexiones TLS entre llamadas.
+    Su ciclo de vida lo gestiona el lifespan de la aplicación (main.py).
+    Los reintentos internos de los SDKs se desactivan: los gestiona RetryPolicy.
+    """
+
+    def __init__(self, config=None, executor=None):
+        self.config = config or llm_config
+        self.executor = executor or blocking_executor
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._http_clients: Dict[Tuple[str, str], Any] = {}
+        self._google_api_key: Optional[str] = None
+        self._google_module = None
+        self._created = 0
+        self._reused = 0
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 en httpx requiere el paquete opcional h2"""
+        if not self.config.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _build_http_client(self, sdk):
+        """
+        Construye el cliente HTTP con los límites de pool configurados.
+        Se usan las clases del propio SDK para que el cliente sea compatible
+        con la librería HTTP que embebe cada versión (httpx o httpx2).
+        """
+        limits_cls = type(sdk.DEFAULT_CONNECTION_LIMITS)
+        limits = limits_cls(
+            max_connections=self.config.pool_max_connections,
+            max_keepalive_connections=self.config.pool_max_keepalive_connections,
+            keepalive_expiry=self.config.pool_keepalive_expiry
+        )
+        return sdk.DefaultAsyncHttpxClient(
+            http2=self._http2_available(),
+            limits=limits,
+            timeout=self.config.request_timeout
+        )
+
+    def _get_or_create(self, provider: str, api_key: str, sdk, factory):
+        key = (provider, api_key)
+        client = self._clients.get(key)
+        if client is not None:
+            self._reused += 1
+            return client
+
+        http_client = self._build_http_client(sdk)
+        client = factory(http_client)
+        self._http_clients[key] = http_client
+        self._clients[key] = client
+        self._created += 1
+        return client
+
+    def get_openai_client(self, api_key: str):
+        """Retorna el cliente AsyncOpenAI compartido para esta API key"""
+        import openai
+
+        def factory(http_client):
+            return openai.AsyncClient(api_key=api_key, http_client=http_client, max_retries=0)
+        return self._get_or_create("openai", api_key, openai, factory)
+
+    def get_anthropic_client(self, api_key: str):
+        """Retorna el cliente AsyncAnthropic compartido para esta API key"""
+        import anthropic
+
+        def factory(http_client):
+            return anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, max_retries=0)
+        return self._get_or_create("anthropic", api_key, anthropic, factory)
+
+    def get_google_module(self, api_key: str):
+        """
+        Retorna el módulo google.generativeai configurado.
+        genai usa gRPC con estado global: solo se reconfigura si cambia la key.
+        """
+        import google.generativeai as genai
+        if self._google_api_key != api_key:
+            genai.configure(api_key=api_key)
+            self._google_api_key = api_key
+            self._created += 1
+        else:
+            self._reused += 1
+        self._google_module = genai
+        return genai
+
+    async def get_google_module_async(self, api_key: str):
+        """
+        Como get_google_module, para usar desde el event loop: el import del
+        SDK y genai.configure (que construye el cliente gRPC) son bloqueantes
+        y se ejecutan en el pool de hilos la primera vez o si cambia la key.
+        """
+        if self._google_module is not None and self._google_api_key == api_key:
+            self._reused += 1
+            return self._google_module
+        # Dos primeras llamadas concurrentes configuran la misma key: es idempotente
+        return await self.executor.run(self.get_google_module, api_key)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Estadísticas de los pools HTTP para dimensionarlos"""
+        pools = []
+        for (provider, api_key), http_client in self._http_clients.items():
+            pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            pools.append({
+                "provider": provider,
+                "api_key_suffix": api_key[-4:] if api_key else None,
+                "http2": self._http2_available(),
+                "connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle()),
+                "active_connections": sum(1 for c in connections if not c.is_idle() and not c.is_closed()),
+                "pending_requests": len(getattr(pool, "_requests", [])),
+                "closed": http_client.is_closed
+            })
+
+        return {
+            "limits": {
+                "max_connections": self.config.pool_max_connections,
+                "max_keepalive_connections": self.config.pool_max_keepalive_connections,
+                "keepalive_expiry": self.config.pool_keepalive_expiry
+            },
+            "clients_created": self._created,
+            "clients_reused": self._reused,
+            "pools": pools
+        }
+
+    async def aclose(self):
+        """Cierra todos los pools HTTP (se llama al apagar la aplicación)"""
+        for key, http_client in list(self._http_clients.items()):
+            try:
+                await http_client.aclose()
+            except Exception as e:
+                print(f"Error cerrando cliente {key[0]}: {e}")
+        self._http_clients.clear()
+        self._clients.clear()
+        self._google_api_key = None
+        self._google_module = None
+
+# Instancia global
+client_registry = ProviderClientRegistry()
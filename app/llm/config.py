@@ -1,5 +1,7 @@
-from typing import List
-from app.config import get_available_providers
+from typing import List, Dict, Optional
+import os
+import tempfile
+from app.config import get_available_providers, settings
 
 class LLMConfig:
     """
@@ -9,11 +11,129 @@ class LLMConfig:
     
     def __init__(self):
         # ===== CONFIGURACIÓN TÉCNICA INTERNA =====
-        self.max_concurrent_requests = 5
+        self.max_concurrent_requests = 20  # Llamadas simultáneas a proveedores (global)
+        self.max_concurrent_per_provider = {
+            "openai": 10,
+            "anthropic": 10,
+            "google": 10
+        }
+        self.default_max_concurrent_per_provider = 10
         self.request_timeout = 60
         self.retry_on_rate_limit = True
         self.retry_on_timeout = True
         self.exponential_backoff = True
+        self.max_retry_delay = 30.0  # Tope de espera entre reintentos (segundos)
+        
+        # ===== POOL DE CONEXIONES HTTP =====
+        self.http2 = True  # Se usa solo si el paquete h2 está instalado
+        self.pool_max_connections = 100
+        self.pool_max_keepalive_connections = 20
+        self.pool_keepalive_expiry = 30.0  # segundos
+        
+        # ===== CATÁLOGO DE MODELOS =====
+        self.model_catalog_ttl = 300  # segundos sirviendo desde memoria
+        self.model_catalog_stale_ttl = 3600  # hasta aquí se sirve viejo y se refresca en segundo plano
+        self.model_catalog_fallback_ttl = 30  # listados de respaldo (falló list_models): se reintenta pronto
+        
+        # Alias para modelos de Google retirados (se aplican si no están en el catálogo)
+        self.google_model_aliases = {
+            "gemini-pro": "gemini-1.5-flash",
+            "gemini-pro-vision": "gemini-1.5-flash"
+        }
+        
+        # ===== LIMITADOR DE TASA (rpm = requests/min, tpm = tokens/min) =====
+        # Valores por defecto conservadores (cuotas del nivel más bajo de cada
+        # proveedor). Ajustarlos a la cuenta con LLM_RATE_LIMITS (JSON, se
+        # combina por proveedor) o desactivar con RATE_LIMIT_ENABLED=false.
+        self.rate_limit_enabled = settings.rate_limit_enabled
+        self.rate_limits = {
+            "openai": {"rpm": 500, "tpm": 200000},
+            "anthropic": {"rpm": 50, "tpm": 40000},
+            "google": {"rpm": 60, "tpm": 1000000}
+        }
+        for provider, limits in settings.llm_rate_limits.items():
+            self.rate_limits[provider] = {**self.rate_limits.get(provider, {}), **limits}
+        self.model_rate_limits = {}  # Por modelo, p. ej. {"gpt-4": {"rpm": 100, "tpm": 40000}}
+        # Estado compartido entre workers de la misma máquina
+        self.rate_limit_db_path = os.path.join(tempfile.gettempdir(), "llm_rate_limits.sqlite3")
+        
+        # ===== CACHE DE RESPUESTAS (opt-in) =====
+        self.response_cache_enabled = False
+        self.response_cache_max_bytes = 32 * 1024 * 1024  # 32 MB
+        self.response_cache_ttl = 3600  # segundos
+        self.response_cache_max_temperature = 0.2  # Solo llamadas (casi) determinísticas
+        
+        # ===== HEDGING (latencia de cola, opt-in) =====
+        self.hedging_enabled = False
+        self.hedge_percentile = 90  # Lanzar duplicado si la llamada supera este percentil del modelo
+        self.hedge_window_size = 200  # Latencias recientes por modelo
+        self.hedge_min_samples = 20  # Sin suficientes muestras no se hace hedging
+        self.hedge_budget_ratio = 0.1  # Máximo de duplicados: 10% de las llamadas elegibles
+        self.hedge_budget_burst = 2  # Duplicados permitidos antes de acumular presupuesto
+        
+        # ===== PRECIOS (USD por 1K tokens, prefijo de modelo más largo) =====
+        self.model_prices = {
+            "gpt-4o-mini": {"input": 0.00015, "output": 0.0006},
+            "gpt-4o": {"input": 0.0025, "output": 0.01},
+            "gpt-4-turbo": {"input": 0.01, "output": 0.03},
+            "gpt-4": {"input": 0.03, "output": 0.06},
+            "gpt-3.5-turbo": {"input": 0.0005, "output": 0.0015},
+            "claude-3-5-sonnet": {"input": 0.003, "output": 0.015},
+            "claude-3-5-haiku": {"input": 0.0008, "output": 0.004},
+            "claude-3-opus": {"input": 0.015, "output": 0.075},
+            "claude-3-sonnet": {"input": 0.003, "output": 0.015},
+            "claude-3-haiku": {"input": 0.00025, "output": 0.00125},
+            "gemini-1.5-pro": {"input": 0.00125, "output": 0.005},
+            "gemini-1.5-flash": {"input": 0.000075, "output": 0.0003},
+            "gemini-pro": {"input": 0.0005, "output": 0.0015}
+        }
+        
+        # ===== PROVEEDOR SIMULADO (modelos fake-<perfil>, o todos con FAKE_LLM=true) =====
+        # Latencia: lognormal (mediana y sigma, segundos) + tokens de salida / tokens_per_second.
+        # Tasas de error por llamada: 429, 503 y timeouts (tras timeout_seconds).
+        # malformed_rate: respuestas del evaluador truncadas (fuerza re-preguntas).
+        # Los perfiles parciales heredan de "default".
+        self.fake_seed = 0  # Misma semilla + misma secuencia de llamadas = mismas respuestas
+        self.fake_profiles = {
+            "default": {
+                "latency_median": 0.8,
+                "latency_sigma": 0.4,
+                "tokens_per_second": 60.0,
+                "rate_limit_rate": 0.0,
+                "overload_rate": 0.0,
+                "timeout_rate": 0.0,
+                "timeout_seconds": 30.0,
+                "retry_after": 1.0,
+                "malformed_rate": 0.0,
+                "quality": 4,  # Puntuación base (1-5) que da como evaluador
+                "length_ratio": 1.0  # Palabras del resumen / max_words pedido
+            },
+            "instant": {"latency_median": 0.0, "tokens_per_second": 0.0},  # Sin esperas (0 = sin límite)
+            "fast": {"latency_median": 0.2, "latency_sigma": 0.3, "tokens_per_second": 150.0},
+            "slow": {"latency_median": 2.5, "latency_sigma": 0.6, "tokens_per_second": 25.0},
+            "flaky": {
+                "rate_limit_rate": 0.1,
+                "overload_rate": 0.05,
+                "timeout_rate": 0.02,
+                "timeout_seconds": 5.0,
+                "malformed_rate": 0.1
+            },
+            "verbose": {"length_ratio": 1.6}  # Se pasa del límite de palabras
+        }
+        
+        # ===== WARM-UP AL ARRANCAR (lifespan; /ready es false hasta que termina) =====
+        self.warmup_enabled = True
+        self.warmup_timeout = 30.0  # segundos por paso (imports, clientes, catálogo, sondas)
+        self.warmup_probe_enabled = False  # Una llamada mínima por proveedor (calienta TLS y pools; cuesta tokens)
+        self.warmup_probe_models = {
+            "openai": "gpt-4o-mini",
+            "anthropic": "claude-3-haiku-20240307",
+            "google": "gemini-1.5-flash",
+            "fake": "fake-instant"
+        }
+        
+        # ===== TRABAJO SÍNCRONO DE LOS SDKs =====
+        self.sync_executor_workers = 4  # Hilos para llamadas bloqueantes fuera del event loop
         
         # ===== CONFIGURACIÓN POR DEFECTO INTERNA =====
         self.default_temperature = 0.7
@@ -27,6 +147,28 @@ class LLMConfig:
     def get_available_providers(self) -> List[str]:
         """Retorna proveedores disponibles usando configuración global"""
         return get_available_providers()
+    
+    def get_model_price(self, model: str) -> Optional[Dict[str, float]]:
+        """Precio del modelo por el prefijo más largo de model_prices (None si no hay)"""
+        matches = [prefix for prefix in self.model_prices if model.startswith(prefix)]
+        if not matches:
+            return None
+        return self.model_prices[max(matches, key=len)]
+    
+    def get_fake_profile(self, model: str) -> Dict[str, float]:
+        """Perfil del proveedor simulado: fake-<perfil>[-sufijo] o "default" """
+        default = self.fake_profiles["default"]
+        matches = [name for name in self.fake_profiles if model == f"fake-{name}" or model.startswith(f"fake-{name}-")]
+        if not matches:
+            return dict(default)
+        return {**default, **self.fake_profiles[max(matches, key=len)]}
+    
+    def calculate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Coste en USD de una llamada"""
+        price = self.get_model_price(model)
+        if price is None:
+            return 0.0
+        return (prompt_tokens * price["input"] + completion_tokens * price["output"]) / 1000
 
 # Instancia global
 llm_config = LLMConfig()
\ No newline at end of file
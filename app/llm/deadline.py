@@ -0,0 +1,45 @@
+from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+# Deadline absoluto (time.monotonic()) de la operación en curso.
+# Se propaga automáticamente a las tareas creadas con gather/create_task.
+_current_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Establece un deadline para todo el trabajo LLM dentro del bloque.
+    Si ya hay uno más estricto en el contexto, se conserva el más estricto.
+    """
+    if seconds is None:
+        yield get_deadline()
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _current_deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+def get_deadline() -> Optional[float]:
+    """Deadline absoluto vigente o None"""
+    return _current_deadline.get()
+
+def time_remaining() -> Optional[float]:
+    """Segundos restantes hasta el deadline vigente (None si no hay)"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def deadline_expired() -> bool:
+    """True si hay un deadline vigente y ya pasó"""
+    remaining = time_remaining()
+    return remaining is not None and remaining <= 0
@@ -0,0 +1,44 @@
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+from app.llm.config import llm_config
+
+class BlockingExecutor:
+    """
+    Ejecutor acotado para trabajo síncrono de los SDKs (p. ej. genai.list_models).
+    Saca las llamadas bloqueantes del event loop a un pool de hilos limitado,
+    para que el resto de requests del worker no se queden esperando.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.sync_executor_workers,
+                thread_name_prefix="llm-sync"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ejecuta func(*args, **kwargs) en el pool y espera su resultado"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs):
+        """Ejecuta func en el pool sin esperar el resultado (trabajo en segundo plano)"""
+        return self._get_executor().submit(func, *args, **kwargs)
+
+    def shutdown(self):
+        """Libera los hilos del pool (se llama al apagar la aplicación)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+# Instancia global
+blocking_executor = BlockingExecutor()
@@ -0,0 +1,207 @@
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from app.llm.config import llm_config
+from app.llm.models import LLMRequestConfig
+
+# Respuestas del prompt de resumen de SummarizationConfig.summary_prompt_template
+_MAX_WORDS_PATTERN = re.compile(r'en exactamente (\d+) palabras')
+# Resúmenes del prompt del evaluador (solo la sección de resúmenes, no el formato)
+_EVALUATION_SECTION_PATTERN = re.compile(r'## RESÚMENES A EVALUAR:\n(.*?)\n## INSTRUCCIONES', re.DOTALL)
+_SUMMARY_HEADER_PATTERN = re.compile(r'^RESUMEN (\d+):', re.MULTILINE)
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+class FakeProviderError(Exception):
+    """Error HTTP simulado: classify_error lo trata como el de un SDK real"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = _FakeHTTPResponse({"retry-after": str(retry_after)} if retry_after else {})
+
+class FakeTimeoutError(Exception):
+    """Timeout simulado (el nombre contiene "Timeout", como los de los SDKs)"""
+
+class _FakeHTTPResponse:
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+class FakeProvider:
+    """
+    Proveedor LLM simulado para pruebas de carga y regresión sin red ni coste.
+    - Resúmenes determinísticos extraídos del texto del prompt.
+    - Respuestas del evaluador en su formato (JSON o texto).
+    - Latencia lognormal + tiempo de generación por tokens/segundo.
+    - 429, 503 y timeouts con las tasas del perfil (LLMConfig.fake_profiles).
+    Cada llamada usa RNGs sembrados con (fake_seed, modelo, prompt, nº de
+    llamada): la misma secuencia de llamadas da las mismas respuestas, y
+    las muestras repetidas con temperatura > 0 difieren entre sí. Con
+    temperatura 0 solo el texto se repite; errores y latencia no.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self._sequence = 0
+
+        # Métricas
+        self.calls = 0
+        self.errors_by_status: Dict[str, int] = {}
+
+    def list_models(self) -> List[str]:
+        return [f"fake-{name}" for name in self.config.fake_profiles]
+
+    def _rngs(self, model: str, prompt: str, temperature: float) -> Tuple[random.Random, random.Random]:
+        """
+        RNG de la respuesta y RNG de la llamada (errores y latencia).
+        Con temperatura 0 el modelo es determinístico: mismo prompt, misma
+        respuesta. Los errores y la latencia son siempre de cada llamada, así
+        un 429 o un timeout es transitorio y un reintento puede salir bien.
+        """
+        self._sequence += 1
+        response_index = self._sequence if temperature > 0 else 0
+        return (
+            self._seeded(model, prompt, f"response:{response_index}"),
+            self._seeded(model, prompt, f"call:{self._sequence}")
+        )
+
+    def _seeded(self, model: str, prompt: str, stream: str) -> random.Random:
+        seed = f"{self.config.fake_seed}\0{model}\0{prompt}\0{stream}".encode("utf-8")
+        return random.Random(int.from_bytes(hashlib.blake2b(seed, digest_size=8).digest(), "big"))
+
+    async def complete(self, model: str, prompt: str, config: LLMRequestConfig) -> Tuple[str, int, int]:
+        """Texto, tokens de prompt y tokens de salida de una llamada simulada"""
+        profile = self.config.get_fake_profile(model)
+        rng, call_rng = self._rngs(model, prompt, config.temperature)
+        self.calls += 1
+
+        await self._maybe_fail(model, profile, call_rng)
+
+        text = self._respond(prompt, config, profile, rng)
+        completion_tokens = max(1, len(text) // 4)
+        await asyncio.sleep(self._latency(profile, call_rng, completion_tokens))
+        return text, max(1, len(prompt) // 4), completion_tokens
+
+    async def stream(self, model: str, prompt: str, config: LLMRequestConfig) -> AsyncIterator[str]:
+        """Misma respuesta que complete, palabra a palabra al ritmo del perfil"""
+        profile = self.config.get_fake_profile(model)
+        rng, call_rng = self._rngs(model, prompt, config.temperature)
+        self.calls += 1
+
+        await self._maybe_fail(model, profile, call_rng)
+
+        text = self._respond(prompt, config, profile, rng)
+        await asyncio.sleep(self._latency(profile, call_rng, 0))
+        words = text.split(" ")
+        tokens_per_second = profile["tokens_per_second"]
+        for i, word in enumerate(words):
+            if tokens_per_second > 0:
+                await asyncio.sleep(max(1, len(word) // 4) / tokens_per_second)
+            yield word if i == 0 else " " + word
+
+    async def _maybe_fail(self, model: str, profile: Dict[str, float], rng: random.Random):
+        """Errores simulados según las tasas del perfil"""
+        roll = rng.random()
+        if roll < profile["rate_limit_rate"]:
+            self._record_error("429")
+            raise FakeProviderError(f"Rate limit simulado para {model}", 429, profile["retry_after"])
+        roll -= profile["rate_limit_rate"]
+        if roll < profile["overload_rate"]:
+            self._record_error("503")
+            raise FakeProviderError(f"Sobrecarga simulada para {model}", 503)
+        roll -= profile["overload_rate"]
+        if roll < profile["timeout_rate"]:
+            self._record_error("timeout")
+            await asyncio.sleep(profile["timeout_seconds"])
+            raise FakeTimeoutError(f"Timeout simulado para {model} tras {profile['timeout_seconds']}s")
+
+    def _record_error(self, status: str):
+        self.errors_by_status[status] = self.errors_by_status.get(status, 0) + 1
+
+    @staticmethod
+    def _latency(profile: Dict[str, float], rng: random.Random, completion_tokens: int) -> float:
+        """Tiempo hasta la respuesta: lognormal + generación de los tokens de salida"""
+        latency = 0.0
+        if profile["latency_median"] > 0:
+            latency = rng.lognormvariate(math.log(profile["latency_median"]), profile["latency_sigma"])
+        if profile["tokens_per_second"] > 0:
+            latency += completion_tokens / profile["tokens_per_second"]
+        return latency
+
+    def _respond(self, prompt: str, config: LLMRequestConfig, profile: Dict[str, float], rng: random.Random) -> str:
+        evaluation_section = _EVALUATION_SECTION_PATTERN.search(prompt)
+        if evaluation_section:
+            text = self._evaluation(evaluation_section.group(1), config, profile, rng)
+        else:
+            max_words = _MAX_WORDS_PATTERN.search(prompt)
+            source = prompt.split("\n\n", 1)[1] if max_words and "\n\n" in prompt else prompt
+            target = int(max_words.group(1)) if max_words else 50
+            text = self._summary(source, target, profile, rng)
+        # max_tokens corta la respuesta como en un proveedor real (~4 caracteres/token)
+        return text[:config.max_tokens * 4]
+
+    @staticmethod
+    def _summary(source: str, max_words: int, profile: Dict[str, float], rng: random.Random) -> str:
+        """Resumen extractivo: frases del texto desde un punto aleatorio, omitiendo alguna palabra"""
+        sentences = [sentence for sentence in _SENTENCE_PATTERN.split(source.strip()) if sentence]
+        if not sentences:
+            return ""
+        target = max(1, round(max_words * profile["length_ratio"] * rng.uniform(0.85, 1.05)))
+        start = rng.randrange(len(sentences))
+        words: List[str] = []
+        for offset in range(len(sentences)):
+            for word in sentences[(start + offset) % len(sentences)].split():
+                if rng.random() < 0.15:
+                    continue
+                words.append(word)
+                if len(words) >= target:
+                    break
+            if len(words) >= target:
+                break
+        summary = " ".join(words).rstrip(".,;:")
+        return summary + "." if summary else summary
+
+    @staticmethod
+    def _evaluation(section: str, config: LLMRequestConfig, profile: Dict[str, float], rng: random.Random) -> str:
+        """Respuesta del evaluador en el formato pedido (JSON o bloques de texto)"""
+        count = len(_SUMMARY_HEADER_PATTERN.findall(section))
+        # Respuesta truncada: falta la última evaluación (fuerza una re-pregunta)
+        if count > 1 and rng.random() < profile["malformed_rate"]:
+            count -= 1
+
+        def score() -> int:
+            return int(min(5, max(1, profile["quality"] + rng.choice((-1, 0, 0, 1)))))
+
+        evaluations = [
+            {
+                "resumen": i + 1,
+                "precision": score(),
+                "completitud": score(),
+                "claridad": score(),
+                "comentario": "Evaluación simulada"
+            }
+            for i in range(count)
+        ]
+        if config.response_format == "json":
+            return json.dumps({"evaluaciones": evaluations}, ensure_ascii=False)
+        return "\n\n".join(
+            f"RESUMEN {e['resumen']}:\n"
+            f"PRECISIÓN: {e['precision']}\n"
+            f"COMPLETITUD: {e['completitud']}\n"
+            f"CLARIDAD: {e['claridad']}\n"
+            f"COMENTARIO: {e['comentario']}"
+            for e in evaluations
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors_by_status": dict(self.errors_by_status),
+            "profiles": list(self.config.fake_profiles)
+        }
+
+# Instancia global
+fake_provider = FakeProvider()
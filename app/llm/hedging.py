@@ -0,0 +1,118 @@
+from typing import Dict, Any, Optional
+from collections import deque
+from app.llm.config import llm_config
+
+class LatencyTracker:
+    """Ventana deslizante de latencias por modelo para calcular percentiles"""
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self._latencies: Dict[str, deque] = {}
+
+    def record(self, model: str, latency: float):
+        window = self._latencies.get(model)
+        if window is None:
+            window = deque(maxlen=self.config.hedge_window_size)
+            self._latencies[model] = window
+        window.append(latency)
+
+    def percentile(self, model: str, percentile: float) -> Optional[float]:
+        """Percentil (0-100) de la ventana o None si aún no hay suficientes muestras"""
+        window = self._latencies.get(model)
+        if not window or len(window) < self.config.hedge_min_samples:
+            return None
+        ordered = sorted(window)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def tail_mean_above(self, model: str, threshold: float) -> Optional[float]:
+        """Latencia media de las llamadas que superaron threshold (None si ninguna)"""
+        tail = [latency for latency in self._latencies.get(model, ()) if latency > threshold]
+        if not tail:
+            return None
+        return sum(tail) / len(tail)
+
+class HedgePolicy:
+    """
+    Política de hedging para reducir la latencia de cola.
+    Cuando una llamada supera el percentil configurado de su modelo, se lanza
+    un duplicado; gana la primera respuesta y la otra se cancela. Un
+    presupuesto limita los duplicados a una fracción de las llamadas.
+    Las latencias son solo de la llamada al proveedor (sin rate limit ni cola
+    local) y no se lanzan duplicados si el proveedor tiene espera local.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self.tracker = LatencyTracker(self.config)
+
+        # Métricas
+        self.eligible_calls = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.budget_exhausted = 0
+        self.skipped_backlogged = 0
+        self.latency_saved_estimate = 0.0
+
+    def is_enabled(self, request_hedge: Optional[bool]) -> bool:
+        """El flag de la request tiene prioridad sobre la configuración global"""
+        if request_hedge is not None:
+            return request_hedge
+        return self.config.hedging_enabled
+
+    def begin_call(self):
+        """Cuenta una llamada elegible para hedging (base del presupuesto)"""
+        self.eligible_calls += 1
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Tiempo de espera antes de lanzar el duplicado (None = sin datos aún)"""
+        return self.tracker.percentile(model, self.config.hedge_percentile)
+
+    def try_acquire_budget(self) -> bool:
+        """Permite un duplicado si no se supera la fracción presupuestada de llamadas"""
+        allowance = self.config.hedge_budget_ratio * self.eligible_calls + self.config.hedge_budget_burst
+        if self.hedges_fired + 1 > allowance:
+            self.budget_exhausted += 1
+            return False
+        self.hedges_fired += 1
+        return True
+
+    def record_backlog_skip(self):
+        """No se lanzó duplicado porque el proveedor tiene llamadas esperando cupo o hueco"""
+        self.skipped_backlogged += 1
+
+    def record_primary_win(self):
+        """Con el duplicado en curso, respondió antes la llamada original"""
+        self.primary_wins += 1
+
+    def record_hedge_win(self, model: str, primary_elapsed: float):
+        """
+        Registra que ganó el duplicado. La llamada original seguía en curso tras
+        primary_elapsed segundos; el ahorro se estima con la latencia media de
+        la cola observada por encima de ese punto.
+        """
+        self.hedge_wins += 1
+        tail_mean = self.tracker.tail_mean_above(model, primary_elapsed)
+        if tail_mean is not None:
+            self.latency_saved_estimate += tail_mean - primary_elapsed
+        # La original tardaba al menos esto: mantener la cola en la ventana
+        self.tracker.record(model, primary_elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.hedging_enabled,
+            "percentile": self.config.hedge_percentile,
+            "budget_ratio": self.config.hedge_budget_ratio,
+            "eligible_calls": self.eligible_calls,
+            "hedges_fired": self.hedges_fired,
+            "hedge_rate": self.hedges_fired / self.eligible_calls if self.eligible_calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "skipped_backlogged": self.skipped_backlogged,
+            "latency_saved_estimate": self.latency_saved_estimate
+        }
+
+# Instancia global
+hedge_policy = HedgePolicy()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class LLMRequestConfig(BaseModel):
     """Configuración de un request LLM desde el frontend"""
@@ -10,6 +10,9 @@ class LLMRequestConfig(BaseModel):
     frequency_penalty: float = Field(0.0, ge=-2.0, le=2.0)
     presence_penalty: float = Field(0.0, ge=-2.0, le=2.0)
     stream: bool = False
+    bypass_cache: bool = False  # Ignorar la cache de respuestas en esta llamada
+    hedge: Optional[bool] = None  # Hedging en esta llamada (None = según LLMConfig)
+    response_format: Optional[str] = Field(None, pattern="^json$")  # "json" = salida JSON estructurada
 
 class LLMConfigResponse(BaseModel):
     """Response de configuración LLM"""
@@ -23,4 +26,24 @@ class LLMResponse(BaseModel):
     text: str
     model: str
     tokens_used: int
-    execution_time: float
\ No newline at end of file
+    execution_time: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False  # True si el proveedor no informó el uso
+    cost: float = 0.0  # USD según LLMConfig.model_prices
+    retries: int = 0
+    cached: bool = False  # Servida desde la cache (o compartida con otra llamada idéntica)
+    
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.execution_time if self.execution_time > 0 else 0.0
+
+class LLMStreamStats(BaseModel):
+    """Métricas de latencia de una respuesta en streaming"""
+    model: str
+    time_to_first_token: Optional[float] = None  # segundos
+    total_time: float = 0.0
+    chunks: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = True  # True si el proveedor no informó el uso
+    tokens_per_second: float = 0.0
@@ -0,0 +1,238 @@
+from typing import Dict, Any, List, Tuple
+import asyncio
+import sqlite3
+import threading
+import time
+from app.llm.config import llm_config
+from app.llm.executor import blocking_executor
+from app.metrics import RATE_LIMIT_WAITING
+
+class RateLimiter:
+    """
+    Limitador de tasa con token buckets por proveedor y por modelo,
+    con presupuesto de requests (rpm) y de tokens estimados (tpm).
+
+    El estado de los buckets vive en SQLite para coordinar a todos los
+    workers de gunicorn de la máquina. Cada llamada *reserva* su cupo en una
+    transacción atómica (aunque el bucket quede en negativo) y espera el
+    tiempo que le corresponde: así se atienden en orden de llegada, sin
+    fallar y sin ráfagas de 429.
+
+    La reserva de tokens usa la salida máxima (max_tokens); cuando el
+    proveedor informa el uso real, settle() devuelve la diferencia al bucket
+    para que el throughput se acerque a la cuota real.
+    """
+
+    SECONDS_PER_MINUTE = 60.0
+
+    def __init__(self, config=None, executor=None):
+        self.config = config or llm_config
+        self.executor = executor or blocking_executor
+        self._local = threading.local()
+        self._initialized_path = None
+        self._init_lock = threading.Lock()
+
+        # Estadísticas de este worker
+        self.acquisitions = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.errors = 0
+        self.settlements = 0
+        self.refunded_tokens = 0.0
+        self.waiting_by_provider: Dict[str, int] = {}
+
+    # ===== ALMACENAMIENTO =====
+
+    def _connect(self) -> sqlite3.Connection:
+        """Una conexión por hilo del ejecutor"""
+        path = self.config.rate_limit_db_path
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "path", None) != path:
+            conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+            self._local.path = path
+
+        with self._init_lock:
+            if self._initialized_path != path:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                    "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+                )
+                self._initialized_path = path
+        return conn
+
+    def _reserve_sync(self, buckets: List[Tuple[str, float, float]]) -> float:
+        """
+        Descuenta `amount` de cada bucket en una sola transacción.
+        Retorna los segundos que hay que esperar hasta que haya cupo.
+        """
+        conn = self._connect()
+        now = time.time()
+        wait = 0.0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, capacity, amount in buckets:
+                rate = capacity / self.SECONDS_PER_MINUTE
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    tokens = capacity
+                else:
+                    tokens = min(capacity, row[0] + (now - row[1]) * rate)
+
+                tokens -= amount
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _refund_sync(self, buckets: List[Tuple[str, float, float]]):
+        """
+        Devuelve una reserva que no se llegó a usar (p. ej. cancelación) o la
+        parte no consumida; una cantidad negativa cobra el exceso.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, capacity, amount in buckets:
+                conn.execute(
+                    "UPDATE rate_buckets SET tokens = MIN(?, tokens + ?) WHERE key = ?",
+                    (capacity, amount, key)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _settle_sync(self, buckets: List[Tuple[str, float, float]]):
+        try:
+            self._refund_sync(buckets)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Error ajustando el limitador de tasa con el uso real: {e}")
+
+    # ===== API =====
+
+    def estimate_tokens(self, prompt: str, max_tokens: int) -> int:
+        """Tokens estimados de una llamada: prompt (~4 caracteres/token) + salida máxima"""
+        return len(prompt) // 4 + max_tokens
+
+    def _get_buckets(self, provider: str, model: str, estimated_tokens: int) -> List[Tuple[str, float, float]]:
+        """Buckets (clave, capacidad por minuto, cantidad) que aplican a la llamada"""
+        if provider == "fake":
+            # El simulador no tiene cuota: no debe gastar la de los proveedores reales
+            # (el almacén es compartido con los demás workers de la máquina)
+            return []
+        buckets = []
+        scopes = [
+            (f"provider:{provider}", self.config.rate_limits.get(provider, {})),
+            (f"model:{model}", self.config.model_rate_limits.get(model, {}))
+        ]
+        for scope, limits in scopes:
+            if limits.get("rpm"):
+                buckets.append((f"{scope}:rpm", float(limits["rpm"]), 1.0))
+            if limits.get("tpm"):
+                capacity = float(limits["tpm"])
+                # Una llamada mayor que el bucket completo nunca cabría
+                buckets.append((f"{scope}:tpm", capacity, min(float(estimated_tokens), capacity)))
+        return buckets
+
+    async def acquire(self, provider: str, model: str, estimated_tokens: int) -> float:
+        """
+        Reserva cupo para una llamada y espera su turno.
+        Retorna los segundos esperados. Si el almacén falla, no bloquea.
+        """
+        if not self.config.rate_limit_enabled:
+            return 0.0
+
+        buckets = self._get_buckets(provider, model, estimated_tokens)
+        if not buckets:
+            return 0.0
+
+        try:
+            wait = await self.executor.run(self._reserve_sync, buckets)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Error en el limitador de tasa (se continúa sin limitar): {e}")
+            return 0.0
+
+        self.acquisitions += 1
+        if wait <= 0:
+            return 0.0
+
+        self.delayed += 1
+        self.total_wait += wait
+        self.waiting_by_provider[provider] = self.waiting_by_provider.get(provider, 0) + 1
+        try:
+            with RATE_LIMIT_WAITING.labels(provider).track_inprogress():
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # La llamada no se hará: liberar el cupo reservado
+            try:
+                await asyncio.shield(self.executor.run(self._refund_sync, buckets))
+            except (sqlite3.Error, asyncio.CancelledError):
+                pass
+            raise
+        finally:
+            self.waiting_by_provider[provider] -= 1
+        return wait
+
+    def is_backlogged(self, provider: str) -> bool:
+        """Hay llamadas de este worker esperando cupo del proveedor"""
+        return self.waiting_by_provider.get(provider, 0) > 0
+
+    def settle(self, provider: str, model: str, estimated_tokens: int, actual_tokens: int):
+        """
+        Ajusta los buckets tpm con el uso real de una llamada ya reservada con
+        acquire(estimated_tokens): devuelve lo no consumido (o cobra el exceso).
+        Se ejecuta en segundo plano para no añadir latencia a la respuesta.
+        """
+        if not self.config.rate_limit_enabled:
+            return
+        adjustments = []
+        for key, capacity, reserved in self._get_buckets(provider, model, estimated_tokens):
+            if not key.endswith(":tpm"):
+                continue
+            difference = reserved - min(float(actual_tokens), capacity)
+            if difference:
+                adjustments.append((key, capacity, difference))
+        if not adjustments:
+            return
+
+        self.settlements += 1
+        self.refunded_tokens += max(0, estimated_tokens - actual_tokens)
+        try:
+            self.executor.submit(self._settle_sync, adjustments)
+        except RuntimeError:
+            # Pool ya cerrado (apagado de la aplicación)
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del limitador en este worker"""
+        return {
+            "enabled": self.config.rate_limit_enabled,
+            "db_path": self.config.rate_limit_db_path,
+            "rate_limits": self.config.rate_limits,
+            "model_rate_limits": self.config.model_rate_limits,
+            "acquisitions": self.acquisitions,
+            "delayed": self.delayed,
+            "total_wait": self.total_wait,
+            "avg_wait": self.total_wait / self.delayed if self.delayed else 0.0,
+            "settlements": self.settlements,
+            "refunded_tokens": self.refunded_tokens,
+            "waiting_by_provider": dict(self.waiting_by_provider),
+            "errors": self.errors
+        }
+
+# Instancia global
+rate_limiter = RateLimiter()
@@ -0,0 +1,168 @@
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from email.utils import parsedate_to_datetime
+import asyncio
+import random
+import time
+from app.config import settings
+from app.llm.config import llm_config
+from app.llm.deadline import get_deadline
+
+T = TypeVar("T")
+
+# ===== CLASES DE ERROR =====
+RATE_LIMIT = "rate_limit"
+OVERLOAD = "overload"
+TIMEOUT = "timeout"
+FATAL = "fatal"
+
+def _iter_error_chain(error: BaseException):
+    """Recorre la cadena de causas (los _call_* envuelven el error original)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+def _get_status_code(error: BaseException) -> Optional[int]:
+    """Código HTTP del error: status_code (OpenAI/Anthropic) o code (google.api_core)"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    return None
+
+def classify_error(provider: str, error: BaseException) -> str:
+    """
+    Clasifica un error de proveedor en rate_limit, overload, timeout o fatal.
+    Se basa en el código HTTP y el nombre de la excepción para no tener que
+    importar cada SDK.
+    """
+    for candidate in _iter_error_chain(error):
+        name = type(candidate).__name__
+
+        if isinstance(candidate, asyncio.TimeoutError) or "Timeout" in name or name == "DeadlineExceeded":
+            return TIMEOUT
+        # Errores de red/conexión: transitorios, se tratan como timeout
+        if name in ("APIConnectionError", "ConnectError", "ReadError", "RemoteProtocolError"):
+            return TIMEOUT
+
+        status = _get_status_code(candidate)
+        if status is None:
+            continue
+
+        if status == 429:
+            # OpenAI usa 429 también para cuota agotada: reintentar no sirve
+            if provider == "openai" and getattr(candidate, "code", None) == "insufficient_quota":
+                return FATAL
+            return RATE_LIMIT
+        if status in (408, 504):
+            return TIMEOUT
+        if status in (500, 502, 503, 529):
+            return OVERLOAD
+        return FATAL
+
+    return FATAL
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Segundos indicados por el proveedor en las cabeceras Retry-After"""
+    for candidate in _iter_error_chain(error):
+        response = getattr(candidate, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            continue
+
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+    return None
+
+class RetryPolicy:
+    """
+    Reintentos con backoff exponencial + jitter para llamadas a proveedores.
+    Usa GlobalConfig.max_retries / retry_delay / request_timeout y los flags
+    retry_on_rate_limit / retry_on_timeout / exponential_backoff de LLMConfig.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+
+    def should_retry(self, error_class: str) -> bool:
+        if error_class == RATE_LIMIT:
+            return self.config.retry_on_rate_limit
+        if error_class == TIMEOUT:
+            return self.config.retry_on_timeout
+        return error_class == OVERLOAD
+
+    def backoff_delay(self, retry_number: int) -> float:
+        """Espera antes del reintento N (empieza en 0), con jitter"""
+        if self.config.exponential_backoff:
+            delay = settings.retry_delay * (2 ** retry_number)
+        else:
+            delay = settings.retry_delay
+        delay = min(delay, self.config.max_retry_delay)
+        # Equal jitter: la mitad fija y la otra mitad aleatoria
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(self,
+                  func: Callable[[], Awaitable[T]],
+                  provider: str,
+                  record: Any = None,
+                  deadline: Optional[float] = None) -> T:
+        """
+        Ejecuta func con reintentos hasta éxito, error fatal, max_retries o
+        el deadline (time.monotonic()). Anota retries y error_class en record.
+        Respeta además el deadline de la operación en curso (deadline_scope).
+        """
+        if deadline is None:
+            deadline = time.monotonic() + settings.request_timeout
+        context_deadline = get_deadline()
+        if context_deadline is not None:
+            deadline = min(deadline, context_deadline)
+
+        retry_number = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError("Deadline agotado antes de llamar al proveedor")
+                return await asyncio.wait_for(func(), timeout=remaining)
+            except Exception as e:
+                error_class = classify_error(provider, e)
+                if record is not None:
+                    record.error_class = error_class
+
+                if not self.should_retry(error_class) or retry_number >= settings.max_retries:
+                    raise
+
+                delay = self.backoff_delay(retry_number)
+                retry_after = get_retry_after(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+
+                # No reintentar si la espera sobrepasa el deadline
+                if time.monotonic() + delay >= deadline:
+                    raise
+
+                retry_number += 1
+                if record is not None:
+                    record.retries = retry_number
+                print(f"🔁 Reintento {retry_number}/{settings.max_retries} ({error_class}) en {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+# Instancia global
+retry_policy = RetryPolicy()
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.llm.models import LLMRequestConfig, LLMConfigResponse
 from app.llm.config import llm_config
 from app.llm.service import llm_service
+from app.llm.clients import client_registry
+from app.llm.streaming import format_sse
 
 router = APIRouter(prefix="/llm", tags=["LLM"])
 
@@ -14,9 +17,12 @@ async def get_llm_config():
         available_models=await llm_service.get_available_models(),
         internal_config={
             "max_concurrent_requests": llm_config.max_concurrent_requests,
+            "max_concurrent_per_provider": llm_config.max_concurrent_per_provider,
             "retry_on_rate_limit": llm_config.retry_on_rate_limit,
             "retry_on_timeout": llm_config.retry_on_timeout,
-            "exponential_backoff": llm_config.exponential_backoff
+            "exponential_backoff": llm_config.exponential_backoff,
+            "response_cache_enabled": llm_config.response_cache_enabled,
+            "hedging_enabled": llm_config.hedging_enabled
         }
     )
 
@@ -33,13 +39,54 @@ async def get_available_models():
         "available_providers": llm_service.get_available_providers()
     }
 
+@router.get("/pool")
+async def get_pool_stats():
+    """Estadísticas de los pools de conexiones, el planificador y el limitador de tasa"""
+    return {
+        "clients": client_registry.get_pool_stats(),
+        "scheduler": llm_service.scheduler.get_stats(),
+        "rate_limiter": llm_service.rate_limiter.get_stats(),
+        "catalog": llm_service.catalog.get_stats()
+    }
+
+@router.get("/stats")
+async def get_call_stats():
+    """Métricas por modelo de las llamadas a proveedores (latencia, reintentos, errores)"""
+    return {
+        **llm_service.call_stats.get_stats(),
+        "hedging": llm_service.hedging.get_stats(),
+        "fake_provider": llm_service.fake.get_stats()
+    }
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Estadísticas de la cache de respuestas"""
+    return llm_service.cache.get_stats()
+
+@router.delete("/cache")
+async def clear_cache():
+    """Vacía la cache de respuestas"""
+    llm_service.cache.clear()
+    return {"message": "Cache de respuestas vaciada"}
+
 @router.post("/test/{model}")
 async def test_model(model: str, config: LLMRequestConfig):
-    """Prueba un modelo específico con texto de ejemplo"""
+    """
+    Prueba un modelo específico con texto de ejemplo.
+    Con config.stream=true responde en streaming (SSE): eventos "chunk" con
+    texto incremental y un evento "stats" con time-to-first-token y tokens/s.
+    """
     test_prompt = "Responde brevemente: ¿Qué es la inteligencia artificial?"
     
+    if config.stream:
+        return StreamingResponse(
+            _stream_test_model(model, test_prompt, config),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     try:
-        result = await llm_service.generate_text(
+        result = await llm_service.generate(
             prompt=test_prompt,
             model=model,
             config=config.model_dump()
@@ -47,8 +94,33 @@ async def test_model(model: str, config: LLMRequestConfig):
         return {
             "model": model,
             "test_prompt": test_prompt,
-            "response": result,
+            "response": result.text,
+            "usage": {
+                "prompt_tokens": result.prompt_tokens,
+                "completion_tokens": result.completion_tokens,
+                "tokens_estimated": result.tokens_estimated,
+                "cost": result.cost,
+                "latency": result.execution_time,
+                "tokens_per_second": result.tokens_per_second,
+                "retries": result.retries,
+                "cached": result.cached
+            },
             "config_used": config
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _stream_test_model(model: str, prompt: str, config: LLMRequestConfig):
+    """Genera los eventos SSE de /test/{model} en modo streaming"""
+    try:
+        stream = llm_service.stream_text(
+            prompt=prompt,
+            model=model,
+            config=config.model_dump()
+        )
+        async for chunk in stream:
+            yield format_sse("chunk", {"text": chunk})
+        yield format_sse("stats", stream.stats)
+    except Exception as e:
+        yield format_sse("error", {"detail": str(e)})
@@ -0,0 +1,94 @@
+from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+import asyncio
+from app.llm.config import llm_config
+from app.metrics import SCHEDULER_QUEUED, SCHEDULER_ACTIVE
+from app.tracing import span
+
+class RequestScheduler:
+    """
+    Planificador de concurrencia para llamadas a proveedores LLM.
+    Limita las llamadas simultáneas a nivel global (max_concurrent_requests)
+    y por proveedor (max_concurrent_per_provider).
+    """
+
+    def __init__(self, config=None):
+        self.config = config or llm_config
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._provider_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Contadores para observar la cola
+        self.in_flight = 0
+        self.queued = 0
+        self.in_flight_by_provider: Dict[str, int] = {}
+        self.queued_by_provider: Dict[str, int] = {}
+
+    def _ensure_loop(self):
+        """Recrea los semáforos si cambia el event loop (p. ej. varios asyncio.run)"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global_semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+            self._provider_semaphores = {}
+
+    def _get_provider_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Obtiene (o crea) el semáforo de un proveedor"""
+        if provider not in self._provider_semaphores:
+            limit = self.config.max_concurrent_per_provider.get(
+                provider, self.config.default_max_concurrent_per_provider
+            )
+            self._provider_semaphores[provider] = asyncio.Semaphore(limit)
+        return self._provider_semaphores[provider]
+
+    @asynccontextmanager
+    async def slot(self, provider: str):
+        """
+        Reserva un hueco de ejecución para una llamada al proveedor.
+        Primero el límite del proveedor y luego el global, para no ocupar
+        huecos globales mientras se espera a un proveedor saturado.
+        """
+        self._ensure_loop()
+        provider_semaphore = self._get_provider_semaphore(provider)
+
+        self.queued += 1
+        self.queued_by_provider[provider] = self.queued_by_provider.get(provider, 0) + 1
+        SCHEDULER_QUEUED.labels(provider).inc()
+        try:
+            with span("llm.queue"):
+                await provider_semaphore.acquire()
+                try:
+                    await self._global_semaphore.acquire()
+                except BaseException:
+                    provider_semaphore.release()
+                    raise
+        finally:
+            self.queued -= 1
+            self.queued_by_provider[provider] -= 1
+            SCHEDULER_QUEUED.labels(provider).dec()
+
+        self.in_flight += 1
+        SCHEDULER_ACTIVE.labels(provider).inc()
+        self.in_flight_by_provider[provider] = self.in_flight_by_provider.get(provider, 0) + 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.in_flight_by_provider[provider] -= 1
+            SCHEDULER_ACTIVE.labels(provider).dec()
+            self._global_semaphore.release()
+            provider_semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna el estado actual del planificador"""
+        return {
+            "max_concurrent_requests": self.config.max_concurrent_requests,
+            "max_concurrent_per_provider": dict(self.config.max_concurrent_per_provider),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "in_flight_by_provider": dict(self.in_flight_by_provider),
+            "queued_by_provider": dict(self.queued_by_provider)
+        }
+
+# Instancia global
+request_scheduler = RequestScheduler()
@@ -1,9 +1,29 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from contextlib import AsyncExitStack
 import asyncio
+import time
 # Eliminamos LangChain, usamos clientes nativos directamente
-from app.config import get_api_key
+from app.config import get_api_key, settings
 from app.llm.config import llm_config
-from app.llm.models import LLMRequestConfig
+from app.llm.models import LLMRequestConfig, LLMResponse
+from app.llm.scheduler import request_scheduler
+from app.llm.clients import client_registry
+from app.llm.catalog import ModelCatalog, FallbackModels
+from app.llm.executor import blocking_executor
+from app.llm.cache import response_cache
+from app.llm.streaming import TextStream
+from app.llm.retry import retry_policy, classify_error
+from app.llm.stats import CallRecord, call_stats
+from app.llm.ratelimit import rate_limiter
+from app.llm.hedging import hedge_policy
+from app.llm.fake import fake_provider
+from app.llm.usage import record_usage
+from app.llm.deadline import get_deadline
+from app.tracing import span
+from app.metrics import (
+    LLM_REQUEST_LATENCY, LLM_REQUESTS_IN_FLIGHT, LLM_REQUEST_ERRORS,
+    LLM_TOKENS, LLM_COST, LLM_CACHE_HITS, LLM_TIME_TO_FIRST_TOKEN, LLM_STREAM_TOKENS_PER_SECOND
+)
 
 class LLMService:
     """
@@ -13,71 +33,290 @@ class LLMService:
     
     def __init__(self):
         self.config = llm_config
+        self.scheduler = request_scheduler
+        self.clients = client_registry
+        self.executor = blocking_executor
+        self.cache = response_cache
+        self.retry_policy = retry_policy
+        self.call_stats = call_stats
+        self.rate_limiter = rate_limiter
+        self.hedging = hedge_policy
+        self.fake = fake_provider
+        self.catalog = ModelCatalog(self._discover_models)
     
     async def get_available_models(self) -> List[str]:
+        """
+        Retorna los modelos disponibles desde el catálogo en memoria.
+        El catálogo se refresca con _discover_models según su TTL.
+        """
+        return await self.catalog.get_models()
+    
+    async def _discover_models(self, available_providers: List[str]) -> Dict[str, List[str]]:
         """
         Llama a cada proveedor para obtener modelos disponibles.
         Implementación real con llamadas a APIs.
         """
-        models = []
-        available_providers = self.config.get_available_providers()
+        models: Dict[str, List[str]] = {}
         
         # Llamadas reales a APIs de proveedores
         if "openai" in available_providers:
             try:
-                import openai
-                client = openai.AsyncClient(api_key=get_api_key("openai"))
+                client = self.clients.get_openai_client(get_api_key("openai"))
                 response = await client.models.list()
-                openai_models = [model.id for model in response.data if 'gpt' in model.id.lower()]
-                models.extend(openai_models)
+                models["openai"] = [model.id for model in response.data if 'gpt' in model.id.lower()]
             except Exception as e:
                 print(f"Error obteniendo modelos OpenAI: {e}")
                 # Fallback a modelos conocidos
-                models.extend(["gpt-4", "gpt-3.5-turbo", "gpt-4-turbo"])
+                models["openai"] = FallbackModels(["gpt-4", "gpt-3.5-turbo", "gpt-4-turbo"])
         
         if "anthropic" in available_providers:
-            try:
-                # Anthropic no tiene API pública para listar modelos, usar modelos conocidos
-                models.extend(["claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-haiku-20240307"])
-            except Exception as e:
-                print(f"Error obteniendo modelos Anthropic: {e}")
+            # Anthropic no tiene API pública para listar modelos, usar modelos conocidos
+            models["anthropic"] = ["claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-haiku-20240307"]
         
         if "google" in available_providers:
             try:
-                import google.generativeai as genai
-                genai.configure(api_key=get_api_key("google"))
+                genai = await self.clients.get_google_module_async(get_api_key("google"))
+                # list_models es síncrono y paginado: se consume fuera del event loop
+                google_listing = await self.executor.run(lambda: list(genai.list_models()))
                 google_models = []
-                for model in genai.list_models():
+                for model in google_listing:
                     if 'generateContent' in model.supported_generation_methods:
                         google_models.append(model.name.replace('models/', ''))
-                models.extend(google_models)
+                models["google"] = google_models
             except Exception as e:
                 print(f"Error obteniendo modelos Google: {e}")
                 # Fallback a modelos conocidos
-                models.extend(["gemini-pro", "gemini-pro-vision"])
+                models["google"] = FallbackModels(["gemini-pro", "gemini-pro-vision"])
+        
+        if "fake" in available_providers:
+            models["fake"] = self.fake.list_models()
         
         return models
     
     async def generate_text(self, prompt: str, model: str, config: Dict[str, Any]) -> str:
-        """Genera texto usando un modelo específico - MÉTODO GENÉRICO"""
+        """
+        Genera texto usando un modelo específico - MÉTODO GENÉRICO.
+        Siempre espera la respuesta completa; para streaming usar stream_text.
+        """
+        response = await self.generate(prompt, model, config)
+        return response.text
+    
+    async def generate(self, prompt: str, model: str, config: Dict[str, Any]) -> LLMResponse:
+        """
+        Como generate_text, pero retorna la LLMResponse completa: tokens de
+        prompt y de salida, latencia, coste, reintentos y si vino de cache.
+        El uso se suma a los acumuladores activos (usage_scope).
+        """
         # Validar configuración del frontend
         llm_request_config = LLMRequestConfig(**config)
+        provider = self._get_provider_from_model(model)
         
-        # Llamar directamente al modelo específico usando los clientes nativos
-        if model.startswith("gpt"):
-            return await self._call_openai_model(model, prompt, llm_request_config)
-        elif model.startswith("claude"):
-            return await self._call_anthropic_model(model, prompt, llm_request_config)
-        elif model.startswith("gemini"):
-            return await self._call_google_model(model, prompt, llm_request_config)
+        if self.hedging.is_enabled(llm_request_config.hedge):
+            compute = lambda: self._dispatch_hedged(provider, model, prompt, llm_request_config)
         else:
-            raise ValueError(f"Modelo {model} no reconocido")
+            compute = lambda: self._dispatch(provider, model, prompt, llm_request_config)
+        
+        start = time.perf_counter()
+        try:
+            with LLM_REQUESTS_IN_FLIGHT.labels(provider).track_inprogress(), \
+                    span("llm.generate", provider=provider, model=model) as generate_span:
+                # Llamadas determinísticas: servir desde cache si está habilitada
+                if self.cache.is_cacheable(llm_request_config):
+                    cache_key = self.cache.make_key(model, prompt, llm_request_config)
+                    response = await self.cache.get_or_compute(cache_key, compute)
+                else:
+                    response = await compute()
+                generate_span.set_attributes(
+                    cached=response.cached,
+                    retries=response.retries,
+                    prompt_tokens=response.prompt_tokens,
+                    completion_tokens=response.completion_tokens
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LLM_REQUEST_ERRORS.labels(provider, model, classify_error(provider, e)).inc()
+            raise
+        finally:
+            LLM_REQUEST_LATENCY.labels(provider, model).observe(time.perf_counter() - start)
+        
+        if response.cached:
+            LLM_CACHE_HITS.labels(provider, model).inc()
+        else:
+            LLM_TOKENS.labels(provider, model, "prompt").inc(response.prompt_tokens)
+            LLM_TOKENS.labels(provider, model, "completion").inc(response.completion_tokens)
+            LLM_COST.labels(provider, model).inc(response.cost)
+        
+        record_usage(response)
+        return response
+    
+    async def _dispatch_hedged(self, provider: str, model: str, prompt: str, llm_request_config: LLMRequestConfig) -> LLMResponse:
+        """
+        Envía la llamada y, si tarda más que el percentil configurado del modelo,
+        lanza un duplicado. Gana la primera respuesta correcta y la otra se cancela.
+        El plazo cuenta desde que la llamada ocupa su hueco de concurrencia: la
+        espera local (rate limit, cola) no es lentitud del proveedor.
+        """
+        self.hedging.begin_call()
+        delay = self.hedging.hedge_delay(model)
+        if delay is None:
+            # Aún no hay latencias suficientes para este modelo
+            return await self._dispatch(provider, model, prompt, llm_request_config)
+        
+        call_started = asyncio.Event()
+        primary = asyncio.ensure_future(self._dispatch(provider, model, prompt, llm_request_config, call_started))
+        try:
+            started_waiter = asyncio.ensure_future(call_started.wait())
+            try:
+                await asyncio.wait({primary, started_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                started_waiter.cancel()
+            if primary.done():
+                return primary.result()
+            
+            start = time.perf_counter()
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return await primary
+            if self._is_backlogged(provider):
+                # Un duplicado solo se pondría a la cola detrás de otras llamadas
+                self.hedging.record_backlog_skip()
+                return await primary
+            if not self.hedging.try_acquire_budget():
+                return await primary
+            
+            print(f"🪁 Hedging {model}: sin respuesta tras {delay:.2f}s, lanzando duplicado")
+            hedge = asyncio.ensure_future(self._dispatch(provider, model, prompt, llm_request_config))
+            pending = {primary, hedge}
+            try:
+                while True:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    winner = next((task for task in done if task.exception() is None), None)
+                    if winner is not None:
+                        if winner is hedge:
+                            self.hedging.record_hedge_win(model, time.perf_counter() - start)
+                        else:
+                            self.hedging.record_primary_win()
+                        return winner.result()
+                    if not pending:
+                        # Fallaron ambas: propagar el error de la llamada original
+                        return primary.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+        finally:
+            if not primary.done():
+                primary.cancel()
+    
+    def _is_backlogged(self, provider: str) -> bool:
+        """Hay llamadas de este proveedor esperando cupo en el limitador o hueco en el planificador"""
+        return self.rate_limiter.is_backlogged(provider) or self.scheduler.queued_by_provider.get(provider, 0) > 0
+    
+    async def _dispatch(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        llm_request_config: LLMRequestConfig,
+        call_started: Optional[asyncio.Event] = None
+    ) -> LLMResponse:
+        """
+        Envía la llamada al proveedor con reintentos y registra sus métricas.
+        call_started se activa cuando el primer intento ocupa su hueco de concurrencia.
+        """
+        record = CallRecord(model, provider)
+        start = time.perf_counter()
+        try:
+            response = await self.retry_policy.run(
+                lambda: self._dispatch_once(provider, model, prompt, llm_request_config, call_started),
+                provider,
+                record
+            )
+            record.success = True
+            record.latency = time.perf_counter() - start
+            
+            # Completar la respuesta con latencia total, coste y reintentos
+            response.execution_time = record.latency
+            response.retries = record.retries
+            response.cost = self._calculate_cost(provider, model, response.prompt_tokens, response.completion_tokens)
+            record.prompt_tokens = response.prompt_tokens
+            record.completion_tokens = response.completion_tokens
+            record.cost = response.cost
+            return response
+        except asyncio.CancelledError:
+            # Cancelada por el llamador (p. ej. perdedora de un hedge)
+            record.error_class = "cancelled"
+            raise
+        finally:
+            record.latency = time.perf_counter() - start
+            self.call_stats.record(record)
     
-    async def _call_openai_model(self, model: str, prompt: str, config: LLMRequestConfig) -> str:
+    async def _dispatch_once(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        llm_request_config: LLMRequestConfig,
+        call_started: Optional[asyncio.Event] = None
+    ) -> LLMResponse:
+        """Un intento de llamada al proveedor correspondiente"""
+        with span("llm.attempt", provider=provider, model=model):
+            # Esperar turno en los buckets rpm/tpm antes de ocupar un hueco de concurrencia
+            estimated_tokens = self.rate_limiter.estimate_tokens(prompt, llm_request_config.max_tokens)
+            with span("llm.rate_limit") as rate_limit_span:
+                waited = await self.rate_limiter.acquire(provider, model, estimated_tokens)
+                rate_limit_span.set_attribute("waited_seconds", waited)
+            
+            # Respetar los límites de concurrencia global y por proveedor
+            # (el hueco se libera durante las esperas entre reintentos)
+            async with self.scheduler.slot(provider):
+                if call_started is not None:
+                    call_started.set()
+                # Red + cómputo del proveedor (la espera en cola es el span llm.queue)
+                call_start = time.perf_counter()
+                with span("llm.provider_call") as call_span:
+                    # Llamar directamente al modelo específico usando los clientes nativos
+                    if provider == "fake":
+                        response = await self._call_fake_model(model, prompt, llm_request_config)
+                    elif provider == "openai":
+                        response = await self._call_openai_model(model, prompt, llm_request_config)
+                    elif provider == "anthropic":
+                        response = await self._call_anthropic_model(model, prompt, llm_request_config)
+                    else:
+                        response = await self._call_google_model(model, prompt, llm_request_config)
+                    call_span.set_attribute("completion_tokens", response.completion_tokens)
+                # El percentil del hedging solo ve la latencia del proveedor (sin reintentos ni esperas locales)
+                self.hedging.tracker.record(model, time.perf_counter() - call_start)
+            
+            # Devolver al bucket tpm los tokens reservados que no se usaron
+            self.rate_limiter.settle(
+                provider, model, estimated_tokens, response.prompt_tokens + response.completion_tokens
+            )
+            return response
+    
+    def _calculate_cost(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Coste en USD de una llamada (las simuladas no cuestan nada, aunque imiten un modelo real)"""
+        if provider == "fake":
+            return 0.0
+        return self.config.calculate_cost(model, prompt_tokens, completion_tokens)
+    
+    async def _call_fake_model(self, model: str, prompt: str, config: LLMRequestConfig) -> LLMResponse:
+        """Llama al proveedor simulado (sin red ni coste)"""
+        try:
+            text, prompt_tokens, completion_tokens = await self.fake.complete(model, prompt, config)
+            return self._build_response(model, prompt, text, prompt_tokens, completion_tokens)
+        except Exception as e:
+            raise ValueError(f"Error llamando al proveedor simulado modelo {model}: {e}") from e
+    
+    async def _call_openai_model(self, model: str, prompt: str, config: LLMRequestConfig) -> LLMResponse:
         """Llama directamente a OpenAI con el modelo específico"""
         try:
-            import openai
-            client = openai.AsyncClient(api_key=get_api_key("openai"))
+            client = self.clients.get_openai_client(get_api_key("openai"))
+            
+            extra_args = {}
+            if config.response_format == "json":
+                # JSON mode: el modelo solo puede emitir un objeto JSON válido
+                extra_args["response_format"] = {"type": "json_object"}
             
             response = await client.chat.completions.create(
                 model=model,
@@ -87,54 +326,67 @@ class LLMService:
                 top_p=config.top_p,
                 frequency_penalty=config.frequency_penalty,
                 presence_penalty=config.presence_penalty,
-                stream=config.stream
+                stream=False,
+                **extra_args
             )
             
-            return response.choices[0].message.content
+            usage = response.usage
+            return self._build_response(
+                model, prompt, response.choices[0].message.content,
+                usage.prompt_tokens if usage else None,
+                usage.completion_tokens if usage else None
+            )
         except Exception as e:
-            raise ValueError(f"Error llamando a OpenAI modelo {model}: {e}")
+            raise ValueError(f"Error llamando a OpenAI modelo {model}: {e}") from e
     
-    async def _call_anthropic_model(self, model: str, prompt: str, config: LLMRequestConfig) -> str:
+    async def _call_anthropic_model(self, model: str, prompt: str, config: LLMRequestConfig) -> LLMResponse:
         """Llama directamente a Anthropic con el modelo específico"""
         try:
-            import anthropic
-            client = anthropic.AsyncAnthropic(api_key=get_api_key("anthropic"))
+            client = self.clients.get_anthropic_client(get_api_key("anthropic"))
+            
+            messages = [{"role": "user", "content": prompt}]
+            prefill = ""
+            if config.response_format == "json":
+                # Sin JSON mode nativo: forzar el inicio del objeto con un prefill
+                prefill = "{"
+                messages.append({"role": "assistant", "content": prefill})
             
             response = await client.messages.create(
                 model=model,
                 max_tokens=config.max_tokens,
                 temperature=config.temperature,
-                messages=[{"role": "user", "content": prompt}]
+                messages=messages
             )
             
-            return response.content[0].text
+            usage = response.usage
+            return self._build_response(
+                model, prompt, prefill + response.content[0].text,
+                usage.input_tokens if usage else None,
+                usage.output_tokens if usage else None
+            )
         except Exception as e:
-            raise ValueError(f"Error llamando a Anthropic modelo {model}: {e}")
+            raise ValueError(f"Error llamando a Anthropic modelo {model}: {e}") from e
     
-    async def _call_google_model(self, model: str, prompt: str, config: LLMRequestConfig) -> str:
+    async def _call_google_model(self, model: str, prompt: str, config: LLMRequestConfig) -> LLMResponse:
         """Llama directamente a Google con el modelo específico"""
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=get_api_key("google"))
-            
-            # Verificar si el modelo existe
-            available_models = [m.name.replace('models/', '') for m in genai.list_models()]
-            if model not in available_models:
-                # Intentar con modelos alternativos
-                if model == "gemini-pro":
-                    model = "gemini-1.5-flash"  # Modelo más reciente
-                elif model == "gemini-pro-vision":
-                    model = "gemini-1.5-flash"  # Modelo más reciente
-                elif not any(m.startswith("gemini") for m in available_models):
-                    raise ValueError(f"Modelo {model} no disponible. Modelos disponibles: {available_models}")
+            genai = await self.clients.get_google_module_async(get_api_key("google"))
+            
+            # Verificar el modelo contra el catálogo en memoria (sin llamadas de red)
+            model = await self._resolve_google_model(model)
             
             model_instance = genai.GenerativeModel(model)
             
+            extra_args = {}
+            if config.response_format == "json":
+                extra_args["response_mime_type"] = "application/json"
+            
             generation_config = genai.types.GenerationConfig(
                 temperature=config.temperature,
                 max_output_tokens=config.max_tokens,
                 top_p=config.top_p,
-                top_k=config.top_k
+                top_k=config.top_k,
+                **extra_args
             )
             
             response = await model_instance.generate_content_async(
@@ -145,22 +397,278 @@ class LLMService:
             if not response.text:
                 raise ValueError(f"Modelo {model} no generó contenido")
             
-            return response.text
+            usage = getattr(response, "usage_metadata", None)
+            return self._build_response(
+                model, prompt, response.text,
+                usage.prompt_token_count if usage else None,
+                usage.candidates_token_count if usage else None
+            )
+        except Exception as e:
+            raise ValueError(f"Error llamando a Google modelo {model}: {e}") from e
+    
+    def _build_response(self,
+                        model: str,
+                        prompt: str,
+                        text: str,
+                        prompt_tokens: Optional[int],
+                        completion_tokens: Optional[int]) -> LLMResponse:
+        """LLMResponse con el uso informado por el proveedor (o estimado ~4 caracteres/token)"""
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = len(prompt) // 4
+        if completion_tokens is None:
+            completion_tokens = len(text or "") // 4
+        return LLMResponse(
+            text=text,
+            model=model,
+            tokens_used=prompt_tokens + completion_tokens,
+            execution_time=0.0,  # La completa _dispatch con la latencia total
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=estimated
+        )
+    
+    def stream_text(self, prompt: str, model: str, config: Dict[str, Any]) -> TextStream:
+        """
+        Genera texto en streaming con cualquier proveedor.
+        Retorna un TextStream: se itera con `async for` para recibir fragmentos
+        incrementales y al terminar expone time-to-first-token y tokens/segundo.
+        La apertura del stream (hasta el primer fragmento) pasa por la misma
+        política de reintentos y deadline que generate; al terminar se registran
+        call_stats, métricas y uso.
+        """
+        llm_request_config = LLMRequestConfig(**config)
+        provider = self._get_provider_from_model(model)
+        record = CallRecord(model, provider)
+        record.streamed = True
+        estimated_tokens = self.rate_limiter.estimate_tokens(prompt, llm_request_config.max_tokens)
+        
+        async def chunks(stream: TextStream) -> AsyncIterator[str]:
+            LLM_REQUESTS_IN_FLIGHT.labels(provider).inc()  # Lo decrementa _record_stream
+            # Antes del primer fragmento no se ha emitido nada: reintentar es seguro
+            exit_stack, provider_chunks, first_chunk = await self.retry_policy.run(
+                lambda: self._open_stream(provider, model, prompt, llm_request_config, estimated_tokens, stream),
+                provider,
+                record
+            )
+            try:
+                yield first_chunk
+                deadline = get_deadline()
+                while True:
+                    try:
+                        if deadline is None:
+                            chunk = await provider_chunks.__anext__()
+                        else:
+                            chunk = await asyncio.wait_for(provider_chunks.__anext__(), deadline - time.monotonic())
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            finally:
+                await provider_chunks.aclose()
+                await exit_stack.aclose()
+        
+        return TextStream(
+            model, chunks,
+            on_finish=lambda stream, error: self._record_stream(provider, prompt, estimated_tokens, record, stream, error)
+        )
+    
+    async def _open_stream(self,
+                           provider: str,
+                           model: str,
+                           prompt: str,
+                           llm_request_config: LLMRequestConfig,
+                           estimated_tokens: int,
+                           stream: TextStream) -> Tuple[AsyncExitStack, AsyncIterator[str], str]:
+        """
+        Un intento de abrir el stream: cupo en el limitador, hueco de
+        concurrencia y primer fragmento del proveedor. El hueco se mantiene
+        (exit_stack) mientras dura el stream.
+        """
+        await self.rate_limiter.acquire(provider, model, estimated_tokens)
+        exit_stack = AsyncExitStack()
+        provider_chunks = None
+        try:
+            await exit_stack.enter_async_context(self.scheduler.slot(provider))
+            if provider == "fake":
+                provider_chunks = self.fake.stream(model, prompt, llm_request_config)
+            elif provider == "openai":
+                provider_chunks = self._stream_openai_model(model, prompt, llm_request_config, stream)
+            elif provider == "anthropic":
+                provider_chunks = self._stream_anthropic_model(model, prompt, llm_request_config, stream)
+            else:
+                provider_chunks = self._stream_google_model(model, prompt, llm_request_config, stream)
+            try:
+                first_chunk = await provider_chunks.__anext__()
+            except StopAsyncIteration:
+                first_chunk = ""
+            return exit_stack, provider_chunks, first_chunk
+        except BaseException:
+            if provider_chunks is not None:
+                await provider_chunks.aclose()
+            await exit_stack.aclose()
+            raise
+    
+    def _record_stream(self,
+                       provider: str,
+                       prompt: str,
+                       estimated_tokens: int,
+                       record: CallRecord,
+                       stream: TextStream,
+                       error: Optional[BaseException]):
+        """Registra un stream terminado en call_stats, métricas y acumuladores de uso"""
+        LLM_REQUESTS_IN_FLIGHT.labels(provider).dec()
+        model = record.model
+        stats = stream.stats
+        record.latency = stats.total_time
+        record.time_to_first_token = stats.time_to_first_token
+        LLM_REQUEST_LATENCY.labels(provider, model).observe(stats.total_time)
+        
+        if error is not None:
+            if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+                # El consumidor abandonó el stream (p. ej. cliente desconectado)
+                record.error_class = "cancelled"
+            else:
+                record.error_class = classify_error(provider, error)
+                LLM_REQUEST_ERRORS.labels(provider, model, record.error_class).inc()
+        else:
+            record.success = True
+        
+        record.prompt_tokens = stream.reported_prompt_tokens or len(prompt) // 4
+        record.completion_tokens = stats.completion_tokens
+        record.cost = self._calculate_cost(provider, model, record.prompt_tokens, record.completion_tokens)
+        self.call_stats.record(record)
+        if record.success:
+            self.rate_limiter.settle(provider, model, estimated_tokens, record.prompt_tokens + record.completion_tokens)
+        
+        if stats.time_to_first_token is not None:
+            LLM_TIME_TO_FIRST_TOKEN.labels(provider, model).observe(stats.time_to_first_token)
+        if record.success and stats.tokens_per_second:
+            LLM_STREAM_TOKENS_PER_SECOND.labels(provider, model).observe(stats.tokens_per_second)
+        LLM_TOKENS.labels(provider, model, "prompt").inc(record.prompt_tokens)
+        LLM_TOKENS.labels(provider, model, "completion").inc(record.completion_tokens)
+        LLM_COST.labels(provider, model).inc(record.cost)
+        
+        record_usage(LLMResponse(
+            text="",
+            model=model,
+            tokens_used=record.prompt_tokens + record.completion_tokens,
+            execution_time=record.latency,
+            prompt_tokens=record.prompt_tokens,
+            completion_tokens=record.completion_tokens,
+            tokens_estimated=stats.tokens_estimated,
+            cost=record.cost,
+            retries=record.retries
+        ))
+    
+    async def _stream_openai_model(self, model: str, prompt: str, config: LLMRequestConfig, stream: TextStream) -> AsyncIterator[str]:
+        """Streaming de OpenAI: fragmentos delta + bloque final de uso"""
+        try:
+            client = self.clients.get_openai_client(get_api_key("openai"))
+            
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=config.temperature,
+                max_tokens=config.max_tokens,
+                top_p=config.top_p,
+                frequency_penalty=config.frequency_penalty,
+                presence_penalty=config.presence_penalty,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            async for chunk in response:
+                if chunk.usage:
+                    stream.report_prompt_tokens(chunk.usage.prompt_tokens)
+                    stream.report_completion_tokens(chunk.usage.completion_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
-            raise ValueError(f"Error llamando a Google modelo {model}: {e}")
+            raise ValueError(f"Error llamando a OpenAI modelo {model}: {e}") from e
+    
+    async def _stream_anthropic_model(self, model: str, prompt: str, config: LLMRequestConfig, stream: TextStream) -> AsyncIterator[str]:
+        """Streaming de Anthropic usando el helper messages.stream"""
+        try:
+            client = self.clients.get_anthropic_client(get_api_key("anthropic"))
+            
+            async with client.messages.stream(
+                model=model,
+                max_tokens=config.max_tokens,
+                temperature=config.temperature,
+                messages=[{"role": "user", "content": prompt}]
+            ) as response:
+                async for text in response.text_stream:
+                    yield text
+                final_message = await response.get_final_message()
+                stream.report_prompt_tokens(final_message.usage.input_tokens)
+                stream.report_completion_tokens(final_message.usage.output_tokens)
+        except Exception as e:
+            raise ValueError(f"Error llamando a Anthropic modelo {model}: {e}") from e
+    
+    async def _stream_google_model(self, model: str, prompt: str, config: LLMRequestConfig, stream: TextStream) -> AsyncIterator[str]:
+        """Streaming de Google con generate_content_async(stream=True)"""
+        try:
+            genai = await self.clients.get_google_module_async(get_api_key("google"))
+            model = await self._resolve_google_model(model)
+            model_instance = genai.GenerativeModel(model)
+            
+            generation_config = genai.types.GenerationConfig(
+                temperature=config.temperature,
+                max_output_tokens=config.max_tokens,
+                top_p=config.top_p,
+                top_k=config.top_k
+            )
+            
+            response = await model_instance.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            )
+            
+            async for chunk in response:
+                usage = getattr(chunk, "usage_metadata", None)
+                if usage:
+                    stream.report_prompt_tokens(usage.prompt_token_count)
+                    stream.report_completion_tokens(usage.candidates_token_count)
+                # chunk.text lanza ValueError si el fragmento no trae partes de texto
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            raise ValueError(f"Error llamando a Google modelo {model}: {e}") from e
+    
+    async def _resolve_google_model(self, model: str) -> str:
+        """Valida un modelo de Google y resuelve alias de modelos retirados"""
+        available_models = await self.catalog.get_provider_models("google")
+        if model in available_models:
+            return model
+        
+        # Intentar con modelos alternativos
+        if model in self.config.google_model_aliases:
+            return self.config.google_model_aliases[model]
+        if not any(m.startswith("gemini") for m in available_models):
+            raise ValueError(f"Modelo {model} no disponible. Modelos disponibles: {available_models}")
+        return model
     
     def get_available_providers(self) -> List[str]:
         """Retorna proveedores disponibles"""
         return self.config.get_available_providers()
     
     def _get_provider_from_model(self, model: str) -> str:
-        """Determina el proveedor basado en el nombre del modelo"""
+        """
+        Determina el proveedor basado en el nombre del modelo.
+        Con FAKE_LLM=true todos los modelos van al simulador: el proveedor es
+        "fake" también para el limitador, el planificador, las métricas y el coste.
+        """
+        if settings.fake_llm:
+            return "fake"
         if model.startswith("gpt"):
             return "openai"
         elif model.startswith("claude"):
             return "anthropic"
         elif model.startswith("gemini"):
             return "google"
+        elif model.startswith("fake-"):
+            return "fake"
         else:
             raise ValueError(f"Modelo {model} no reconocido")
 
@@ -0,0 +1,108 @@
+from typing import Dict, Any, Optional
+from collections import deque
+import time
+
+class CallRecord:
+    """Métricas de una llamada individual a un proveedor"""
+
+    def __init__(self, model: str, provider: str):
+        self.model = model
+        self.provider = provider
+        self.started_at = time.time()
+        self.latency = 0.0
+        self.retries = 0
+        self.error_class: Optional[str] = None
+        self.success = False
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.streamed = False
+        self.time_to_first_token: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "provider": self.provider,
+            "started_at": self.started_at,
+            "latency": self.latency,
+            "retries": self.retries,
+            "error_class": self.error_class,
+            "success": self.success,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+            "streamed": self.streamed,
+            "time_to_first_token": self.time_to_first_token
+        }
+
+class CallStats:
+    """
+    Agregados por modelo de las llamadas a proveedores y un historial
+    acotado de las últimas llamadas.
+    """
+
+    def __init__(self, history_size: int = 200):
+        self.recent = deque(maxlen=history_size)
+        self._by_model: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, call: CallRecord):
+        """Registra una llamada terminada"""
+        self.recent.append(call)
+
+        stats = self._by_model.setdefault(call.model, {
+            "provider": call.provider,
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "total_latency": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_cost": 0.0,
+            "success_latency": 0.0,
+            "streams": 0,
+            "first_tokens": 0,
+            "total_time_to_first_token": 0.0,
+            "errors_by_class": {}
+        })
+        stats["calls"] += 1
+        stats["retries"] += call.retries
+        stats["total_latency"] += call.latency
+        stats["prompt_tokens"] += call.prompt_tokens
+        stats["completion_tokens"] += call.completion_tokens
+        stats["total_cost"] += call.cost
+        if call.streamed:
+            stats["streams"] += 1
+        if call.time_to_first_token is not None:
+            stats["first_tokens"] += 1
+            stats["total_time_to_first_token"] += call.time_to_first_token
+        if call.success:
+            stats["success_latency"] += call.latency
+            stats["successes"] += 1
+        else:
+            stats["failures"] += 1
+        if call.error_class:
+            errors = stats["errors_by_class"]
+            errors[call.error_class] = errors.get(call.error_class, 0) + 1
+
+    def get_stats(self, recent: int = 20) -> Dict[str, Any]:
+        """Agregados por modelo y últimas llamadas"""
+        by_model = {}
+        for model, stats in self._by_model.items():
+            by_model[model] = {
+                **stats,
+                "errors_by_class": dict(stats["errors_by_class"]),
+                "avg_latency": stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0,
+                "tokens_per_second": stats["completion_tokens"] / stats["success_latency"] if stats["success_latency"] else 0.0,
+                "avg_cost": stats["total_cost"] / stats["successes"] if stats["successes"] else 0.0,
+                "avg_time_to_first_token": (
+                    stats["total_time_to_first_token"] / stats["first_tokens"] if stats["first_tokens"] else None
+                )
+            }
+        return {
+            "by_model": by_model,
+            "recent_calls": [call.to_dict() for call in list(self.recent)[-recent:]]
+        }
+
+# Instancia global
+call_stats = CallStats()
@@ -0,0 +1,80 @@
+from typing import Any, AsyncIterator, Callable, Optional
+import json
+import time
+from app.llm.models import LLMStreamStats
+
+class TextStream:
+    """
+    Respuesta de texto en streaming de cualquier proveedor.
+    Se itera con `async for chunk in stream` y, al terminar, `stream.stats`
+    contiene el tiempo hasta el primer token y los tokens por segundo.
+    """
+
+    # Aproximación cuando el proveedor no informa tokens de salida
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self,
+                 model: str,
+                 chunks_factory: Callable[["TextStream"], AsyncIterator[str]],
+                 on_finish: Optional[Callable[["TextStream", Optional[BaseException]], None]] = None):
+        self.model = model
+        # El generador del proveedor recibe el stream para informar el uso de tokens
+        self._chunks = chunks_factory(self)
+        self._on_finish = on_finish
+        self._reported_tokens: Optional[int] = None
+        self.reported_prompt_tokens: Optional[int] = None
+        self._characters = 0
+        self.stats = LLMStreamStats(model=model)
+
+    def report_completion_tokens(self, tokens: Optional[int]):
+        """Lo llama el proveedor cuando recibe el bloque de uso"""
+        if tokens:
+            self._reported_tokens = tokens
+
+    def report_prompt_tokens(self, tokens: Optional[int]):
+        """Tokens de prompt informados por el proveedor (si los da)"""
+        if tokens:
+            self.reported_prompt_tokens = tokens
+
+    async def __aiter__(self):
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            async for chunk in self._chunks:
+                if not chunk:
+                    continue
+                if self.stats.time_to_first_token is None:
+                    self.stats.time_to_first_token = time.perf_counter() - start
+                self.stats.chunks += 1
+                self._characters += len(chunk)
+                yield chunk
+        except BaseException as e:
+            # Incluye GeneratorExit si el consumidor abandona el stream
+            error = e
+            raise
+        finally:
+            self._finalize(time.perf_counter() - start)
+            if self._on_finish is not None:
+                self._on_finish(self, error)
+
+    def _finalize(self, total_time: float):
+        self.stats.total_time = total_time
+        if self._reported_tokens is not None:
+            self.stats.completion_tokens = self._reported_tokens
+            self.stats.tokens_estimated = False
+        else:
+            self.stats.completion_tokens = max(1, self._characters // self.CHARS_PER_TOKEN) if self._characters else 0
+
+        # Throughput de generación: desde el primer token hasta el final
+        ttft = self.stats.time_to_first_token or 0.0
+        generation_time = total_time - ttft
+        if self.stats.completion_tokens and generation_time > 0:
+            self.stats.tokens_per_second = self.stats.completion_tokens / generation_time
+
+def format_sse(event: str, data: Any) -> str:
+    """Serializa un evento en formato Server-Sent Events"""
+    if event == "ping":
+        return ": ping\n\n"  # Comentario SSE: mantiene viva la conexión
+    if hasattr(data, "model_dump"):
+        data = data.model_dump(mode="json")
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
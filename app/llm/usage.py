@@ -0,0 +1,60 @@
+from typing import Dict, Any, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from app.llm.models import LLMResponse
+
+class UsageTotals:
+    """Tokens, coste y latencia acumulados de un grupo de llamadas"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.latency = 0.0
+
+    def add(self, response: LLMResponse):
+        if response.cached:
+            # No se volvió a pagar al proveedor
+            self.cached_calls += 1
+            return
+        self.calls += 1
+        self.prompt_tokens += response.prompt_tokens
+        self.completion_tokens += response.completion_tokens
+        self.cost += response.cost
+        self.latency += response.execution_time
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Tokens generados por segundo de llamada (throughput de decodificación)"""
+        return self.completion_tokens / self.latency if self.latency > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+            "tokens_per_second": self.tokens_per_second
+        }
+
+# Acumuladores activos en la operación en curso (se anidan).
+# Como el deadline, se propagan a las tareas creadas con gather/create_task.
+_current_usage: ContextVar[Tuple[UsageTotals, ...]] = ContextVar("llm_usage", default=())
+
+@contextmanager
+def usage_scope():
+    """Acumula el uso de todas las llamadas LLM hechas dentro del bloque"""
+    totals = UsageTotals()
+    token = _current_usage.set(_current_usage.get() + (totals,))
+    try:
+        yield totals
+    finally:
+        _current_usage.reset(token)
+
+def record_usage(response: LLMResponse):
+    """Suma una respuesta a todos los acumuladores activos"""
+    for totals in _current_usage.get():
+        totals.add(response)
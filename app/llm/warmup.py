@@ -0,0 +1,147 @@
+from typing import Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import importlib
+import time
+from app.config import get_api_key
+from app.llm.config import llm_config
+from app.llm.executor import blocking_executor
+from app.llm.service import llm_service
+from app.tracing import trace_scope, span
+
+# Módulo de cada SDK (se importan de forma perezosa en ProviderClientRegistry)
+SDK_MODULES = {
+    "openai": "openai",
+    "anthropic": "anthropic",
+    "google": "google.generativeai"
+}
+
+class WarmupManager:
+    """
+    Calienta el worker antes de recibir tráfico, para que la primera request
+    no pague los imports de los SDKs, la construcción de clientes, el
+    descubrimiento de modelos ni el primer handshake TLS.
+    Lo lanza el lifespan en segundo plano; /ready es false hasta que termina.
+    Los pasos son best-effort: un fallo se informa pero no bloquea el arranque.
+    """
+
+    def __init__(self, config=None, service=None, executor=None):
+        self.config = config or llm_config
+        self.service = service or llm_service
+        self.executor = executor or blocking_executor
+        self.ready = False
+        self.import_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.error: Optional[str] = None  # Fallo fuera de un paso (el worker queda listo igualmente)
+        self._task: Optional[asyncio.Task] = None
+
+    def record_import_time(self, seconds: float):
+        """Tiempo de importar la aplicación (lo mide main.py)"""
+        self.import_seconds = seconds
+
+    def start(self):
+        """Lanza el warm-up en segundo plano (se llama desde el lifespan)"""
+        if not self.config.warmup_enabled:
+            self.ready = True
+            return
+        self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """Cancela el warm-up si la aplicación se apaga antes de terminarlo"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        """
+        Ejecuta los pasos y marca el worker como listo siempre, aunque el
+        warm-up falle fuera de un paso: un worker frío sigue pudiendo atender
+        """
+        start = time.perf_counter()
+        try:
+            await self._run_steps()
+        except Exception as e:
+            self.error = str(e)
+            print(f"⚠️ Warm-up interrumpido: {e!r}")
+        finally:
+            self.startup_seconds = time.perf_counter() - start
+            self.ready = True
+        if self.error is not None:
+            return
+        failed = [name for name, step in self.steps.items() if not step["ok"]]
+        print(f"🔥 Warm-up completado en {self.startup_seconds:.2f}s"
+              + (f" (con errores en: {', '.join(failed)})" if failed else ""))
+
+    async def _run_steps(self):
+        providers = self.service.get_available_providers()
+        real_providers = [provider for provider in providers if provider in SDK_MODULES]
+
+        with trace_scope("startup.warmup", providers=",".join(providers)):
+            # 1. Imports de los SDKs fuera del event loop (son lentos: cientos de ms cada uno)
+            for provider in real_providers:
+                await self._step(f"import:{provider}", lambda provider=provider: self.executor.run(
+                    importlib.import_module, SDK_MODULES[provider]
+                ))
+
+            # 2. Clientes con pool HTTP compartidos
+            for provider in real_providers:
+                await self._step(f"client:{provider}", lambda provider=provider: self._build_client(provider))
+
+            # 3. Catálogo de modelos en memoria
+            await self._step("catalog", self.service.get_available_models)
+
+            # 4. Sonda opcional: una llamada mínima por proveedor abre las conexiones del pool
+            if self.config.warmup_probe_enabled:
+                await asyncio.gather(*[
+                    self._step(f"probe:{provider}", lambda provider=provider: self._probe(provider))
+                    for provider in providers if provider in self.config.warmup_probe_models
+                ])
+
+    async def _step(self, name: str, action: Callable[[], Awaitable[Any]]):
+        step_start = time.perf_counter()
+        with span(f"warmup.{name}"):
+            try:
+                # Cada paso tiene su límite: /ready no espera a un paso colgado
+                # (un import en el pool de hilos sigue en segundo plano)
+                await asyncio.wait_for(action(), self.config.warmup_timeout)
+                self.steps[name] = {"ok": True, "seconds": time.perf_counter() - step_start}
+            except asyncio.TimeoutError:
+                error = f"sin terminar tras {self.config.warmup_timeout}s"
+                print(f"⚠️ Warm-up: {name} {error}")
+                self.steps[name] = {"ok": False, "seconds": time.perf_counter() - step_start, "error": error}
+            except Exception as e:
+                print(f"⚠️ Warm-up: error en {name}: {e}")
+                self.steps[name] = {"ok": False, "seconds": time.perf_counter() - step_start, "error": str(e)}
+
+    async def _build_client(self, provider: str):
+        api_key = get_api_key(provider)
+        if provider == "openai":
+            self.service.clients.get_openai_client(api_key)
+        elif provider == "anthropic":
+            self.service.clients.get_anthropic_client(api_key)
+        elif provider == "google":
+            # genai.configure construye el cliente gRPC: también fuera del loop
+            await self.service.clients.get_google_module_async(api_key)
+
+    async def _probe(self, provider: str):
+        await self.service.generate(
+            "ping",
+            self.config.warmup_probe_models[provider],
+            {"max_tokens": 1, "temperature": 0.0, "bypass_cache": True}
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "startup_seconds": self.startup_seconds,
+            "probe_enabled": self.config.warmup_probe_enabled,
+            "steps": self.steps,
+            "error": self.error
+        }
+
+# Instancia global
+warmup_manager = WarmupManager()
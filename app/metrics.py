@@ -0,0 +1,115 @@
+"""
+Métricas Prometheus de la aplicación.
+
+Con varios workers (gunicorn) hay que definir PROMETHEUS_MULTIPROC_DIR
+(un directorio vacío y escribible) ANTES de arrancar: cada proceso escribe
+sus valores ahí y /metrics los agrega todos.
+"""
+from typing import Tuple
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+# Latencias de llamadas LLM: de cientos de ms a varios minutos
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# Una comparación completa dura más
+COMPARISON_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# ===== LLM =====
+LLM_REQUEST_LATENCY = Histogram(
+    "llm_request_latency_seconds",
+    "Latencia de generate y de los streams completos (incluye cola, rate limit y reintentos)",
+    ["provider", "model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_REQUESTS_IN_FLIGHT = Gauge(
+    "llm_requests_in_flight",
+    "Llamadas LLM en curso, incluidos streams (esperando o ejecutándose)",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+LLM_REQUEST_ERRORS = Counter(
+    "llm_request_errors_total",
+    "Llamadas fallidas por clase de error (rate_limit, overload, timeout, fatal)",
+    ["provider", "model", "error_class"]
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens informados por los proveedores",
+    ["provider", "model", "kind"]
+)
+LLM_COST = Counter(
+    "llm_cost_usd_total",
+    "Coste estimado en USD según LLMConfig.model_prices",
+    ["provider", "model"]
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Tiempo hasta el primer fragmento de las llamadas en streaming",
+    ["provider", "model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_STREAM_TOKENS_PER_SECOND = Histogram(
+    "llm_stream_tokens_per_second",
+    "Tokens de salida por segundo tras el primer fragmento (streaming)",
+    ["provider", "model"],
+    buckets=(5.0, 10.0, 20.0, 40.0, 60.0, 80.0, 100.0, 150.0, 200.0, 400.0)
+)
+LLM_CACHE_HITS = Counter(
+    "llm_cache_hits_total",
+    "Respuestas servidas desde la cache o compartidas con una llamada idéntica",
+    ["provider", "model"]
+)
+
+# ===== PLANIFICADOR Y LIMITADOR =====
+SCHEDULER_QUEUED = Gauge(
+    "llm_scheduler_queued",
+    "Llamadas esperando un hueco de concurrencia",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+SCHEDULER_ACTIVE = Gauge(
+    "llm_scheduler_active",
+    "Llamadas ocupando un hueco de concurrencia",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+RATE_LIMIT_WAITING = Gauge(
+    "llm_rate_limit_waiting",
+    "Llamadas esperando cupo en el limitador de tasa",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+
+# ===== SUMMARIZATION =====
+SUMMARIZATION_STAGE_LATENCY = Histogram(
+    "summarization_stage_latency_seconds",
+    "Latencia por modelo de cada etapa de la comparación",
+    ["stage", "model"],
+    buckets=LATENCY_BUCKETS
+)
+COMPARISON_DURATION = Histogram(
+    "summarization_comparison_duration_seconds",
+    "Distribución de total_execution_time de las comparaciones",
+    ["sampling_mode", "timed_out"],
+    buckets=COMPARISON_BUCKETS
+)
+EVALUATOR_PARSE_FAILURES = Counter(
+    "summarization_evaluator_parse_failures_total",
+    "Resúmenes cuya evaluación no se pudo parsear tras las re-preguntas"
+)
+EVALUATOR_REASKS = Counter(
+    "summarization_evaluator_reasks_total",
+    "Re-preguntas al evaluador por evaluaciones sin parsear"
+)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposición en formato texto; agrega todos los procesos en modo multiproceso"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
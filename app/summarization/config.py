@@ -1,4 +1,5 @@
 from typing import List
+import os
 
 class SummarizationConfig:
     """
@@ -12,11 +13,46 @@ class SummarizationConfig:
         self.default_max_words = 100
         self.min_words = 20
         self.max_words_limit = 500
+        self.generation_deadline_fraction = 0.7  # Parte del deadline para generar; el resto para evaluar
+        
+        # ===== MUESTREO ADAPTATIVO (sampling_mode="adaptive") =====
+        self.adaptive_initial_samples = 2  # Muestras por modelo en la primera ronda
+        self.adaptive_round_samples = 1  # Muestras extra por modelo en cada ronda siguiente
+        self.adaptive_max_samples_per_model = 8
+        self.adaptive_max_total_samples = 24  # Presupuesto de muestras de toda la comparación
+        self.adaptive_confidence = 0.95  # Probabilidad de victoria del líder para parar
+        self.adaptive_min_win_probability = 0.05  # Por debajo, el modelo deja de muestrear
+        self.adaptive_bootstrap_iterations = 2000
+        self.adaptive_min_score_std = 1.0  # Ruido mínimo del bootstrap suavizado (scores 3-15)
+        
+        # ===== BATCH DE COMPARACIONES =====
+        self.batch_max_concurrent_texts = 10  # Textos en curso a la vez dentro de un batch
+        
+        # ===== JOBS ASÍNCRONOS DE COMPARACIÓN =====
+        self.jobs_db_path = os.path.join("data", "summarization_jobs.sqlite3")
+        self.jobs_workers = 2  # Comparaciones simultáneas en segundo plano por proceso
+        self.jobs_poll_interval = 2.0  # segundos entre sondeos de jobs pendientes
+        self.jobs_lease_seconds = 300  # Sin progreso durante este tiempo, el job se retoma
+        self.jobs_max_attempts = 3
+        
+        # ===== DEDUPLICACIÓN DE MUESTRAS ANTES DE EVALUAR =====
+        self.dedup_enabled = True  # Evaluar una sola vez los resúmenes casi idénticos
+        self.dedup_similarity_threshold = 0.9  # Jaccard estimada (MinHash) para considerarlos duplicados
+        self.dedup_num_perm = 64  # Permutaciones de la firma MinHash
+        self.dedup_shingle_size = 3  # Palabras por shingle
+        
+        # ===== PUNTUACIÓN LOCAL ANTES DEL EVALUADOR =====
+        self.local_scoring_enabled = True  # Fallos evidentes no se envían al evaluador
+        self.local_min_length_ratio = 0.2  # Menos de 20% de max_words: vacío o truncado
+        self.local_max_length_ratio = 3.0  # Más de 3x max_words: demasiado largo
+        self.local_max_copy_recall = 0.9  # ROUGE-L recall del original a partir del cual es una copia
         
         # ===== CONFIGURACIÓN DEL EVALUADOR =====
         self.evaluator_model = "gpt-3.5-turbo"  # Modelo más barato para evaluar
         self.evaluation_temperature = 0.1
         self.evaluation_max_tokens = 10  # Solo necesitamos un número
+        self.evaluation_output_mode = "json"  # "json" (salida estructurada) o "text" (formato RESUMEN N:)
+        self.evaluation_max_reasks = 1  # Re-preguntas solo para los resúmenes sin parsear
         
         # ===== PROMPTS INTERNOS DEL MÓDULO =====
         self.summary_prompt_template = (
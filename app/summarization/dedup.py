@@ -0,0 +1,118 @@
+from typing import List, Dict, Any, Tuple
+import hashlib
+import random
+import re
+from app.summarization.config import summarization_config
+
+_WORD_PATTERN = re.compile(r'\w+')
+# Primo de Mersenne 2^61 - 1 para las permutaciones (a*x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+
+class DedupResult:
+    """Agrupación de resúmenes casi idénticos"""
+
+    def __init__(self, summaries: List[str], representatives: List[int], assignments: List[int], diversity_score: float):
+        self.summaries = summaries
+        self.representatives = representatives  # Índice del primer resumen de cada grupo
+        self.assignments = assignments  # Grupo de cada resumen
+        self.diversity_score = diversity_score
+
+    @property
+    def unique_summaries(self) -> List[str]:
+        return [self.summaries[i] for i in self.representatives]
+
+    @property
+    def duplicates(self) -> int:
+        return len(self.summaries) - len(self.representatives)
+
+class MinHashDeduplicator:
+    """
+    Detecta resúmenes casi idénticos con shingles de palabras y firmas MinHash.
+    La similitud Jaccard estimada entre firmas decide si dos resúmenes se
+    evalúan una sola vez. Con pocas muestras por modelo basta comparar cada
+    firma con los representantes de los grupos (no hace falta LSH).
+    """
+
+    def __init__(self, config=None):
+        self.config = config or summarization_config
+        rng = random.Random(42)  # Permutaciones fijas: firmas comparables entre llamadas
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(self.config.dedup_num_perm)
+        ]
+
+        # Métricas
+        self.summaries_seen = 0
+        self.duplicates_skipped = 0
+
+    def _shingles(self, text: str) -> set:
+        words = _WORD_PATTERN.findall(text.lower())
+        size = self.config.dedup_shingle_size
+        if len(words) <= size:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """Firma MinHash: mínimo de cada permutación sobre los hashes de los shingles"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in self._shingles(text)
+        ]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        )
+
+    @staticmethod
+    def estimate_similarity(signature1: Tuple[int, ...], signature2: Tuple[int, ...]) -> float:
+        """Jaccard estimada: fracción de posiciones iguales en las firmas"""
+        if not signature1:
+            return 0.0
+        return sum(1 for x, y in zip(signature1, signature2) if x == y) / len(signature1)
+
+    def deduplicate(self, summaries: List[str]) -> DedupResult:
+        """Agrupa los resúmenes cuya similitud supera dedup_similarity_threshold"""
+        signatures = [self.signature(summary) for summary in summaries]
+
+        representatives: List[int] = []
+        assignments: List[int] = []
+        for i, signature in enumerate(signatures):
+            group = None
+            if self.config.dedup_enabled:
+                group = next((
+                    g for g, rep in enumerate(representatives)
+                    if self.estimate_similarity(signature, signatures[rep]) >= self.config.dedup_similarity_threshold
+                ), None)
+            if group is None:
+                representatives.append(i)
+                group = len(representatives) - 1
+            assignments.append(group)
+
+        result = DedupResult(summaries, representatives, assignments, self._diversity(signatures))
+        self.summaries_seen += len(summaries)
+        self.duplicates_skipped += result.duplicates
+        return result
+
+    def diversity(self, summaries: List[str]) -> float:
+        """Diversidad de un conjunto de resúmenes sin agruparlos ni contarlos en las métricas"""
+        return self._diversity([self.signature(summary) for summary in summaries])
+
+    def _diversity(self, signatures: List[Tuple[int, ...]]) -> float:
+        """Distancia Jaccard media entre pares (0 = todos iguales, 100 = nada en común)"""
+        if len(signatures) < 2:
+            return 0.0
+        distances = [
+            1.0 - self.estimate_similarity(signatures[i], signatures[j])
+            for i in range(len(signatures))
+            for j in range(i + 1, len(signatures))
+        ]
+        return sum(distances) / len(distances) * 100
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.dedup_enabled,
+            "similarity_threshold": self.config.dedup_similarity_threshold,
+            "summaries_seen": self.summaries_seen,
+            "duplicates_skipped": self.duplicates_skipped,
+            "duplicate_rate": self.duplicates_skipped / self.summaries_seen if self.summaries_seen else 0.0
+        }
@@ -1,9 +1,36 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
+import json
 import re
 from app.summarization.config import summarization_config
 from app.summarization.models import EvaluationScore
+from app.summarization.dedup import DedupResult
+from app.summarization.local_scoring import LocalScorer, STOP_WORDS
 from app.llm.service import llm_service
+from app.llm.executor import blocking_executor
+from app.metrics import EVALUATOR_PARSE_FAILURES, EVALUATOR_REASKS
+from app.tracing import span
+
+# ===== PARSER DE EVALUACIONES (patrones precompilados) =====
+# Objetos JSON planos completos: permite aprovechar una respuesta truncada
+_JSON_OBJECT_PATTERN = re.compile(r'\{[^{}]*\}')
+_SUMMARY_HEADER_PATTERN = re.compile(r'RESUMEN\s*#?\s*(\d+)', re.IGNORECASE)
+# Tolerante a markdown y separadores: "**PRECISIÓN**: 4", "Precision = 4/5"...
+_SCORE_PATTERNS = {
+    'precision': re.compile(r'PRECISI[OÓ]N\W*?(\d+)', re.IGNORECASE),
+    'completeness': re.compile(r'COMPLETITUD\W*?(\d+)', re.IGNORECASE),
+    'clarity': re.compile(r'CLARIDAD\W*?(\d+)', re.IGNORECASE)
+}
+_COMMENT_PATTERN = re.compile(r'COMENTARIO\W*(.+)', re.IGNORECASE)
+_INTEGER_PATTERN = re.compile(r'\d+')
+# Claves aceptadas en la salida JSON del evaluador
+_JSON_KEYS = {
+    'resumen': 'index', 'summary': 'index', 'index': 'index',
+    'precision': 'precision', 'precisión': 'precision',
+    'completitud': 'completeness', 'completeness': 'completeness',
+    'claridad': 'clarity', 'clarity': 'clarity',
+    'comentario': 'comment', 'comment': 'comment'
+}
 
 class SummarizationEvaluator:
     """
@@ -14,19 +41,35 @@ class SummarizationEvaluator:
     def __init__(self):
         self.config = summarization_config
         self.llm_service = llm_service  # Import directo - más simple
+        self.local_scorer = LocalScorer()
+        
+        # Métricas del parseo de respuestas del evaluador
+        self.summaries_requested = 0
+        self.parsed_first_try = 0
+        self.reasks = 0
+        self.reasked_summaries = 0
+        self.parse_failures = 0
     
     async def evaluate_summaries(self, 
                                 original_text: str, 
                                 summaries: List[str], 
-                                model_name: str) -> EvaluationScore:
+                                model_name: str,
+                                dedup: Optional[DedupResult] = None,
+                                max_words: Optional[int] = None) -> EvaluationScore:
         """
         NUEVO SISTEMA SIMPLE: Evalúa cada resumen en 3 áreas clave:
         1. PRECISIÓN (1-5): ¿Es correcto?
         2. COMPLETITUD (1-5): ¿Cubre todo lo importante?
         3. CLARIDAD (1-5): ¿Es fácil de entender?
+        
+        Si se pasa dedup (calculado sobre los resúmenes válidos), cada grupo de
+        resúmenes casi idénticos se evalúa una vez y su puntuación se replica.
+        Los fallos evidentes que detecta LocalScorer (vacío, truncado, muy largo,
+        copia del original) reciben la puntuación mínima sin llamar al evaluador.
         """
         # Filtrar resúmenes válidos (no errores)
-        valid_summaries = [s for s in summaries if not s.startswith("Error:")]
+        valid_summaries = self.filter_valid_summaries(summaries)
+        diversity_score = dedup.diversity_score if dedup else 0.0
         
         if not valid_summaries:
             return EvaluationScore(
@@ -39,38 +82,119 @@ class SummarizationEvaluator:
                 evaluation_details=[]
             )
         
+        # Métricas locales de todas las muestras en una sola pasada
+        # (TF-IDF, ROUGE y LCS: decenas de ms, fuera del event loop)
+        with span("evaluator.local_scoring", summaries=len(valid_summaries)):
+            local_scores = await blocking_executor.run(self.local_scorer.score, original_text, valid_summaries, max_words)
+        
         try:
-            # Evaluar cada resumen con el nuevo sistema
-            evaluation_results = await self._evaluate_summaries_simple(
-                original_text, valid_summaries, model_name
-            )
+            # Representante de cada resumen (él mismo si no hay deduplicación)
+            if dedup is not None:
+                representative_of = [dedup.representatives[group] for group in dedup.assignments]
+            else:
+                representative_of = list(range(len(valid_summaries)))
+            
+            # Quién se evalúa por cada resumen sin fallos evidentes: su representante
+            # o, si este es un fallo evidente, el primer miembro sano del grupo
+            # (el 1/1/1 local no se replica en duplicados que no lo merecen)
+            grader_of: List[Optional[int]] = []
+            fallback_graders: Dict[int, int] = {}
+            for i, representative in enumerate(representative_of):
+                if 'reject_reason' in local_scores[i]:
+                    grader_of.append(None)
+                elif 'reject_reason' not in local_scores[representative]:
+                    grader_of.append(representative)
+                else:
+                    grader_of.append(fallback_graders.setdefault(representative, i))
+            
+            # Al evaluador solo van los resúmenes que evalúan a su grupo
+            to_grade = sorted({grader for grader in grader_of if grader is not None})
+            graded = {}
+            if to_grade:
+                llm_results = await self._evaluate_summaries_simple(
+                    original_text, [valid_summaries[i] for i in to_grade], model_name
+                )
+                graded = dict(zip(to_grade, llm_results))
+            
+            # Replicar la evaluación en los duplicados
+            evaluation_results = []
+            for i, grader in enumerate(grader_of):
+                if grader is None:
+                    result = self._local_reject_result(local_scores[i]['reject_reason'])
+                    source = representative_of[i]
+                else:
+                    result = dict(graded[grader])
+                    source = grader
+                if source != i:
+                    result['duplicate_of'] = source
+                evaluation_results.append(result)
+            
+            # El evaluador no puntuó nada: sin puntuación (los fallos locales solos no compiten)
+            if to_grade and not any(graded[i]['parsed'] for i in to_grade):
+                print(f"⚠️ El evaluador no puntuó ningún resumen de {model_name}")
+                return EvaluationScore(
+                    model=model_name,
+                    similarity_scores=[0.0],
+                    average_score=0.0,
+                    best_score=0.0,
+                    worst_score=0.0,
+                    consistency_score=0.0,
+                    individual_summaries=valid_summaries,
+                    evaluation_details=evaluation_results,
+                    evaluation_failed=True,
+                    parse_failures=len(to_grade),
+                    reasks=max((result.get('reasks', 0) for result in evaluation_results), default=0),
+                    diversity_score=diversity_score,
+                    local_scores=local_scores
+                )
             
             # Extraer scores y detalles
             total_scores = []
             evaluation_details = []
             
             for result in evaluation_results:
-                total_score = result['precision'] + result['completeness'] + result['clarity']
-                total_scores.append(total_score)
+                # Las evaluaciones sin parsear no puntúan (no inventar un 3/3/3)
+                if result['parsed']:
+                    total_score = result['precision'] + result['completeness'] + result['clarity']
+                    total_scores.append(total_score)
                 evaluation_details.append(result)
             
             # Calcular métricas
             average_score = sum(total_scores) / len(total_scores) if total_scores else 0
             best_score = max(total_scores) if total_scores else 0
             worst_score = min(total_scores) if total_scores else 0
-            consistency = self._calculate_consistency(total_scores)
+            consistency = self._calculate_consistency(total_scores) if total_scores else 0.0
             
             return EvaluationScore(
                 model=model_name,
-                similarity_scores=total_scores,  # Ahora son scores totales (3-15)
+                similarity_scores=total_scores or [0.0],  # Ahora son scores totales (3-15)
                 average_score=average_score,
                 best_score=best_score,
                 worst_score=worst_score,
                 consistency_score=consistency,
                 individual_summaries=valid_summaries,
-                evaluation_details=evaluation_details  # Detalles de la evaluación
+                evaluation_details=evaluation_details,  # Detalles de la evaluación
+                parse_failures=len(evaluation_results) - len(total_scores),
+                reasks=max((result.get('reasks', 0) for result in evaluation_results), default=0),
+                diversity_score=diversity_score,
+                local_scores=local_scores
             )
             
+        except asyncio.TimeoutError:
+            print(f"⏱️ Tiempo agotado evaluando resúmenes de {model_name}")
+            return EvaluationScore(
+                model=model_name,
+                similarity_scores=[0.0],
+                average_score=0.0,
+                best_score=0.0,
+                worst_score=0.0,
+                consistency_score=0.0,
+                individual_summaries=valid_summaries,
+                evaluation_details=[],
+                timed_out=True,
+                diversity_score=diversity_score,
+                local_scores=local_scores
+            )
         except Exception as e:
             print(f"Error evaluando resúmenes de {model_name}: {e}")
             return EvaluationScore(
@@ -80,18 +204,198 @@ class SummarizationEvaluator:
                 best_score=0.0,
                 worst_score=0.0,
                 consistency_score=0.0,
-                evaluation_details=[]
+                evaluation_details=[],
+                evaluation_failed=True
             )
     
+    def merge_evaluations(self,
+                          model_name: str,
+                          parts: List[EvaluationScore],
+                          diversity_score: float = 0.0) -> EvaluationScore:
+        """
+        Une las evaluaciones de varias rondas de un mismo modelo (muestreo
+        adaptativo) y recalcula las métricas sobre todas las muestras.
+        Las rondas sin detalles (deadline o error) no aportan resúmenes.
+        """
+        summaries: List[str] = []
+        details: List[Dict[str, Any]] = []
+        local_scores: List[Dict[str, Any]] = []
+        for part in parts:
+            if len(part.evaluation_details) != len(part.individual_summaries):
+                continue
+            offset = len(summaries)
+            for detail in part.evaluation_details:
+                detail = dict(detail)
+                if 'duplicate_of' in detail:
+                    detail['duplicate_of'] += offset
+                details.append(detail)
+            summaries.extend(part.individual_summaries)
+            local_scores.extend(part.local_scores)
+        
+        # Sin ninguna puntuación del evaluador en ninguna ronda, los fallos locales no compiten
+        evaluation_failed = any(part.evaluation_failed for part in parts) and not any(
+            d['parsed'] and not d.get('short_circuited') for d in details
+        )
+        total_scores = [] if evaluation_failed else [
+            d['precision'] + d['completeness'] + d['clarity'] for d in details if d['parsed']
+        ]
+        return EvaluationScore(
+            model=model_name,
+            similarity_scores=total_scores or [0.0],
+            average_score=sum(total_scores) / len(total_scores) if total_scores else 0.0,
+            best_score=max(total_scores) if total_scores else 0.0,
+            worst_score=min(total_scores) if total_scores else 0.0,
+            consistency_score=self._calculate_consistency(total_scores) if total_scores else 0.0,
+            individual_summaries=summaries,
+            evaluation_details=details,
+            # Solo sin puntuaciones cuenta como evaluación vencida (rondas parciales sí puntúan)
+            timed_out=not total_scores and any(part.timed_out for part in parts),
+            evaluation_failed=evaluation_failed,
+            parse_failures=sum(part.parse_failures for part in parts),
+            reasks=sum(part.reasks for part in parts),
+            diversity_score=diversity_score,
+            local_scores=local_scores,
+            prompt_tokens=sum(part.prompt_tokens for part in parts),
+            completion_tokens=sum(part.completion_tokens for part in parts),
+            cost=sum(part.cost for part in parts)
+        )
+    
+    def _local_reject_result(self, reason: str) -> Dict[str, Any]:
+        """Evaluación mínima para un fallo evidente detectado localmente"""
+        return {
+            'precision': 1,
+            'completeness': 1,
+            'clarity': 1,
+            'comment': reason,
+            'parsed': True,
+            'short_circuited': True
+        }
+    
+    def filter_valid_summaries(self, summaries: List[str]) -> List[str]:
+        """Descarta los marcadores de error de la generación"""
+        return [s for s in summaries if not s.startswith("Error:")]
+    
     async def _evaluate_summaries_simple(self, original_text: str, summaries: List[str], model_name: str) -> List[Dict[str, Any]]:
         """
         NUEVO MÉTODO SIMPLE: Evalúa cada resumen en las 3 áreas clave usando el modelo evaluador.
+        Los resúmenes cuya evaluación no se pudo parsear se vuelven a preguntar
+        (solo esos) hasta evaluation_max_reasks veces; si aun así fallan quedan
+        marcados con parsed=False y sin puntuación, en vez de un 3/3/3 inventado.
         """
-        try:
-            # Crear prompt para evaluación simple
-            summaries_text = "\n\n".join([f"RESUMEN {i+1}:\n{summary}" for i, summary in enumerate(summaries)])
-            
-            evaluation_prompt = f"""
+        json_mode = self.config.evaluation_output_mode == "json"
+        
+        # Configuración para el modelo evaluador
+        eval_config = {
+            "temperature": 0.1,  # Más determinístico para evaluación
+            "max_tokens": 1000,
+            "top_p": 1.0,
+            "top_k": 50,
+            "frequency_penalty": 0.0,
+            "presence_penalty": 0.0,
+            "stream": False
+        }
+        if json_mode:
+            eval_config["response_format"] = "json"
+        
+        parsed: Dict[int, Dict[str, Any]] = {}
+        pending = list(range(len(summaries)))
+        reasks = 0
+        self.summaries_requested += len(summaries)
+        
+        for attempt in range(self.config.evaluation_max_reasks + 1):
+            if attempt > 0:
+                reasks += 1
+                self.reasks += 1
+                self.reasked_summaries += len(pending)
+                EVALUATOR_REASKS.inc()
+                print(f"🔁 Re-preguntando {len(pending)} evaluación(es) sin parsear de {model_name}")
+            
+            batch = [summaries[i] for i in pending]
+            try:
+                # Generar evaluación usando el modelo evaluador
+                with span("evaluator.request", attempt=attempt, summaries=len(batch)):
+                    evaluation_text = await self.llm_service.generate_text(
+                        prompt=self._build_evaluation_prompt(original_text, batch, json_mode),
+                        model=self.config.evaluator_model,
+                        config=eval_config
+                    )
+            except asyncio.TimeoutError:
+                # El deadline de la comparación venció: no inventar puntuaciones.
+                # Sin respuesta no cuentan como pedidos; tras un fallo de parseo
+                # sin re-pregunta completada, como fallos
+                if attempt == 0:
+                    self.summaries_requested -= len(pending)
+                else:
+                    self.parse_failures += len(pending)
+                    EVALUATOR_PARSE_FAILURES.inc(len(pending))
+                raise
+            except Exception as e:
+                print(f"Error en evaluación simple: {e}")
+                break
+            
+            # Parsear la respuesta del evaluador (índices relativos al lote)
+            with span("evaluator.parse", attempt=attempt) as parse_span:
+                batch_results = self._parse_evaluation_response(evaluation_text, len(batch))
+                parse_span.set_attribute("parsed", len(batch_results))
+            for batch_index, result in batch_results.items():
+                parsed[pending[batch_index]] = result
+            if attempt == 0:
+                self.parsed_first_try += len(parsed)
+            pending = [i for i in pending if i not in parsed]
+            if not pending:
+                break
+        
+        self.parse_failures += len(pending)
+        EVALUATOR_PARSE_FAILURES.inc(len(pending))
+        
+        results = []
+        for i in range(len(summaries)):
+            if i in parsed:
+                results.append({**parsed[i], 'parsed': True, 'reasks': reasks})
+            else:
+                results.append({
+                    'precision': None,
+                    'completeness': None,
+                    'clarity': None,
+                    'comment': 'No se pudo evaluar correctamente',
+                    'parsed': False,
+                    'reasks': reasks
+                })
+        return results
+    
+    def _build_evaluation_prompt(self, original_text: str, summaries: List[str], json_mode: bool) -> str:
+        """Prompt de evaluación con la rúbrica y el formato de respuesta pedido"""
+        summaries_text = "\n\n".join([f"RESUMEN {i+1}:\n{summary}" for i, summary in enumerate(summaries)])
+        
+        if json_mode:
+            example = ", ".join(
+                f'{{"resumen": {i+1}, "precision": [1-5], "completitud": [1-5], "claridad": [1-5], '
+                f'"comentario": "[1 línea explicando el problema principal o fortaleza]"}}'
+                for i in range(len(summaries))
+            )
+            response_format = f"""## FORMATO DE RESPUESTA
+
+Responde SOLO con un objeto JSON, sin texto adicional, con una entrada por resumen:
+
+{{"evaluaciones": [{example}]}}
+"""
+        else:
+            blocks = "\n\n".join(
+                f"""RESUMEN {i+1}:
+PRECISIÓN: [1-5]
+COMPLETITUD: [1-5]
+CLARIDAD: [1-5]
+COMENTARIO: [1 línea explicando el problema principal o fortaleza]"""
+                for i in range(len(summaries))
+            )
+            response_format = f"""## FORMATO DE RESPUESTA
+
+Para cada resumen, responde EXACTAMENTE en este formato:
+
+{blocks}
+"""
+        
+        return f"""
 # Evaluación Simple de Modelos de Resumen
 
 ## TEXTO ORIGINAL:
@@ -125,119 +429,104 @@ Para cada resumen, evalúa estas **3 áreas clave**:
 
 **Puntaje: 1-5** (5 = muy claro, 1 = confuso)
 
-## FORMATO DE RESPUESTA
-
-Para cada resumen, responde EXACTAMENTE en este formato:
-
-RESUMEN 1:
-PRECISIÓN: [1-5]
-COMPLETITUD: [1-5] 
-CLARIDAD: [1-5]
-COMENTARIO: [1 línea explicando el problema principal o fortaleza]
-
-RESUMEN 2:
-PRECISIÓN: [1-5]
-COMPLETITUD: [1-5]
-CLARIDAD: [1-5] 
-COMENTARIO: [1 línea explicando el problema principal o fortaleza]
-
-RESUMEN 3:
-PRECISIÓN: [1-5]
-COMPLETITUD: [1-5]
-CLARIDAD: [1-5]
-COMENTARIO: [1 línea explicando el problema principal o fortaleza]
-"""
-            
-            # Configuración para el modelo evaluador
-            eval_config = {
-                "temperature": 0.1,  # Más determinístico para evaluación
-                "max_tokens": 1000,
-                "top_p": 1.0,
-                "top_k": 50,
-                "frequency_penalty": 0.0,
-                "presence_penalty": 0.0,
-                "stream": False
-            }
-            
-            # Generar evaluación usando el modelo evaluador
-            evaluation_text = await self.llm_service.generate_text(
-                prompt=evaluation_prompt,
-                model=self.config.evaluator_model,
-                config=eval_config
-            )
-            
-            # Parsear la respuesta del evaluador
-            parsed_results = self._parse_evaluation_response(evaluation_text, len(summaries))
-            
-            return parsed_results
-            
-        except Exception as e:
-            print(f"Error en evaluación simple: {e}")
-            # Retornar evaluación por defecto
-            return [
-                {
-                    'precision': 3,
-                    'completeness': 3,
-                    'clarity': 3,
-                    'comment': 'Error en evaluación'
-                } for _ in summaries
-            ]
+{response_format}"""
     
-    def _parse_evaluation_response(self, response: str, expected_count: int) -> List[Dict[str, Any]]:
+    def _parse_evaluation_response(self, response: str, expected_count: int) -> Dict[int, Dict[str, Any]]:
         """
         Parsea la respuesta del evaluador y extrae los scores.
+        Retorna {índice del resumen (desde 0): resultado} solo para los resúmenes
+        evaluados correctamente. Acepta JSON (aunque venga truncado o dentro de
+        un bloque de código) y, si no lo hay, el formato de texto RESUMEN N:.
         """
-        results = []
+        results = self._parse_json_evaluations(response, expected_count)
+        if not results:
+            results = self._parse_text_evaluations(response, expected_count)
+        return results
+    
+    def _parse_json_evaluations(self, response: str, expected_count: int) -> Dict[int, Dict[str, Any]]:
+        """Extrae cada objeto plano {...} completo, así sobrevive a un JSON cortado"""
+        results = {}
+        position = 0
+        for match in _JSON_OBJECT_PATTERN.finditer(response):
+            try:
+                data = json.loads(match.group(0))
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            fields = {_JSON_KEYS[key.lower()]: value for key, value in data.items() if key.lower() in _JSON_KEYS}
+            
+            scores = self._validate_scores(fields.get('precision'), fields.get('completeness'), fields.get('clarity'))
+            if scores is None:
+                continue
+            
+            index = self._to_int(fields.get('index'))
+            index = index - 1 if index is not None else position
+            position += 1
+            if 0 <= index < expected_count and index not in results:
+                results[index] = {**scores, 'comment': str(fields.get('comment', '')).strip()}
+        return results
+    
+    def _parse_text_evaluations(self, response: str, expected_count: int) -> Dict[int, Dict[str, Any]]:
+        """Formato de texto: un bloque por cabecera RESUMEN N, campos en cualquier orden"""
+        results = {}
+        headers = list(_SUMMARY_HEADER_PATTERN.finditer(response))
+        for i, header in enumerate(headers):
+            block_end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+            block = response[header.end():block_end]
+            
+            found = {field: pattern.search(block) for field, pattern in _SCORE_PATTERNS.items()}
+            if not all(found.values()):
+                continue
+            scores = self._validate_scores(*(found[field].group(1) for field in ('precision', 'completeness', 'clarity')))
+            if scores is None:
+                continue
+            
+            index = int(header.group(1)) - 1
+            if 0 <= index < expected_count and index not in results:
+                comment = _COMMENT_PATTERN.search(block)
+                results[index] = {**scores, 'comment': comment.group(1).strip() if comment else ''}
+        return results
+    
+    def _validate_scores(self, precision: Any, completeness: Any, clarity: Any) -> Optional[Dict[str, int]]:
+        """Scores enteros acotados a 1-5, o None si falta o no es numérico alguno"""
+        values = [self._to_int(value) for value in (precision, completeness, clarity)]
+        if any(value is None for value in values):
+            return None
         
-        try:
-            import re
-            
-            # Buscar patrones para cada resumen
-            pattern = r'RESUMEN\s+(\d+):\s*PRECISIÓN:\s*(\d+)\s*COMPLETITUD:\s*(\d+)\s*CLARIDAD:\s*(\d+)\s*COMENTARIO:\s*(.+?)(?=RESUMEN\s+\d+:|$)'
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            
-            for match in matches:
-                try:
-                    precision = int(match[1])
-                    completeness = int(match[2])
-                    clarity = int(match[3])
-                    comment = match[4].strip()
-                    
-                    # Validar rangos
-                    precision = max(1, min(5, precision))
-                    completeness = max(1, min(5, completeness))
-                    clarity = max(1, min(5, clarity))
-                    
-                    results.append({
-                        'precision': precision,
-                        'completeness': completeness,
-                        'clarity': clarity,
-                        'comment': comment
-                    })
-                except ValueError:
-                    continue
-            
-            # Si no se parsearon suficientes resultados, completar con valores por defecto
-            while len(results) < expected_count:
-                results.append({
-                    'precision': 3,
-                    'completeness': 3,
-                    'clarity': 3,
-                    'comment': 'No se pudo evaluar correctamente'
-                })
-            
-            return results[:expected_count]
-            
-        except Exception as e:
-            print(f"Error parseando evaluación: {e}")
-            return [
-                {
-                    'precision': 3,
-                    'completeness': 3,
-                    'clarity': 3,
-                    'comment': 'Error en parseo'
-                } for _ in range(expected_count)
-            ]
+        # Validar rangos
+        precision, completeness, clarity = (max(1, min(5, value)) for value in values)
+        return {
+            'precision': precision,
+            'completeness': completeness,
+            'clarity': clarity
+        }
+    
+    def _to_int(self, value: Any) -> Optional[int]:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return int(value)
+        if isinstance(value, str):
+            match = _INTEGER_PATTERN.search(value)
+            if match:
+                return int(match.group(0))
+        return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Tasa de parseo de las respuestas del evaluador y re-preguntas realizadas"""
+        requested = self.summaries_requested
+        return {
+            "output_mode": self.config.evaluation_output_mode,
+            "summaries_requested": requested,
+            "parsed_first_try": self.parsed_first_try,
+            "parse_success_rate": (requested - self.parse_failures) / requested if requested else 1.0,
+            "first_try_success_rate": self.parsed_first_try / requested if requested else 1.0,
+            "reasks": self.reasks,
+            "reasked_summaries": self.reasked_summaries,
+            "parse_failures": self.parse_failures,
+            "local_scoring": self.local_scorer.get_stats()
+        }
     
     async def _generate_general_reconstruction(self, original: str, summaries: List[str]) -> str:
         """
@@ -356,7 +645,6 @@ COMENTARIO: [1 línea explicando el problema principal o fortaleza]
         reconstructions = []
         
         # Buscar patrones como "Reconstrucción 1:", "Reconstrucción 2:", etc.
-        import re
         pattern = r'Reconstrucción\s+\d+:\s*(.*?)(?=Reconstrucción\s+\d+:|$)'
         matches = re.findall(pattern, text, re.DOTALL)
         
@@ -447,15 +735,11 @@ COMENTARIO: [1 línea explicando el problema principal o fortaleza]
         if not text1 or not text2:
             return 0.0
         
-        # Limpiar textos
-        text1_clean = text1.lower().strip()
-        text2_clean = text2.lower().strip()
-        
-        # Dividir en palabras y quitar palabras vacías comunes
-        stop_words = {'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo', 'le', 'da', 'su', 'por', 'son', 'con', 'para', 'al', 'del', 'los', 'las', 'una', 'como', 'pero', 'sus', 'le', 'ya', 'o', 'porque', 'cuando', 'muy', 'sin', 'sobre', 'también', 'me', 'hasta', 'donde', 'quien', 'desde', 'nos', 'durante', 'todos', 'uno', 'otro', 'esta', 'este', 'esta', 'estos', 'estas'}
-        
-        words1 = set(word for word in text1_clean.split() if word not in stop_words and len(word) > 2)
-        words2 = set(word for word in text2_clean.split() if word not in stop_words and len(word) > 2)
+        # Dividir en palabras y quitar palabras vacías comunes (las de LocalScorer).
+        # Sin quitar la puntuación, a diferencia de tokenize(): las puntuaciones
+        # históricas de similitud no cambian
+        words1 = set(word for word in text1.lower().split() if word not in STOP_WORDS and len(word) > 2)
+        words2 = set(word for word in text2.lower().split() if word not in STOP_WORDS and len(word) > 2)
         
         if not words1 or not words2:
             return 0.0
@@ -515,10 +799,11 @@ COMENTARIO: [1 línea explicando el problema principal o fortaleza]
         summary_parts = []
         
         for result in evaluation_results:
-            # Calcular fortalezas
-            avg_precision = sum(detail.get('precision', 0) for detail in result.evaluation_details) / len(result.evaluation_details) if result.evaluation_details else 0
-            avg_completeness = sum(detail.get('completeness', 0) for detail in result.evaluation_details) / len(result.evaluation_details) if result.evaluation_details else 0
-            avg_clarity = sum(detail.get('clarity', 0) for detail in result.evaluation_details) / len(result.evaluation_details) if result.evaluation_details else 0
+            # Calcular fortalezas (solo con las evaluaciones parseadas)
+            details = [detail for detail in result.evaluation_details if detail.get('parsed', True)]
+            avg_precision = sum(detail.get('precision', 0) for detail in details) / len(details) if details else 0
+            avg_completeness = sum(detail.get('completeness', 0) for detail in details) / len(details) if details else 0
+            avg_clarity = sum(detail.get('clarity', 0) for detail in details) / len(details) if details else 0
             
             strongest_area = "Precisión" if avg_precision >= avg_completeness and avg_precision >= avg_clarity else \
                            "Completitud" if avg_completeness >= avg_clarity else "Claridad"
@@ -0,0 +1,276 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from app.summarization.config import summarization_config
+from app.summarization.models import SummarizationRequest, ComparisonResponse
+from app.llm.executor import blocking_executor
+
+# ===== ESTADOS DE UN JOB =====
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class JobStore:
+    """
+    Almacén persistente de jobs de comparación en SQLite.
+    Guarda request, estado, progreso y ComparisonResponse final.
+    Los jobs se reclaman con un lease: si el worker que lo ejecutaba muere,
+    el lease vence y otro worker (o el mismo tras reiniciar) lo retoma.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or summarization_config
+        self._local = threading.local()
+        self._initialized_path = None
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Una conexión por hilo del ejecutor"""
+        path = self.config.jobs_db_path
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "path", None) != path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.path = path
+
+        with self._init_lock:
+            if self._initialized_path != path:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS summarization_jobs ("
+                    "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+                    "progress TEXT, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                    "created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_summarization_jobs_status "
+                    "ON summarization_jobs (status, created_at)"
+                )
+                self._initialized_path = path
+        return conn
+
+    def create(self, request: SummarizationRequest) -> str:
+        """Crea un job pendiente y retorna su id"""
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO summarization_jobs (id, status, request, progress, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, PENDING, request.model_dump_json(), json.dumps({}), time.time())
+        )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Reclama atómicamente el job pendiente más antiguo (o uno en ejecución
+        con el lease vencido). Retorna el job o None si no hay trabajo.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM summarization_jobs "
+                "WHERE status = ? OR (status = ? AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (PENDING, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE summarization_jobs SET status = ?, started_at = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, now, now + self.config.jobs_lease_seconds, row["id"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def update_progress(self, job_id: str, attempt: int, progress: Dict[str, Any]) -> bool:
+        """
+        Guarda el progreso y renueva el lease del job.
+        Retorna False si el job ya no pertenece a este intento (lease vencido y
+        reclamado por otro worker, o job terminado).
+        """
+        cursor = self._connect().execute(
+            "UPDATE summarization_jobs SET progress = ?, lease_until = ? "
+            "WHERE id = ? AND status = ? AND attempts = ?",
+            (json.dumps(progress), time.time() + self.config.jobs_lease_seconds, job_id, RUNNING, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, attempt: int, result: ComparisonResponse,
+                 progress: Optional[Dict[str, Any]] = None) -> bool:
+        """Marca el job como completado con su resultado (solo si este intento sigue siendo el dueño)"""
+        cursor = self._connect().execute(
+            "UPDATE summarization_jobs SET status = ?, result = ?, progress = COALESCE(?, progress), "
+            "finished_at = ?, lease_until = NULL "
+            "WHERE id = ? AND status = ? AND attempts = ?",
+            (COMPLETED, result.model_dump_json(), json.dumps(progress) if progress is not None else None,
+             time.time(), job_id, RUNNING, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        """Marca el job como fallido (solo si este intento sigue siendo el dueño)"""
+        cursor = self._connect().execute(
+            "UPDATE summarization_jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL "
+            "WHERE id = ? AND status = ? AND attempts = ?",
+            (FAILED, error, time.time(), job_id, RUNNING, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna el job (sin deserializar el resultado) o None"""
+        row = self._connect().execute(
+            "SELECT * FROM summarization_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Número de jobs por estado"""
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) AS total FROM summarization_jobs GROUP BY status"
+        ).fetchall()
+        return {row["status"]: row["total"] for row in rows}
+
+class JobManager:
+    """
+    Ejecuta los jobs de comparación en un pool de workers en segundo plano.
+    Los workers reclaman jobs del JobStore, así que varios procesos pueden
+    compartir la misma base de datos sin ejecutar un job dos veces.
+    """
+
+    def __init__(self, store: JobStore, service, config=None, executor=None):
+        self.config = config or summarization_config
+        self.store = store
+        self.service = service
+        self.executor = executor or blocking_executor
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Arranca los workers (se llama desde el lifespan de la aplicación)"""
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        for i in range(self.config.jobs_workers):
+            self._workers.append(asyncio.ensure_future(self._worker_loop(i)))
+        print(f"🧵 {len(self._workers)} workers de jobs de comparación iniciados")
+
+    async def stop(self):
+        """Detiene los workers; los jobs en curso se retoman al vencer su lease"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, request: SummarizationRequest) -> str:
+        """Persiste un job nuevo y despierta a los workers"""
+        job_id = await self.executor.run(self.store.create, request)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.executor.run(self.store.get, job_id)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "jobs_by_status": await self.executor.run(self.store.count_by_status)
+        }
+
+    async def _worker_loop(self, worker_id: int):
+        while True:
+            try:
+                job = await self.executor.run(self.store.claim_next)
+            except sqlite3.Error as e:
+                print(f"Error reclamando job (worker {worker_id}): {e}")
+                job = None
+
+            if job is None:
+                # Esperar un job nuevo de este proceso o el siguiente sondeo
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.config.jobs_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        attempt = job["attempts"]
+        if attempt > self.config.jobs_max_attempts:
+            await self.executor.run(self.store.fail, job_id, attempt, "Número máximo de intentos superado")
+            return
+
+        print(f"🧵 Ejecutando job {job_id} (intento {attempt})")
+        try:
+            request = SummarizationRequest.model_validate_json(job["request"])
+            progress = {
+                "models_total": len(request.models),
+                # En modo adaptativo es una cota superior: se ajusta a lo muestreado al terminar
+                "samples_total": (
+                    self.service.sampler.max_samples(len(request.models))
+                    if request.sampling_mode == "adaptive"
+                    else len(request.models) * self.config.samples_per_model
+                ),
+                "samples_done": 0,
+                "models_done": 0,
+                "evaluations_done": 0
+            }
+            await self.executor.run(self.store.update_progress, job_id, attempt, progress)
+
+            completed = False
+            stream = self.service.compare_models_stream(request)
+            try:
+                async for event, data in stream:
+                    if event == "sample":
+                        progress["samples_done"] += 1
+                    elif event == "model_result":
+                        progress["models_done"] += 1
+                    elif event == "evaluation":
+                        progress["evaluations_done"] += 1
+                    elif event == "comparison":
+                        progress["samples_total"] = progress["samples_done"]
+                        if await self.executor.run(self.store.complete, job_id, attempt, data, progress):
+                            print(f"✅ Job {job_id} completado")
+                        else:
+                            print(f"⚠️ Job {job_id}: el intento {attempt} perdió el lease, se descarta su resultado")
+                        completed = True
+                        continue
+                    # Cada evento (incluido ping) renueva el lease
+                    if not await self.executor.run(self.store.update_progress, job_id, attempt, progress):
+                        # Otro worker lo reclamó: dejar de gastar en proveedores
+                        print(f"⚠️ Job {job_id}: el intento {attempt} perdió el lease, se abandona")
+                        return
+            finally:
+                # Cierra el stream (cancela la comparación si se abandona)
+                await stream.aclose()
+
+            if not completed:
+                await self.executor.run(self.store.fail, job_id, attempt, "La comparación terminó sin resultado")
+        except asyncio.CancelledError:
+            # Apagado: el lease vencerá y el job se retomará
+            raise
+        except Exception as e:
+            print(f"Error ejecutando job {job_id}: {e}")
+            await self.executor.run(self.store.fail, job_id, attempt, str(e))
@@ -0,0 +1,169 @@
+from typing import List, Dict, Any, Optional, Tuple
+import string
+import numpy as np
+from app.summarization.config import summarization_config
+
+# Palabras vacías comunes (compartidas con la similitud Jaccard del evaluador)
+STOP_WORDS = frozenset({
+    'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo', 'le', 'da', 'su',
+    'por', 'son', 'con', 'para', 'al', 'del', 'los', 'las', 'una', 'como', 'pero', 'sus', 'ya', 'o',
+    'porque', 'cuando', 'muy', 'sin', 'sobre', 'también', 'me', 'hasta', 'donde', 'quien', 'desde',
+    'nos', 'durante', 'todos', 'uno', 'otro', 'esta', 'este', 'estos', 'estas'
+})
+
+_PUNCTUATION = string.punctuation + "¿¡«»“”‘’…"
+
+def tokenize(text: str) -> List[str]:
+    """Palabras de contenido: minúsculas, sin puntuación, sin palabras vacías ni muy cortas"""
+    words = (word.strip(_PUNCTUATION) for word in text.lower().split())
+    return [word for word in words if word not in STOP_WORDS and len(word) > 2]
+
+class LocalScorer:
+    """
+    Métricas locales (sin LLM) de cada resumen frente al original:
+    coseno TF-IDF, ROUGE-1/2/L, ratio de compresión y cumplimiento de longitud.
+    Todas las muestras se puntúan a la vez sobre la matriz resumen × vocabulario.
+    También detecta fallos evidentes (vacío, truncado, demasiado largo, copia
+    del original) para no pagar al evaluador por ellos.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or summarization_config
+        self.rejections = 0
+
+    def score(self, original: str, summaries: List[str], max_words: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Métricas por resumen y, si es un fallo evidente, el motivo en 'reject_reason'"""
+        if not summaries:
+            return []
+        max_words = max_words or self.config.default_max_words
+
+        original_tokens = tokenize(original)
+        summary_tokens = [tokenize(summary) for summary in summaries]
+        documents = [original_tokens] + summary_tokens
+
+        # Matrices de conteo (documento × término) de unigramas y bigramas
+        unigrams = self._count_matrix(documents)
+        bigrams = self._count_matrix([list(zip(tokens, tokens[1:])) for tokens in documents])
+
+        tfidf_cosine = self._tfidf_cosine(unigrams)
+        rouge1_p, rouge1_r, rouge1_f = self._rouge_n(unigrams)
+        rouge2_p, rouge2_r, rouge2_f = self._rouge_n(bigrams)
+        rougel_r, rougel_f = self._rouge_l(original_tokens, summary_tokens)
+
+        original_words = max(1, len(original.split()))
+        summary_words = np.array([len(summary.split()) for summary in summaries], dtype=float)
+        compression_ratio = summary_words / original_words
+        length_compliance = np.clip(1.0 - np.abs(summary_words - max_words) / max_words, 0.0, 1.0)
+
+        results = []
+        for i in range(len(summaries)):
+            metrics = {
+                "tfidf_cosine": float(tfidf_cosine[i]),
+                "rouge1_f": float(rouge1_f[i]),
+                "rouge2_f": float(rouge2_f[i]),
+                "rougeL_f": float(rougel_f[i]),
+                "rouge1_precision": float(rouge1_p[i]),
+                "rouge2_precision": float(rouge2_p[i]),
+                "rougeL_recall": float(rougel_r[i]),
+                "compression_ratio": float(compression_ratio[i]),
+                "length_compliance": float(length_compliance[i]),
+                "words": int(summary_words[i])
+            }
+            reason = self._reject_reason(metrics, max_words)
+            if reason:
+                metrics["reject_reason"] = reason
+                self.rejections += 1
+            results.append(metrics)
+        return results
+
+    def _reject_reason(self, metrics: Dict[str, Any], max_words: int) -> Optional[str]:
+        """Fallos evidentes según los umbrales de SummarizationConfig"""
+        if not self.config.local_scoring_enabled:
+            return None
+        words = metrics["words"]
+        if words < max_words * self.config.local_min_length_ratio:
+            return "Resumen vacío o truncado"
+        if metrics["rougeL_recall"] >= self.config.local_max_copy_recall:
+            return "Resumen copiado del texto original"
+        if words > max_words * self.config.local_max_length_ratio:
+            return f"Resumen demasiado largo ({words} palabras para {max_words})"
+        return None
+
+    @staticmethod
+    def _count_matrix(documents: List[List[Any]]) -> np.ndarray:
+        vocabulary: Dict[Any, int] = {}
+        rows, cols = [], []
+        for row, terms in enumerate(documents):
+            for term in terms:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        counts = np.zeros((len(documents), max(1, len(vocabulary))), dtype=float)
+        np.add.at(counts, (rows, cols), 1.0)
+        return counts
+
+    @staticmethod
+    def _tfidf_cosine(counts: np.ndarray) -> np.ndarray:
+        """Coseno TF-IDF de cada resumen (filas 1..n) con el original (fila 0)"""
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+        tfidf = counts * idf
+        norms = np.linalg.norm(tfidf, axis=1)
+        dots = tfidf[1:] @ tfidf[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(dots / (norms[1:] * norms[0]))
+
+    @staticmethod
+    def _f1(precision: np.ndarray, recall: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(2 * precision * recall / (precision + recall))
+
+    def _rouge_n(self, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ROUGE-N (precisión, recall, F1) por solapamiento acotado de n-gramas"""
+        overlap = np.minimum(counts[1:], counts[0]).sum(axis=1)
+        summary_totals = counts[1:].sum(axis=1)
+        original_total = counts[0].sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.nan_to_num(overlap / summary_totals)
+            recall = np.nan_to_num(overlap / original_total) if original_total else np.zeros_like(overlap)
+        return precision, recall, self._f1(precision, recall)
+
+    def _rouge_l(self, original_tokens: List[str], summary_tokens: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """ROUGE-L (recall, F1) con la subsecuencia común más larga"""
+        recalls = np.zeros(len(summary_tokens))
+        precisions = np.zeros(len(summary_tokens))
+        if not original_tokens:
+            return recalls, recalls
+        # Comparar ids enteros es mucho más rápido que comparar cadenas en un array de objetos
+        vocabulary: Dict[str, int] = {}
+        original_ids = np.array([vocabulary.setdefault(token, len(vocabulary)) for token in original_tokens], dtype=np.int32)
+        for i, tokens in enumerate(summary_tokens):
+            if not tokens:
+                continue
+            lcs = self._lcs_length([vocabulary.get(token, -1) for token in tokens], original_ids)
+            precisions[i] = lcs / len(tokens)
+            recalls[i] = lcs / len(original_tokens)
+        return recalls, self._f1(precisions, recalls)
+
+    @staticmethod
+    def _lcs_length(token_ids: List[int], original_ids: np.ndarray) -> int:
+        """
+        LCS fila a fila vectorizada: con coincidencia L[i-1][j-1] + 1 domina a
+        sus vecinos, así que cada fila es el máximo acumulado de
+        max(fila anterior, coincidencias + diagonal).
+        Un token que no está en el original (id -1) deja la fila igual.
+        """
+        previous = np.zeros(len(original_ids) + 1, dtype=np.int32)
+        for token_id in token_ids:
+            if token_id < 0:
+                continue
+            match = original_ids == token_id
+            candidates = previous.copy()
+            candidates[1:] = np.maximum(previous[1:], np.where(match, previous[:-1] + 1, 0))
+            previous = np.maximum.accumulate(candidates)
+        return int(previous[-1])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.local_scoring_enabled,
+            "rejections": self.rejections
+        }
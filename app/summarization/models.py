@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any, Optional
 
 class SummarizationRequest(BaseModel):
@@ -7,6 +7,9 @@ class SummarizationRequest(BaseModel):
     models: List[str] = Field(..., min_items=2, max_items=5)
     max_words: int = Field(100, ge=20, le=500)
     llm_config: Dict[str, Any]  # Configuración LLM del frontend
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=3600)  # SLO de la comparación (por defecto request_timeout)
+    sampling_mode: str = Field("fixed", pattern="^(fixed|adaptive)$")  # adaptive = rondas con parada temprana
+    include_trace: bool = False  # Incluir en la respuesta el árbol de tiempos por etapa
 
 class ModelSummaryResult(BaseModel):
     """Resultado de resúmenes de un modelo específico"""
@@ -15,6 +18,11 @@ class ModelSummaryResult(BaseModel):
     avg_length: float
     execution_time: float
     success_count: int  # Cuántos resúmenes se generaron exitosamente
+    timed_out: bool = False  # Alguna muestra se canceló por el deadline
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0  # USD de la generación
+    tokens_per_second: float = 0.0  # Tokens generados por segundo de llamada
 
 class EvaluationScore(BaseModel):
     """Puntuación de evaluación de un modelo"""
@@ -24,8 +32,17 @@ class EvaluationScore(BaseModel):
     best_score: float
     worst_score: float
     consistency_score: float  # Qué tan consistentes son los 3 resúmenes
+    diversity_score: float = 0.0  # Distancia Jaccard media entre resúmenes (0 = idénticos, 100 = distintos)
     individual_summaries: List[str] = []  # Los 3 resúmenes originales
     evaluation_details: List[Dict[str, Any]] = []  # Detalles de precisión, completitud, claridad
+    timed_out: bool = False  # La evaluación se canceló por el deadline
+    evaluation_failed: bool = False  # El evaluador no devolvió ninguna puntuación (no compite)
+    parse_failures: int = 0  # Resúmenes cuya evaluación no se pudo parsear (sin puntuación)
+    reasks: int = 0  # Re-preguntas al evaluador por evaluaciones sin parsear
+    local_scores: List[Dict[str, Any]] = []  # Métricas locales por resumen (TF-IDF, ROUGE, longitud)
+    prompt_tokens: int = 0  # Uso del modelo evaluador para este modelo
+    completion_tokens: int = 0
+    cost: float = 0.0  # USD de la evaluación
 
 class ComparisonResponse(BaseModel):
     """Response completa de comparación"""
@@ -37,6 +54,72 @@ class ComparisonResponse(BaseModel):
     total_execution_time: float
     models_tested: int
     successful_evaluations: int
+    timed_out: bool = False  # Resultado parcial: el deadline cortó parte del trabajo
+    sampling_mode: str = "fixed"
+    sampling_rounds: int = 1  # Rondas de muestreo (modo adaptativo)
+    winner_confidence: Optional[float] = None  # Probabilidad bootstrap de que el ganador sea el mejor
+    total_prompt_tokens: int = 0  # Generación + evaluación
+    total_completion_tokens: int = 0
+    total_cost: float = 0.0  # USD de toda la comparación
+    tokens_per_second: float = 0.0  # Tokens generados por segundo de comparación
+    trace_id: Optional[str] = None  # Traza de la comparación (GET /traces/{trace_id})
+    trace: Optional[Dict[str, Any]] = None  # Árbol de spans por etapa (si include_trace)
+
+class BatchSummarizationRequest(BaseModel):
+    """Request para comparar modelos sobre muchos textos"""
+    texts: List[str] = Field(..., min_items=1, max_items=1000)
+    models: List[str] = Field(..., min_items=2, max_items=5)
+    max_words: int = Field(100, ge=20, le=500)
+    llm_config: Dict[str, Any]  # Configuración LLM del frontend
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=3600)  # SLO por texto
+    sampling_mode: str = Field("fixed", pattern="^(fixed|adaptive)$")
+
+    @field_validator("texts")
+    @classmethod
+    def validate_texts(cls, texts: List[str]) -> List[str]:
+        for i, text in enumerate(texts):
+            if not 100 <= len(text) <= 10000:
+                raise ValueError(f"El texto {i} debe tener entre 100 y 10000 caracteres")
+        return texts
+
+class BatchModelStats(BaseModel):
+    """Estadísticas agregadas de un modelo en un batch"""
+    model: str
+    texts_evaluated: int
+    wins: int
+    average_score: float
+    average_consistency: float
+    average_execution_time: float
+    success_rate: float  # Resúmenes generados / solicitados
+    timeouts: int
+    total_cost: float = 0.0  # USD de generación + evaluación del modelo
+    completion_tokens: int = 0
+
+class BatchSummary(BaseModel):
+    """Resumen final de un batch de comparaciones"""
+    texts_total: int
+    texts_completed: int
+    texts_failed: int
+    total_execution_time: float
+    model_stats: List[BatchModelStats]
+    overall_winner: str
+    total_cost: float = 0.0  # USD de todo el batch
+
+class JobSubmitResponse(BaseModel):
+    """Response al encolar un job de comparación"""
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    """Estado y progreso de un job de comparación"""
+    job_id: str
+    status: str  # pending, running, completed, failed
+    progress: Dict[str, Any] = {}
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 class SummarizationConfigResponse(BaseModel):
     """Response de configuración del módulo"""
@@ -1,14 +1,24 @@
+import json
 from fastapi import APIRouter, HTTPException
-from app.summarization.models import SummarizationRequest, ComparisonResponse, SummarizationConfigResponse
+from fastapi.responses import StreamingResponse
+from app.summarization.models import (
+    SummarizationRequest, ComparisonResponse, SummarizationConfigResponse,
+    BatchSummarizationRequest, JobSubmitResponse, JobStatusResponse
+)
 from app.summarization.service import SummarizationService
 from app.summarization.config import summarization_config
+from app.summarization.jobs import JobStore, JobManager, COMPLETED, FAILED
 from app.llm.service import llm_service
+from app.llm.streaming import format_sse
 
 router = APIRouter(prefix="/summarization", tags=["Summarization"])
 
 # Crear instancia del servicio simplificado
 summarization_service = SummarizationService()
 
+# Jobs asíncronos: los workers se arrancan en el lifespan de main.py
+job_manager = JobManager(JobStore(), summarization_service)
+
 @router.post("/compare", response_model=ComparisonResponse)
 async def compare_summaries(request: SummarizationRequest):
     """
@@ -26,6 +36,103 @@ async def compare_summaries(request: SummarizationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/compare/stream")
+async def compare_summaries_stream(request: SummarizationRequest):
+    """
+    Variante en streaming (SSE) de /compare.
+    Emite eventos sample, model_result y evaluation a medida que terminan,
+    y un evento comparison final con la ComparisonResponse completa.
+    """
+    async def event_stream():
+        try:
+            async for event, data in summarization_service.compare_models_stream(request):
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Evitar buffering en nginx
+        }
+    )
+
+@router.post("/batch")
+async def compare_batch(request: BatchSummarizationRequest):
+    """
+    Compara los mismos modelos sobre muchos textos en una sola llamada.
+    Responde en NDJSON: una línea {"type": "result", "index", "comparison"}
+    por texto según terminan, y una línea final {"type": "summary", ...}
+    con estadísticas agregadas por modelo.
+    """
+    async def ndjson_stream():
+        try:
+            async for record in summarization_service.compare_batch_stream(request):
+                if "comparison" in record:
+                    record = {**record, "comparison": record["comparison"].model_dump(mode="json")}
+                if "summary" in record:
+                    record = {**record, "summary": record["summary"].model_dump(mode="json")}
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_comparison_job(request: SummarizationRequest):
+    """
+    Encola una comparación para ejecutarla en segundo plano.
+    Retorna el id del job inmediatamente; consultar /jobs/{job_id}.
+    """
+    job_id = await job_manager.submit(request)
+    return JobSubmitResponse(job_id=job_id, status="pending")
+
+@router.get("/jobs")
+async def get_comparison_jobs_stats():
+    """Workers activos y número de jobs por estado"""
+    return await job_manager.get_stats()
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_comparison_job(job_id: str):
+    """Estado y progreso de un job de comparación"""
+    job = await job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+    
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        progress=json.loads(job["progress"] or "{}"),
+        attempts=job["attempts"],
+        error=job["error"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"]
+    )
+
+@router.get("/jobs/{job_id}/result", response_model=ComparisonResponse)
+async def get_comparison_job_result(job_id: str):
+    """Resultado final (ComparisonResponse) de un job completado"""
+    job = await job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} todavía en estado {job['status']}")
+    
+    return ComparisonResponse.model_validate_json(job["result"])
+
+@router.get("/evaluator/stats")
+async def get_evaluator_stats():
+    """Tasa de parseo del evaluador, re-preguntas y resúmenes deduplicados"""
+    return {
+        **summarization_service.evaluator.get_stats(),
+        "dedup": summarization_service.deduplicator.get_stats()
+    }
+
 @router.get("/config", response_model=SummarizationConfigResponse)
 async def get_summarization_config():
     """Obtiene la configuración actual del módulo de resúmenes"""
@@ -0,0 +1,93 @@
+from typing import List, Dict
+import numpy as np
+from app.summarization.config import summarization_config
+from app.summarization.models import EvaluationScore
+
+class AdaptiveSampler:
+    """
+    Decide cuándo dejar de muestrear en el modo adaptativo.
+    Tras cada ronda estima con un bootstrap suavizado la probabilidad de
+    que cada modelo tenga la mejor puntuación media; se para cuando el
+    líder alcanza adaptive_confidence y solo siguen muestreando los modelos
+    que aún pueden ganar.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or summarization_config
+        self._rng = np.random.default_rng()
+
+    @staticmethod
+    def scored_totals(evaluation: EvaluationScore) -> List[float]:
+        """Scores totales (3-15) de las evaluaciones parseadas"""
+        return [
+            detail['precision'] + detail['completeness'] + detail['clarity']
+            for detail in evaluation.evaluation_details
+            if detail.get('parsed', True) and detail.get('precision') is not None
+        ]
+
+    def win_probabilities(self, scores: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Fracción de remuestreos bootstrap en los que cada modelo tiene la media
+        más alta (los empates se reparten). Modelos sin scores: probabilidad 0.
+        """
+        models = [model for model, values in scores.items() if values]
+        probabilities = {model: 0.0 for model in scores}
+        if not models:
+            return probabilities
+        if len(models) == 1:
+            probabilities[models[0]] = 1.0
+            return probabilities
+
+        # Bootstrap suavizado: con 2-3 muestras idénticas el bootstrap clásico
+        # no tiene varianza y daría certeza total; se añade ruido con al menos
+        # adaptive_min_score_std (los scores del evaluador son enteros)
+        residuals = np.concatenate([
+            np.asarray(scores[model], dtype=float) - np.mean(scores[model]) for model in models
+        ])
+        bandwidth = max(float(residuals.std()), self.config.adaptive_min_score_std)
+
+        iterations = self.config.adaptive_bootstrap_iterations
+        means = np.empty((iterations, len(models)))
+        for k, model in enumerate(models):
+            values = np.asarray(scores[model], dtype=float)
+            indices = self._rng.integers(0, len(values), size=(iterations, len(values)))
+            noise = self._rng.normal(0.0, bandwidth, size=(iterations, len(values)))
+            means[:, k] = (values[indices] + noise).mean(axis=1)
+
+        winners = means == means.max(axis=1, keepdims=True)
+        shares = (winners / winners.sum(axis=1, keepdims=True)).mean(axis=0)
+        for k, model in enumerate(models):
+            probabilities[model] = float(shares[k])
+        return probabilities
+
+    def contenders(self,
+                   probabilities: Dict[str, float],
+                   leader: str,
+                   samples_taken: Dict[str, int]) -> List[str]:
+        """
+        Modelos que reciben otra ronda: el líder y los que aún pueden ganar.
+        Si ninguno llega a adaptive_min_win_probability sigue el rival más
+        cercano; con menos de dos modelos por muestrear la ronda no puede
+        cambiar el ranking y se retorna una lista vacía (fin del muestreo).
+        """
+        available = [
+            model for model in probabilities
+            if samples_taken[model] < self.config.adaptive_max_samples_per_model
+        ]
+        selected = [
+            model for model in available
+            if model == leader or probabilities[model] >= self.config.adaptive_min_win_probability
+        ]
+        challengers = [model for model in available if model != leader and model not in selected]
+        if len(selected) < 2 and challengers:
+            selected.append(max(challengers, key=lambda model: probabilities[model]))
+        return selected if len(selected) >= 2 else []
+
+    def max_samples(self, models: int) -> int:
+        """Cota superior de muestras de una comparación adaptativa (para el progreso)"""
+        # El presupuesto total se comprueba tras cada ronda: la última puede pasarse
+        overshoot = self.config.adaptive_max_total_samples - 1 + self.config.adaptive_round_samples * models
+        return min(
+            self.config.adaptive_max_samples_per_model * models,
+            max(overshoot, self.config.adaptive_initial_samples * models)
+        )
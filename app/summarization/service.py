@@ -1,10 +1,21 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Tuple
 import asyncio
 import time
 from app.summarization.config import summarization_config
-from app.summarization.models import SummarizationRequest, ComparisonResponse, ModelSummaryResult
+from app.summarization.models import (
+    SummarizationRequest, ComparisonResponse, ModelSummaryResult, EvaluationScore,
+    BatchSummarizationRequest, BatchModelStats, BatchSummary
+)
 from app.summarization.evaluator import SummarizationEvaluator
+from app.summarization.dedup import MinHashDeduplicator
+from app.summarization.sampling import AdaptiveSampler
 from app.llm.service import llm_service
+from app.llm.executor import blocking_executor
+from app.llm.deadline import deadline_scope, deadline_expired, time_remaining
+from app.llm.usage import usage_scope
+from app.metrics import SUMMARIZATION_STAGE_LATENCY, COMPARISON_DURATION
+from app.tracing import trace_scope, span, trace_to_dict
+from app.config import settings
 
 class SummarizationService:
     """
@@ -13,43 +24,282 @@ class SummarizationService:
     AQUÍ SÍ va la lógica específica de resúmenes.
     """
     
+    # Marca interna de fin de stream
+    STREAM_END = "__end__"
+    
     def __init__(self):
         self.config = summarization_config
         self.llm_service = llm_service  # Import directo - más simple
+        self.evaluator = SummarizationEvaluator()  # Compartido entre comparaciones
+        self.deduplicator = MinHashDeduplicator()
+        self.sampler = AdaptiveSampler()
     
     async def compare_models(self, request: SummarizationRequest) -> ComparisonResponse:
         """
         Función principal: compara múltiples modelos generando resúmenes.
         """
+        return await self._run_comparison(request)
+    
+    async def compare_models_stream(self,
+                                    request: SummarizationRequest,
+                                    heartbeat_interval: float = 15.0) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Variante incremental de compare_models.
+        Emite (evento, datos) a medida que termina cada paso:
+        - "sample": cada resumen individual
+        - "model_result": ModelSummaryResult de cada modelo
+        - "evaluation": EvaluationScore de cada modelo
+        - "comparison": ComparisonResponse final
+        - "ping": sin actividad durante heartbeat_interval (mantiene vivos los proxies)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def emit(event: str, data: Any):
+            queue.put_nowait((event, data))
+        
+        async def run():
+            try:
+                comparison = await self._run_comparison(request, emit)
+                emit("comparison", comparison)
+            finally:
+                emit(self.STREAM_END, None)
+        
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield "ping", None
+                    continue
+                if event == self.STREAM_END:
+                    break
+                yield event, data
+            # Propagar errores de la comparación al consumidor
+            await task
+        finally:
+            # Si el cliente se desconecta, no seguir gastando en proveedores
+            if not task.done():
+                task.cancel()
+    
+    async def _run_comparison(self,
+                              request: SummarizationRequest,
+                              emit: Optional[Callable[[str, Any], None]] = None) -> ComparisonResponse:
+        """
+        Pipeline de comparación: generación, evaluación y ganador.
+        Si se pasa emit, se notifica cada resultado intermedio.
+        Todo el trabajo comparte un deadline (request.deadline_seconds o
+        request_timeout); al vencer se retorna lo completado, marcado timed_out.
+        """
+        with trace_scope("summarization.compare", force=request.include_trace,
+                         models=",".join(request.models), sampling_mode=request.sampling_mode) as root, \
+                deadline_scope(request.deadline_seconds or settings.request_timeout), usage_scope() as usage:
+            response = await self._run_comparison_pipeline(request, emit)
+            if root is not None:
+                root.set_attributes(winner=response.winner, timed_out=response.timed_out)
+        
+        # Uso total de la comparación (generación + evaluación)
+        response.total_prompt_tokens = usage.prompt_tokens
+        response.total_completion_tokens = usage.completion_tokens
+        response.total_cost = usage.cost
+        if response.total_execution_time > 0:
+            response.tokens_per_second = usage.completion_tokens / response.total_execution_time
+        COMPARISON_DURATION.labels(
+            response.sampling_mode, str(response.timed_out).lower()
+        ).observe(response.total_execution_time)
+        
+        if root is not None:
+            response.trace_id = root.trace_id
+            if request.include_trace:
+                response.trace = trace_to_dict(root)
+        return response
+    
+    async def _run_comparison_pipeline(self,
+                                       request: SummarizationRequest,
+                                       emit: Optional[Callable[[str, Any], None]] = None) -> ComparisonResponse:
+        if request.sampling_mode == "adaptive":
+            return await self._run_adaptive_pipeline(request, emit)
+        
         start_time = time.time()
         
-        # 1. Generar resúmenes con cada modelo
-        results = []
-        for model in request.models:
-            print(f"🔄 Generando resúmenes con modelo: {model}")
-            model_result = await self._generate_model_summaries(
-                request.text, model, request.max_words, request.llm_config
-            )
-            results.append(model_result)
-            print(f"✅ Modelo {model}: {model_result.success_count}/{self.config.samples_per_model} resúmenes generados")
+        # Pipeline por modelo: cada modelo se evalúa en cuanto terminan sus
+        # muestras, en paralelo con la generación de los modelos más lentos
+        # (la concurrencia real la limita el planificador del LLMService)
+        print(f"🔄 Generando resúmenes con modelos: {', '.join(request.models)}")
         
-        # 2. Evaluar resúmenes usando evaluador simplificado
-        evaluations = []
-        evaluator = SummarizationEvaluator()  # Crear evaluador
+        # La generación solo puede usar parte del presupuesto: el resto queda
+        # para evaluar lo que sí terminó
+        generation_budget = self._generation_budget()
         
-        for result in results:
-            if result.summaries:  # Solo evaluar si hay resúmenes
-                print(f"🧪 Evaluando resúmenes del modelo: {result.model}")
-                evaluation = await evaluator.evaluate_summaries(
-                    request.text, result.summaries, result.model
+        async def process(model: str) -> Tuple[ModelSummaryResult, Optional[EvaluationScore]]:
+            # 1. Generar las muestras del modelo
+            with deadline_scope(generation_budget):
+                model_result = await self._generate_model_summaries(
+                    request.text, model, request.max_words, request.llm_config, emit
                 )
-                evaluations.append(evaluation)
+            print(f"✅ Modelo {model}: {model_result.success_count}/{self.config.samples_per_model} resúmenes generados")
+            if emit:
+                emit("model_result", model_result)
+            
+            # 2. Evaluar sus resúmenes sin esperar al resto de modelos
+            if not model_result.summaries:  # Solo evaluar si hay resúmenes
+                return model_result, None
+            if model_result.timed_out and not self.evaluator.filter_valid_summaries(model_result.summaries):
+                # Todas las muestras vencieron: no hay nada que evaluar
+                evaluation = self._timed_out_evaluation(model)
+            else:
+                evaluation = await self._evaluate_model(request.text, model_result, request.max_words)
+            if emit:
+                emit("evaluation", evaluation)
+            return model_result, evaluation
+        
+        # gather conserva el orden de request.models
+        outcomes = await asyncio.gather(*[process(model) for model in request.models])
+        results = [model_result for model_result, _ in outcomes]
+        evaluations = [evaluation for _, evaluation in outcomes if evaluation is not None]
         
         # 3. Determinar ganador
-        winner = evaluator.get_best_model(evaluations)
+        return self._build_comparison(request, results, evaluations, start_time)
+    
+    async def _run_adaptive_pipeline(self,
+                                     request: SummarizationRequest,
+                                     emit: Optional[Callable[[str, Any], None]] = None) -> ComparisonResponse:
+        """
+        Muestreo adaptativo: genera y evalúa por rondas. Tras cada ronda un
+        bootstrap estima la probabilidad de victoria de cada modelo; se para
+        cuando el líder es claro, se agota el presupuesto de muestras o el
+        de tiempo. Solo los modelos que aún pueden ganar reciben más muestras.
+        """
+        start_time = time.time()
+        evaluator = self.evaluator
+        print(f"🎲 Muestreo adaptativo con modelos: {', '.join(request.models)}")
+        
+        rounds: Dict[str, List[ModelSummaryResult]] = {model: [] for model in request.models}
+        evaluated: Dict[str, List[EvaluationScore]] = {model: [] for model in request.models}
+        samples_taken = {model: 0 for model in request.models}
+        
+        # Fin absoluto del presupuesto de generación (no se abren rondas después)
+        generation_budget = self._generation_budget()
+        generation_end = time.monotonic() + generation_budget if generation_budget is not None else None
+        
+        async def sample_round(model: str, count: int):
+            remaining = generation_end - time.monotonic() if generation_end is not None else None
+            with deadline_scope(remaining):
+                model_result = await self._generate_model_summaries(
+                    request.text, model, request.max_words, request.llm_config, emit,
+                    samples=count, first_index=samples_taken[model]
+                )
+            samples_taken[model] += count
+            rounds[model].append(model_result)
+            if self.evaluator.filter_valid_summaries(model_result.summaries):
+                evaluated[model].append(await self._evaluate_model(request.text, model_result, request.max_words))
+        
+        contenders = list(request.models)
+        count = self.config.adaptive_initial_samples
+        round_number = 0
+        confidence = None
+        while contenders:
+            round_number += 1
+            with span("summarization.round", round=round_number, models=",".join(contenders), samples=count):
+                await asyncio.gather(*[sample_round(model, count) for model in contenders])
+            
+            merged = {model: evaluator.merge_evaluations(model, evaluated[model]) for model in request.models}
+            leader = evaluator.get_best_model(list(merged.values()))
+            if leader is None:
+                break
+            probabilities = self.sampler.win_probabilities({
+                model: self.sampler.scored_totals(evaluation) for model, evaluation in merged.items()
+            })
+            confidence = probabilities[leader]
+            print(f"🎲 Ronda {round_number}: líder {leader} con confianza {confidence:.2f}")
+            
+            if confidence >= self.config.adaptive_confidence:
+                break
+            if sum(samples_taken.values()) >= self.config.adaptive_max_total_samples:
+                print("🎲 Presupuesto de muestras agotado")
+                break
+            if deadline_expired() or (generation_end is not None and time.monotonic() >= generation_end):
+                break
+            contenders = self.sampler.contenders(probabilities, leader, samples_taken)
+            if not contenders:
+                print("🎲 Menos de dos modelos pueden seguir muestreando: fin del muestreo")
+            count = self.config.adaptive_round_samples
+        
+        # Resultados finales por modelo con todas sus rondas
+        merged_results = {model: self._merge_model_results(model, rounds[model]) for model in request.models}
+        # Diversidad sobre todas las muestras: una vez por modelo, fuera del event loop
+        evaluated_models = [model for model in request.models if evaluated[model]]
+        diversities = dict(zip(evaluated_models, await asyncio.gather(*[
+            self._diversity(merged_results[model].summaries) for model in evaluated_models
+        ])))
+        results = []
+        evaluations = []
+        for model in request.models:
+            model_result = merged_results[model]
+            results.append(model_result)
+            print(f"✅ Modelo {model}: {model_result.success_count}/{len(model_result.summaries)} resúmenes generados")
+            if emit:
+                emit("model_result", model_result)
+            if evaluated[model]:
+                evaluation = evaluator.merge_evaluations(model, evaluated[model], diversities[model])
+            elif model_result.timed_out:
+                evaluation = self._timed_out_evaluation(model)
+            else:
+                continue
+            evaluations.append(evaluation)
+            if emit:
+                emit("evaluation", evaluation)
+        
+        return self._build_comparison(
+            request, results, evaluations, start_time,
+            sampling_rounds=round_number,
+            winner_confidence=confidence
+        )
+    
+    def _merge_model_results(self, model: str, rounds: List[ModelSummaryResult]) -> ModelSummaryResult:
+        """Une las rondas de generación de un modelo"""
+        summaries = [summary for model_round in rounds for summary in model_round.summaries]
+        completion_tokens = sum(model_round.completion_tokens for model_round in rounds)
+        # Segundos de llamada de cada ronda, recuperados de su throughput
+        call_seconds = sum(
+            model_round.completion_tokens / model_round.tokens_per_second
+            for model_round in rounds if model_round.tokens_per_second > 0
+        )
+        return ModelSummaryResult(
+            model=model,
+            summaries=summaries,
+            avg_length=self._calculate_average_length(summaries),
+            execution_time=sum(model_round.execution_time for model_round in rounds),
+            success_count=sum(model_round.success_count for model_round in rounds),
+            timed_out=any(model_round.timed_out for model_round in rounds),
+            prompt_tokens=sum(model_round.prompt_tokens for model_round in rounds),
+            completion_tokens=completion_tokens,
+            cost=sum(model_round.cost for model_round in rounds),
+            tokens_per_second=completion_tokens / call_seconds if call_seconds > 0 else 0.0
+        )
+    
+    def _build_comparison(self,
+                          request: SummarizationRequest,
+                          results: List[ModelSummaryResult],
+                          evaluations: List[EvaluationScore],
+                          start_time: float,
+                          **extra: Any) -> ComparisonResponse:
+        """Determina el ganador y arma la ComparisonResponse"""
+        # Los modelos sin evaluación (deadline o fallo del evaluador) no compiten, y
+        # sin ninguna puntuación del evaluador solo quedarían fallos locales: no hay ganador
+        rankable = self._rankable(evaluations)
+        if not any(
+            detail['parsed'] and not detail.get('short_circuited')
+            for evaluation in rankable for detail in evaluation.evaluation_details
+        ):
+            rankable = []
+        winner = self.evaluator.get_best_model(rankable)
         best_summary = self._get_best_summary(results, winner)
         
         execution_time = time.time() - start_time
+        timed_out = any(r.timed_out for r in results) or any(e.timed_out for e in evaluations)
+        if timed_out:
+            print(f"⏱️ Deadline alcanzado: se retornan resultados parciales ({execution_time:.1f}s)")
         
         return ComparisonResponse(
             original_text=request.text,
@@ -59,46 +309,220 @@ class SummarizationService:
             best_summary=best_summary,
             total_execution_time=execution_time,
             models_tested=len(request.models),
-            successful_evaluations=len(evaluations)
+            successful_evaluations=len(self._rankable(evaluations)),
+            timed_out=timed_out,
+            sampling_mode=request.sampling_mode,
+            **extra
+        )
+    
+    async def compare_batch_stream(self, request: BatchSummarizationRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Compara los mismos modelos sobre muchos textos.
+        Todos los textos entran en una cola de trabajo común: hasta
+        batch_max_concurrent_texts comparaciones a la vez, y todas sus
+        generaciones y evaluaciones comparten los límites del LLMService.
+        Emite un registro "result" por texto (en orden de finalización) y
+        un registro "summary" final con estadísticas agregadas por modelo.
+        """
+        start_time = time.time()
+        work_queue: asyncio.Queue = asyncio.Queue()
+        for index in range(len(request.texts)):
+            work_queue.put_nowait(index)
+        output: asyncio.Queue = asyncio.Queue()
+        
+        async def worker():
+            while True:
+                try:
+                    index = work_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                comparison_request = SummarizationRequest(
+                    text=request.texts[index],
+                    models=request.models,
+                    max_words=request.max_words,
+                    llm_config=request.llm_config,
+                    deadline_seconds=request.deadline_seconds,
+                    sampling_mode=request.sampling_mode
+                )
+                try:
+                    comparison = await self._run_comparison(comparison_request)
+                    output.put_nowait({"type": "result", "index": index, "comparison": comparison})
+                except Exception as e:
+                    print(f"Error en el texto {index} del batch: {e}")
+                    output.put_nowait({"type": "error", "index": index, "detail": str(e)})
+        
+        workers_count = min(self.config.batch_max_concurrent_texts, len(request.texts))
+        workers = [asyncio.ensure_future(worker()) for _ in range(workers_count)]
+        comparisons: List[ComparisonResponse] = []
+        failed = 0
+        try:
+            for _ in range(len(request.texts)):
+                record = await output.get()
+                if record["type"] == "result":
+                    comparisons.append(record["comparison"])
+                else:
+                    failed += 1
+                yield record
+        finally:
+            # Si el cliente se desconecta, cancelar el trabajo pendiente
+            for task in workers:
+                task.cancel()
+        
+        yield {
+            "type": "summary",
+            "summary": self._summarize_batch(request, comparisons, failed, time.time() - start_time)
+        }
+    
+    def _summarize_batch(self,
+                         request: BatchSummarizationRequest,
+                         comparisons: List[ComparisonResponse],
+                         failed: int,
+                         execution_time: float) -> BatchSummary:
+        """Estadísticas agregadas por modelo de un batch"""
+        model_stats = []
+        for model in request.models:
+            results = [r for c in comparisons for r in c.results if r.model == model]
+            evaluations = [e for c in comparisons for e in self._rankable(c.evaluations) if e.model == model]
+            requested = sum(len(r.summaries) for r in results)
+            
+            model_stats.append(BatchModelStats(
+                model=model,
+                texts_evaluated=len(evaluations),
+                wins=sum(1 for c in comparisons if c.winner == model),
+                average_score=sum(e.average_score for e in evaluations) / len(evaluations) if evaluations else 0.0,
+                average_consistency=sum(e.consistency_score for e in evaluations) / len(evaluations) if evaluations else 0.0,
+                average_execution_time=sum(r.execution_time for r in results) / len(results) if results else 0.0,
+                success_rate=sum(r.success_count for r in results) / requested if requested else 0.0,
+                timeouts=sum(1 for r in results if r.timed_out),
+                total_cost=sum(r.cost for r in results) + sum(
+                    e.cost for c in comparisons for e in c.evaluations if e.model == model
+                ),
+                completion_tokens=sum(r.completion_tokens for r in results)
+            ))
+        
+        ranked = sorted(model_stats, key=lambda m: (m.wins, m.average_score), reverse=True)
+        overall_winner = ranked[0].model if ranked and ranked[0].texts_evaluated else "ninguno"
+        
+        return BatchSummary(
+            texts_total=len(request.texts),
+            texts_completed=len(comparisons),
+            texts_failed=failed,
+            total_execution_time=execution_time,
+            model_stats=model_stats,
+            overall_winner=overall_winner,
+            total_cost=sum(c.total_cost for c in comparisons)
+        )
+    
+    async def _evaluate_model(self, text: str, model_result: ModelSummaryResult, max_words: int) -> EvaluationScore:
+        """Deduplica las muestras válidas del modelo y evalúa solo las distintas"""
+        with span("summarization.evaluate", model=model_result.model) as evaluate_span:
+            valid_summaries = self.evaluator.filter_valid_summaries(model_result.summaries)
+            with span("summarization.dedup", summaries=len(valid_summaries)) as dedup_span:
+                # MinHash de todas las muestras (decenas de ms): fuera del event loop
+                dedup = await blocking_executor.run(self.deduplicator.deduplicate, valid_summaries)
+                dedup_span.set_attribute("duplicates", dedup.duplicates)
+            if dedup.duplicates:
+                print(f"🧬 Modelo {model_result.model}: {dedup.duplicates} resumen(es) casi idéntico(s), se evalúan una vez")
+            print(f"🧪 Evaluando resúmenes del modelo: {model_result.model}")
+            start_time = time.time()
+            with usage_scope() as usage:
+                evaluation = await self.evaluator.evaluate_summaries(text, valid_summaries, model_result.model, dedup, max_words)
+            evaluate_span.set_attributes(parse_failures=evaluation.parse_failures, timed_out=evaluation.timed_out)
+        SUMMARIZATION_STAGE_LATENCY.labels("evaluation", model_result.model).observe(time.time() - start_time)
+        evaluation.prompt_tokens = usage.prompt_tokens
+        evaluation.completion_tokens = usage.completion_tokens
+        evaluation.cost = usage.cost
+        return evaluation
+    
+    async def _diversity(self, summaries: List[str]) -> float:
+        """Diversidad de las muestras válidas de un modelo (MinHash en el pool de hilos)"""
+        valid_summaries = self.evaluator.filter_valid_summaries(summaries)
+        return await blocking_executor.run(self.deduplicator.diversity, valid_summaries)
+    
+    def _rankable(self, evaluations: List[EvaluationScore]) -> List[EvaluationScore]:
+        """Evaluaciones que compiten por el ganador (ni vencidas ni fallidas)"""
+        return [e for e in evaluations if not e.timed_out and not e.evaluation_failed]
+    
+    def _timed_out_evaluation(self, model: str) -> EvaluationScore:
+        """Evaluación vacía de un modelo cuyas muestras vencieron todas por el deadline"""
+        return EvaluationScore(
+            model=model,
+            similarity_scores=[0.0],
+            average_score=0.0,
+            best_score=0.0,
+            worst_score=0.0,
+            consistency_score=0.0,
+            timed_out=True
         )
     
+    def _generation_budget(self) -> Optional[float]:
+        """Segundos del deadline vigente reservados para la fase de generación"""
+        remaining = time_remaining()
+        if remaining is None:
+            return None
+        return max(0.0, remaining * self.config.generation_deadline_fraction)
+    
     async def _generate_model_summaries(self, 
                                        text: str, 
                                        model: str, 
                                        max_words: int,
-                                       llm_config: Dict[str, Any]) -> ModelSummaryResult:
+                                       llm_config: Dict[str, Any],
+                                       emit: Optional[Callable[[str, Any], None]] = None,
+                                       samples: Optional[int] = None,
+                                       first_index: int = 0) -> ModelSummaryResult:
         """
         Genera múltiples resúmenes con un modelo específico.
         AQUÍ SÍ va esta lógica porque es específica de resúmenes.
+        Por defecto genera samples_per_model muestras; el muestreo adaptativo
+        pide rondas más pequeñas (numeradas a partir de first_index).
         """
         start_time = time.time()
-        summaries = []
-        successful_summaries = 0
         
-        for i in range(self.config.samples_per_model):
+        # Crear prompt específico de resumen
+        prompt = self.config.summary_prompt_template.format(
+            max_words=max_words,
+            text=text
+        )
+        
+        async def generate_sample(i: int) -> Tuple[str, bool, bool]:
+            timed_out = False
             try:
-                # Crear prompt específico de resumen
-                prompt = self.config.summary_prompt_template.format(
-                    max_words=max_words,
-                    text=text
-                )
-                
                 # Usar LLM service directo para generar texto
                 summary = await self.llm_service.generate_text(
                     prompt=prompt,
                     model=model,
                     config=llm_config
                 )
-                
-                summaries.append(summary)
-                successful_summaries += 1
-                
+                success = True
             except Exception as e:
-                print(f"Error generando resumen {i+1} con modelo {model}: {e}")
-                summaries.append(f"Error: No se pudo generar resumen {i+1}")
+                success = False
+                if isinstance(e, asyncio.TimeoutError) or deadline_expired():
+                    print(f"⏱️ Tiempo agotado generando resumen {i+1} con modelo {model}")
+                    summary = f"Error: Tiempo agotado generando resumen {i+1}"
+                    timed_out = True
+                else:
+                    print(f"Error generando resumen {i+1} con modelo {model}: {e}")
+                    summary = f"Error: No se pudo generar resumen {i+1}"
+            
+            if emit:
+                emit("sample", {"model": model, "index": i, "summary": summary, "success": success, "timed_out": timed_out})
+            return summary, success, timed_out
+        
+        # Lanzar todas las muestras a la vez; gather conserva el orden
+        sample_count = samples or self.config.samples_per_model
+        with span("summarization.generate", model=model, samples=sample_count) as generate_span, \
+                usage_scope() as usage:
+            outcomes = await asyncio.gather(*[
+                generate_sample(i) for i in range(first_index, first_index + sample_count)
+            ])
+            generate_span.set_attribute("successful", sum(1 for _, success, _ in outcomes if success))
+        
+        summaries = [summary for summary, _, _ in outcomes]
+        successful_summaries = sum(1 for _, success, _ in outcomes if success)
         
         # Calcular estadísticas
         execution_time = time.time() - start_time
+        SUMMARIZATION_STAGE_LATENCY.labels("generation", model).observe(execution_time)
         avg_length = self._calculate_average_length(summaries)
         
         return ModelSummaryResult(
@@ -106,7 +530,12 @@ class SummarizationService:
             summaries=summaries,
             avg_length=avg_length,
             execution_time=execution_time,
-            success_count=successful_summaries
+            success_count=successful_summaries,
+            timed_out=any(timed_out for _, _, timed_out in outcomes),
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cost=usage.cost,
+            tokens_per_second=usage.tokens_per_second
         )
     
     def _calculate_average_length(self, summaries: List[str]) -> float:
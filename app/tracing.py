@@ -0,0 +1,217 @@
+"""
+Trazas ligeras por etapas (generación, cola, rate limit, llamada al
+proveedor, evaluación, parseo...).
+
+Los spans siguen el modelo de OpenTelemetry (trace_id de 16 bytes, span_id
+de 8 bytes, tiempos en nanosegundos Unix, atributos y estado) pero no
+dependen de él: el exportador en memoria guarda las últimas trazas del
+worker y funciona sin red. Fuera de una traza (trace_scope) los spans no
+registran nada, así que instrumentar una función no cuesta nada cuando
+nadie la traza.
+"""
+from typing import List, Dict, Any, Optional
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import time
+from app.config import settings
+
+class Span:
+    """Una operación con nombre, duración, atributos y sus spans hijos"""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.children: List["Span"] = []
+        self.start_time_unix_nano = time.time_ns()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None):
+        if self._end is not None:
+            return
+        self._end = time.perf_counter()
+        if error is None:
+            self.status = "OK"
+        else:
+            self.status = "ERROR"
+            self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        """Segundos (hasta ahora si el span sigue abierto)"""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    @property
+    def end_time_unix_nano(self) -> int:
+        return self.start_time_unix_nano + int(self.duration * 1e9)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """Árbol del span con offsets en ms respecto al inicio de la traza"""
+        origin = self._start if origin is None else origin
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "start_offset_ms": round((self._start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin) for child in self.children]
+        }
+
+    def walk(self):
+        """Recorre el span y todos sus descendientes"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+class _NoopSpan:
+    """Span que no registra nada (no hay traza activa)"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def trace_to_dict(root: Span) -> Dict[str, Any]:
+    """
+    Traza completa: el árbol de spans y un resumen por nombre de span
+    (llamadas, tiempo total y máximo) para ver de un vistazo el cuello de botella.
+    Los spans concurrentes se solapan, así que los totales pueden superar
+    la duración de la traza.
+    """
+    stages: Dict[str, Dict[str, Any]] = {}
+    for span in root.walk():
+        stage = stages.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+        duration_ms = span.duration * 1000
+        stage["count"] += 1
+        stage["total_ms"] += duration_ms
+        stage["max_ms"] = max(stage["max_ms"], duration_ms)
+        if span.status == "ERROR":
+            stage["errors"] += 1
+    for stage in stages.values():
+        stage["total_ms"] = round(stage["total_ms"], 3)
+        stage["max_ms"] = round(stage["max_ms"], 3)
+    return {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "duration_ms": round(root.duration * 1000, 3),
+        "stages": stages,
+        "root": root.to_dict()
+    }
+
+class InMemorySpanExporter:
+    """Guarda las últimas trazas terminadas del worker (sin red)"""
+
+    def __init__(self, max_traces: Optional[int] = None):
+        self._traces: deque = deque(maxlen=max_traces or settings.trace_buffer_size)
+        self.exported = 0
+
+    def export(self, root: Span):
+        self._traces.append(root)
+        self.exported += 1
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        for root in reversed(self._traces):
+            if root.trace_id == trace_id:
+                return trace_to_dict(root)
+        return None
+
+    def list_traces(self) -> List[Dict[str, Any]]:
+        """Resumen de las trazas guardadas, de la más reciente a la más antigua"""
+        return [
+            {
+                "trace_id": root.trace_id,
+                "name": root.name,
+                "start_time_unix_nano": root.start_time_unix_nano,
+                "duration_ms": round(root.duration * 1000, 3),
+                "status": root.status,
+                "spans": sum(1 for _ in root.walk()),
+                "attributes": root.attributes
+            }
+            for root in reversed(self._traces)
+        ]
+
+    def clear(self):
+        self._traces.clear()
+
+# Span activo en la operación en curso.
+# Se propaga a las tareas creadas con gather/create_task, así que los
+# spans de tareas concurrentes cuelgan del span que las lanzó.
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+@contextmanager
+def trace_scope(name: str, force: bool = False, **attributes: Any):
+    """
+    Inicia una traza (span raíz) y la exporta al terminar.
+    Dentro de una traza ya activa se comporta como un span hijo.
+    Con tracing_enabled=False solo se traza si force=True.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+    if not (settings.tracing_enabled or force):
+        yield None
+        return
+
+    root = Span(name, os.urandom(16).hex(), attributes=attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+        span_exporter.export(root)
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Span hijo del span activo; no registra nada si no hay traza"""
+    parent = _current_span.get()
+    if parent is None:
+        yield _NOOP_SPAN
+        return
+
+    child = Span(name, parent.trace_id, parent, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+def current_span() -> Optional[Span]:
+    """Span activo o None si no hay traza"""
+    return _current_span.get()
+
+# Instancia global
+span_exporter = InMemorySpanExporter()
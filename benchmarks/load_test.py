@@ -0,0 +1,392 @@
+"""
+Prueba de carga de POST /summarization/compare.
+
+Genera llegadas Poisson (carga abierta: no espera a que terminen las
+anteriores) con una mezcla de modelos configurable, contra la app en el
+mismo proceso (ASGI, por defecto) o contra un servidor uvicorn (--url).
+Por defecto usa el proveedor simulado (FAKE_LLM=true y modelos fake-*)
+sin limitador de tasa (RATE_LIMIT_ENABLED=false, salvo con --rate-limit).
+
+Reporta throughput, latencias p50/p95/p99, lag del event loop y memoria,
+y guarda el resultado en JSON con el commit para comparar entre versiones.
+
+Uso:
+    python -m benchmarks.load_test --rate 5 --duration 30
+    python -m benchmarks.load_test --mix "fake-fast,fake-slow:3;fake-fast,fake-flaky:1" --rate 20
+    python -m benchmarks.load_test --url http://localhost:8000 --rate 2
+    python -m benchmarks.load_test --compare benchmarks/results/load_anterior.json
+"""
+from typing import List, Dict, Any, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+_WORDS = (
+    "la inteligencia artificial transforma industria modelos lenguaje resumen documentos "
+    "empresas reducen costes automatización riesgos sesgo privacidad reguladores europeos "
+    "normas mercado datos análisis clientes procesos investigación universidad gobierno "
+    "energía clima ciudades transporte salud pacientes hospitales educación estudiantes"
+).split()
+
+def build_text(chars: int, rng: random.Random) -> str:
+    """Texto sintético en español de aproximadamente chars caracteres"""
+    sentences = []
+    length = 0
+    while length < chars:
+        words = rng.sample(_WORDS, rng.randint(8, 16))
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:chars].rsplit(" ", 1)[0] + "."
+
+def parse_mix(spec: str) -> List[Tuple[List[str], float]]:
+    """'m1,m2:3;m1,m3:1' -> [(['m1', 'm2'], 3.0), (['m1', 'm3'], 1.0)]"""
+    mix = []
+    for group in spec.split(";"):
+        group = group.strip()
+        if not group:
+            continue
+        models, _, weight = group.partition(":")
+        mix.append(([model.strip() for model in models.split(",") if model.strip()], float(weight or 1)))
+    if not mix or any(len(models) < 2 for models, _ in mix):
+        raise ValueError("Cada grupo de --mix necesita al menos 2 modelos")
+    return mix
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil (0-100) por el método del rango más cercano (None sin datos)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def rss_mb() -> Optional[float]:
+    """Memoria residente actual del proceso (Linux); None si no está disponible"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb() -> float:
+    """Pico de memoria residente del proceso (ru_maxrss está en KB en Linux, bytes en macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def git_commit() -> Dict[str, Any]:
+    """Commit actual y si hay cambios sin commitear"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+class LoopMonitor:
+    """
+    Mide el lag del event loop (cuánto se retrasa un sleep corto respecto a lo
+    pedido) y muestrea la memoria mientras dura la prueba.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.rss_samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        samples = 0
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+            samples += 1
+            if samples % 50 == 0:
+                rss = rss_mb()
+                if rss is not None:
+                    self.rss_samples.append(rss)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.lags),
+            "p50_ms": (percentile(self.lags, 50) or 0.0) * 1000,
+            "p99_ms": (percentile(self.lags, 99) or 0.0) * 1000,
+            "max_ms": max(self.lags, default=0.0) * 1000,
+            "mean_ms": (sum(self.lags) / len(self.lags) * 1000) if self.lags else 0.0
+        }
+
+async def run_load(client, args: argparse.Namespace) -> Dict[str, Any]:
+    """Lanza las llegadas Poisson y espera a que terminen todas las requests"""
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    weights = [weight for _, weight in mix]
+    texts = [build_text(args.text_chars, rng) for _ in range(20)]
+
+    records: List[Dict[str, Any]] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def one_request(models: List[str], text: str):
+        nonlocal in_flight, max_in_flight
+        payload = {
+            "text": text,
+            "models": models,
+            "max_words": args.max_words,
+            "llm_config": {"temperature": args.temperature, "max_tokens": args.max_tokens},
+            "sampling_mode": args.sampling_mode
+        }
+        if args.deadline:
+            payload["deadline_seconds"] = args.deadline
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        start = time.perf_counter()
+        record: Dict[str, Any] = {"models": ",".join(models)}
+        try:
+            response = await client.post("/summarization/compare", json=payload, timeout=args.request_timeout)
+            record["status"] = response.status_code
+            if response.status_code == 200:
+                body = response.json()
+                record["timed_out"] = body.get("timed_out", False)
+                record["cost"] = body.get("total_cost", 0.0)
+                record["completion_tokens"] = body.get("total_completion_tokens", 0)
+        except Exception as e:
+            record["status"] = type(e).__name__
+        finally:
+            record["latency"] = time.perf_counter() - start
+            in_flight -= 1
+            records.append(record)
+
+    monitor = LoopMonitor()
+    monitor.start()
+    rss_start = rss_mb()
+    tasks: List[asyncio.Task] = []
+    start = time.perf_counter()
+
+    # Carga abierta: intervalos exponenciales entre llegadas (proceso de Poisson)
+    next_arrival = start
+    while next_arrival - start < args.duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        models = rng.choices([models for models, _ in mix], weights=weights)[0]
+        tasks.append(asyncio.create_task(one_request(models, rng.choice(texts))))
+        next_arrival += rng.expovariate(args.rate)
+
+    print(f"⏳ {len(tasks)} requests lanzadas; esperando a las que siguen en curso ({in_flight})...")
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+
+    return summarize(records, elapsed, max_in_flight, monitor, rss_start)
+
+def summarize(records: List[Dict[str, Any]],
+              elapsed: float,
+              max_in_flight: int,
+              monitor: LoopMonitor,
+              rss_start: Optional[float]) -> Dict[str, Any]:
+    """Métricas agregadas de la prueba"""
+    ok = [r for r in records if r["status"] == 200]
+    latencies = [r["latency"] for r in ok]
+    statuses: Dict[str, int] = {}
+    for r in records:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+
+    by_mix: Dict[str, Dict[str, Any]] = {}
+    for r in ok:
+        group = by_mix.setdefault(r["models"], {"latencies": []})
+        group["latencies"].append(r["latency"])
+
+    return {
+        "requests": len(records),
+        "succeeded": len(ok),
+        "timed_out": sum(1 for r in ok if r.get("timed_out")),
+        "statuses": statuses,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(ok) / elapsed if elapsed > 0 else 0.0,
+        "max_in_flight": max_in_flight,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=None),
+            "mean": sum(latencies) / len(latencies) if latencies else None
+        },
+        "latency_by_mix": {
+            models: {
+                "requests": len(group["latencies"]),
+                "p50": percentile(group["latencies"], 50),
+                "p95": percentile(group["latencies"], 95),
+                "p99": percentile(group["latencies"], 99)
+            }
+            for models, group in by_mix.items()
+        },
+        "total_cost": sum(r.get("cost", 0.0) for r in ok),
+        "completion_tokens": sum(r.get("completion_tokens", 0) for r in ok),
+        "event_loop_lag": monitor.summary(),
+        "memory_mb": {
+            "rss_start": rss_start,
+            "rss_end": rss_mb(),
+            "rss_max_sampled": max(monitor.rss_samples, default=None),
+            "peak_rss": peak_rss_mb()
+        }
+    }
+
+def scale_fake_latency(scale: float):
+    """Acelera (o frena) los perfiles simulados para pruebas rápidas"""
+    from app.llm.config import llm_config
+    for profile in llm_config.fake_profiles.values():
+        for key in ("latency_median", "timeout_seconds", "retry_after"):
+            if key in profile:
+                profile[key] *= scale
+        if profile.get("tokens_per_second"):
+            profile["tokens_per_second"] /= scale
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url) as client:
+            results = await run_load(client, args)
+            results["server_stats"] = (await client.get("/llm/stats")).json()
+            results["rate_limiter"] = (await client.get("/llm/pool")).json()["rate_limiter"]
+        return results
+
+    # En proceso: la app corre en el mismo event loop (lag y memoria son los del worker)
+    from main import app
+    if args.latency_scale != 1.0:
+        scale_fake_latency(args.latency_scale)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            results = await run_load(client, args)
+            results["server_stats"] = (await client.get("/llm/stats")).json()
+            results["rate_limiter"] = (await client.get("/llm/pool")).json()["rate_limiter"]
+    return results
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    latency = results["latency_seconds"]
+    lag = results["event_loop_lag"]
+    memory = results["memory_mb"]
+
+    def fmt(value: Optional[float], unit: str = "s") -> str:
+        return "-" if value is None else f"{value:.3f}{unit}"
+
+    print("\n📊 Resultados")
+    print(f"   Requests: {results['requests']} ({results['succeeded']} OK, {results['timed_out']} parciales por deadline)")
+    print(f"   Estados: {results['statuses']}")
+    print(f"   Throughput: {results['throughput_rps']:.2f} req/s (máx. {results['max_in_flight']} en curso)")
+    print(f"   Latencia: p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  p99 {fmt(latency['p99'])}  máx {fmt(latency['max'])}")
+    print(f"   Lag del event loop: p50 {lag['p50_ms']:.1f}ms  p99 {lag['p99_ms']:.1f}ms  máx {lag['max_ms']:.1f}ms")
+    print(f"   Memoria: RSS {fmt(memory['rss_start'], 'MB')} → {fmt(memory['rss_end'], 'MB')} (pico {memory['peak_rss']:.1f}MB)")
+    rate_limiter = results.get("rate_limiter")
+    if rate_limiter:
+        state = "activo" if rate_limiter["enabled"] else "desactivado"
+        print(f"   Limitador de tasa: {state} ({rate_limiter['delayed']} esperas, {rate_limiter['total_wait']:.1f}s en total)")
+
+    if baseline:
+        base = baseline["results"]
+        print(f"\n📐 Comparación con {baseline.get('commit') or 'baseline'}")
+        rows = [
+            ("throughput_rps", results["throughput_rps"], base["throughput_rps"]),
+            ("latency_p50", latency["p50"], base["latency_seconds"]["p50"]),
+            ("latency_p95", latency["p95"], base["latency_seconds"]["p95"]),
+            ("latency_p99", latency["p99"], base["latency_seconds"]["p99"]),
+            ("loop_lag_p99_ms", lag["p99_ms"], base["event_loop_lag"]["p99_ms"]),
+            ("peak_rss_mb", memory["peak_rss"], base["memory_mb"]["peak_rss"])
+        ]
+        for name, current, previous in rows:
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous * 100
+            print(f"   {name}: {previous:.3f} → {current:.3f} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de /summarization/compare")
+    parser.add_argument("--url", help="Servidor uvicorn a probar (por defecto, la app en el mismo proceso)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Llegadas por segundo (Poisson)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos lanzando requests")
+    parser.add_argument("--mix", default="fake-fast,fake-default:2;fake-fast,fake-slow:1;fake-default,fake-flaky:1",
+                        help="Grupos de modelos con peso: 'm1,m2:peso;m3,m4:peso'")
+    parser.add_argument("--sampling-mode", choices=["fixed", "adaptive"], default="fixed")
+    parser.add_argument("--text-chars", type=int, default=3000, help="Longitud de los textos")
+    parser.add_argument("--max-words", type=int, default=100)
+    parser.add_argument("--max-tokens", type=int, default=300)
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--deadline", type=float, help="deadline_seconds de cada comparación")
+    parser.add_argument("--request-timeout", type=float, default=600.0)
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplica la latencia de los perfiles simulados (solo en proceso)")
+    parser.add_argument("--real", action="store_true", help="No forzar FAKE_LLM (usa los proveedores reales)")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Mantener el limitador de tasa con el proveedor simulado (mide sus esperas, no la app)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto benchmarks/results/)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    # Antes de importar la app: GlobalConfig lee el entorno al crearse
+    if not args.real:
+        os.environ["FAKE_LLM"] = "true"
+        if not args.rate_limit:
+            # Las cuotas de los proveedores reales no aplican al simulador
+            os.environ["RATE_LIMIT_ENABLED"] = "false"
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)  # La app monta static/ y templates/ con rutas relativas
+
+    print(f"🚀 Prueba de carga: {args.rate} req/s durante {args.duration}s "
+          f"({'uvicorn ' + args.url if args.url else 'en proceso'}, {'proveedores reales' if args.real else 'proveedor simulado'})")
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    run_info = {
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "config": vars(args),
+        "results": results
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"load_{stamp}_{(run_info['commit'] or 'nocommit')[:8]}.json")
+    with open(output, "w") as f:
+        json.dump(run_info, f, indent=2, default=str)
+    print(f"\n💾 Resultados guardados en {output}")
+
+if __name__ == "__main__":
+    main()
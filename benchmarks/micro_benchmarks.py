@@ -0,0 +1,267 @@
+"""
+Micro-benchmarks de las rutas de CPU del evaluador y del servicio de resúmenes.
+
+Casi todo lo que se mide aquí corre dentro del event loop: si se vuelve
+lento, retrasa a todas las requests del worker. Las dos rutas más pesadas,
+evaluator.local_scoring y dedup.deduplicate, corren en el pool de hilos
+(blocking_executor): no bloquean el loop, y sus cifras son CPU de los hilos
+del pool, que limita el throughput de evaluación.
+
+Las entradas son realistas y determinísticas: textos de 10k caracteres,
+5 modelos y muchas muestras por modelo (resúmenes y respuestas del
+evaluador del proveedor simulado).
+
+El gate de regresiones es --baseline: cada benchmark se compara con una
+ejecución anterior en la misma máquina y falla si empeora más de
+--tolerance. Los techos absolutos (BUDGETS_MS) son solo un respaldo holgado
+para cuando no hay baseline. Sale con código 1 si algo empeora.
+
+Uso:
+    python -m benchmarks.micro_benchmarks
+    python -m benchmarks.micro_benchmarks --baseline benchmarks/results/micro_anterior.json
+    python -m benchmarks.micro_benchmarks --only parse --samples 48
+"""
+from typing import List, Dict, Any, Callable, Optional
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.load_test import RESULTS_DIR, build_text, git_commit
+
+# Techos absolutos por llamada (ms) con 10k caracteres, 5 modelos y 24 muestras por modelo.
+# No son el gate de regresiones (para eso está --baseline): solo atrapan un
+# cambio de orden de magnitud en cualquier máquina razonable. Cada uno es al
+# menos 5x el mínimo medido en la máquina de referencia, redondeado hacia
+# arriba, y nunca menor de 0.05ms (por debajo, el ruido de medida domina).
+BUDGETS_MS = {
+    "evaluator.parse_json": 2.5,
+    "evaluator.parse_text": 2.5,
+    "evaluator.calculate_similarity": 3.0,
+    "evaluator.calculate_consistency": 0.05,
+    "evaluator.generate_comparison_summary": 0.5,
+    "evaluator.local_scoring": 250.0,
+    "dedup.deduplicate": 400.0,
+    "service.calculate_average_length": 7.5,
+    "service.get_best_summary": 0.05,
+    "models.comparison_response_dump_json": 7.5,
+    "models.comparison_response_validate_json": 7.5
+}
+
+MODELS = ["fake-fast", "fake-default", "fake-slow", "fake-verbose", "fake-flaky"]
+
+def build_fixtures(samples: int, text_chars: int, seed: int) -> Dict[str, Any]:
+    """Texto, resúmenes, respuestas del evaluador y una ComparisonResponse completa"""
+    from app.llm.config import llm_config
+    from app.llm.fake import FakeProvider
+    from app.llm.models import LLMRequestConfig
+    from app.summarization.models import ModelSummaryResult, EvaluationScore, ComparisonResponse
+    from app.summarization.evaluator import SummarizationEvaluator
+
+    rng = random.Random(seed)
+    text = build_text(text_chars, rng)
+    max_words = 100
+    summaries = {
+        model: [FakeProvider._summary(text, max_words, llm_config.get_fake_profile(model), rng) for _ in range(samples)]
+        for model in MODELS
+    }
+    # Algunas muestras fallidas, como en una ejecución real
+    for model in MODELS:
+        summaries[model][-1] = f"Error: No se pudo generar resumen {samples}"
+
+    evaluator = SummarizationEvaluator()
+    profile = llm_config.get_fake_profile("fake-default")
+    valid = evaluator.filter_valid_summaries(summaries[MODELS[0]])
+    section = "\n\n".join(f"RESUMEN {i+1}:\n{summary}" for i, summary in enumerate(valid))
+    json_response = FakeProvider._evaluation(section, LLMRequestConfig(response_format="json"), profile, rng)
+    text_response = FakeProvider._evaluation(section, LLMRequestConfig(), profile, rng)
+
+    details = [{**result, "parsed": True, "reasks": 0}
+               for _, result in sorted(evaluator._parse_evaluation_response(json_response, len(valid)).items())]
+    local_scores = evaluator.local_scorer.score(text, valid, max_words)
+    results = []
+    evaluations = []
+    for model in MODELS:
+        results.append(ModelSummaryResult(
+            model=model,
+            summaries=summaries[model],
+            avg_length=95.0,
+            execution_time=3.2,
+            success_count=samples - 1,
+            prompt_tokens=samples * 800,
+            completion_tokens=samples * 140,
+            cost=0.01,
+            tokens_per_second=55.0
+        ))
+        scores = [d["precision"] + d["completeness"] + d["clarity"] for d in details]
+        evaluations.append(EvaluationScore(
+            model=model,
+            similarity_scores=scores,
+            average_score=sum(scores) / len(scores),
+            best_score=max(scores),
+            worst_score=min(scores),
+            consistency_score=evaluator._calculate_consistency(scores),
+            individual_summaries=evaluator.filter_valid_summaries(summaries[model]),
+            evaluation_details=details,
+            local_scores=local_scores
+        ))
+    response = ComparisonResponse(
+        original_text=text,
+        results=results,
+        evaluations=evaluations,
+        winner=MODELS[2],
+        best_summary=summaries[MODELS[2]][0],
+        total_execution_time=12.5,
+        models_tested=len(MODELS),
+        successful_evaluations=len(MODELS)
+    )
+    return {
+        "text": text,
+        "max_words": max_words,
+        "summaries": summaries,
+        "valid": valid,
+        "json_response": json_response,
+        "text_response": text_response,
+        "scores": [float(s) for s in evaluations[0].similarity_scores],
+        "results": results,
+        "evaluations": evaluations,
+        "response": response,
+        "response_json": response.model_dump_json()
+    }
+
+def build_benchmarks(fixtures: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    from app.summarization.evaluator import SummarizationEvaluator
+    from app.summarization.dedup import MinHashDeduplicator
+    from app.summarization.models import ComparisonResponse
+    from app.summarization.service import summarization_service
+
+    evaluator = SummarizationEvaluator()
+    deduplicator = MinHashDeduplicator()
+    text = fixtures["text"]
+    valid = fixtures["valid"]
+    all_summaries = [summary for model_summaries in fixtures["summaries"].values() for summary in model_summaries]
+    response = fixtures["response"]
+
+    return {
+        "evaluator.parse_json": lambda: evaluator._parse_evaluation_response(fixtures["json_response"], len(valid)),
+        "evaluator.parse_text": lambda: evaluator._parse_evaluation_response(fixtures["text_response"], len(valid)),
+        "evaluator.calculate_similarity": lambda: evaluator._calculate_similarity(text, valid[0]),
+        "evaluator.calculate_consistency": lambda: evaluator._calculate_consistency(fixtures["scores"]),
+        "evaluator.generate_comparison_summary": lambda: evaluator.generate_comparison_summary(fixtures["evaluations"]),
+        "evaluator.local_scoring": lambda: evaluator.local_scorer.score(text, valid, fixtures["max_words"]),
+        "dedup.deduplicate": lambda: deduplicator.deduplicate(valid),
+        "service.calculate_average_length": lambda: summarization_service._calculate_average_length(all_summaries),
+        "service.get_best_summary": lambda: summarization_service._get_best_summary(fixtures["results"], "ninguno"),
+        "models.comparison_response_dump_json": lambda: response.model_dump_json(),
+        "models.comparison_response_validate_json": lambda: ComparisonResponse.model_validate_json(fixtures["response_json"])
+    }
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    Ms por llamada: se calibra el número de llamadas por ronda para que dure
+    al menos min_time y se toman `repeat` rondas (el mínimo es el más estable).
+    """
+    func()  # Calentamiento (imports perezosos, caches de regex...)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return {
+        "min_ms": min(rounds) * 1000,
+        "median_ms": statistics.median(rounds) * 1000,
+        "max_ms": max(rounds) * 1000,
+        "calls_per_round": number
+    }
+
+def check_regressions(results: Dict[str, Dict[str, float]],
+                      baseline: Optional[Dict[str, Any]],
+                      tolerance: float) -> List[str]:
+    """Benchmarks más lentos que la baseline (+tolerance) o por encima de su techo absoluto"""
+    failures = []
+    for name, result in results.items():
+        budget = BUDGETS_MS.get(name)
+        if budget is not None and result["min_ms"] > budget:
+            failures.append(f"{name}: {result['min_ms']:.3f}ms supera el techo de {budget}ms")
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous and result["min_ms"] > previous["min_ms"] * (1 + tolerance):
+            change = (result["min_ms"] - previous["min_ms"]) / previous["min_ms"] * 100
+            failures.append(
+                f"{name}: {previous['min_ms']:.3f}ms → {result['min_ms']:.3f}ms "
+                f"(+{change:.0f}%, tolerancia {tolerance * 100:.0f}%)"
+            )
+    return failures
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de las rutas de CPU de summarization")
+    parser.add_argument("--samples", type=int, default=24, help="Muestras por modelo")
+    parser.add_argument("--text-chars", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas por benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos por ronda")
+    parser.add_argument("--only", help="Solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior en la misma máquina")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento permitido frente a la baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto benchmarks/results/)")
+    args = parser.parse_args()
+
+    fixtures = build_fixtures(args.samples, args.text_chars, args.seed)
+    benchmarks = build_benchmarks(fixtures)
+    if args.only:
+        benchmarks = {name: func for name, func in benchmarks.items() if args.only in name}
+
+    print(f"⏱️ Micro-benchmarks: {len(MODELS)} modelos × {args.samples} muestras, texto de {len(fixtures['text'])} caracteres")
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func in benchmarks.items():
+        results[name] = measure(func, args.repeat, args.min_time)
+        budget = BUDGETS_MS.get(name)
+        print(f"   {name:<45} {results[name]['min_ms']:>10.4f}ms  (mediana {results[name]['median_ms']:.4f}ms"
+              f"{f', techo {budget}ms' if budget is not None else ''})")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    run_info = {
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "config": vars(args),
+        "results": results
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"micro_{stamp}_{(run_info['commit'] or 'nocommit')[:8]}.json")
+    with open(output, "w") as f:
+        json.dump(run_info, f, indent=2)
+    print(f"💾 Resultados guardados en {output}")
+
+    failures = check_regressions(results, baseline, args.tolerance)
+    if failures:
+        print("\n❌ Regresiones de rendimiento:")
+        for failure in failures:
+            print(f"   {failure}")
+        return 1
+    print("\n✅ Sin regresiones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
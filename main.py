@@ -1,16 +1,40 @@
-from fastapi import FastAPI, Request
+import time
+_import_started = time.perf_counter()  # Para informar del tiempo de import de la app
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from app.config import settings
 from app.llm.router import router as llm_router
-from app.summarization.router import router as summarization_router
+from app.summarization.router import router as summarization_router, job_manager
+from app.llm.clients import client_registry
+from app.llm.executor import blocking_executor
+from app.metrics import render_metrics
+from app.tracing import span_exporter
+from app.llm.warmup import warmup_manager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida de la aplicación: recursos compartidos de larga duración"""
+    await job_manager.start()
+    # SDKs, clientes, catálogo y sondas en segundo plano: /ready indica cuándo terminan
+    warmup_manager.start()
+    yield
+    await warmup_manager.stop()
+    await job_manager.stop()
+    # Cerrar los pools HTTP de los proveedores y el ejecutor de trabajo síncrono
+    await client_registry.aclose()
+    blocking_executor.shutdown()
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # Configurar CORS para desarrollo
@@ -30,6 +54,8 @@ templates = Jinja2Templates(directory="templates")
 app.include_router(llm_router)
 app.include_router(summarization_router)
 
+warmup_manager.record_import_time(time.perf_counter() - _import_started)
+
 @app.get("/")
 async def dashboard(request: Request):
     """Dashboard principal"""
@@ -63,6 +89,31 @@ async def health_check():
         }
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 hasta que termina el warm-up del arranque (para balanceadores y orquestadores)"""
+    stats = warmup_manager.get_stats()
+    return JSONResponse(status_code=200 if stats["ready"] else 503, content=stats)
+
+@app.get("/metrics")
+async def metrics():
+    """Métricas en formato Prometheus (agregadas entre workers si hay PROMETHEUS_MULTIPROC_DIR)"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+@app.get("/traces")
+async def list_traces():
+    """Últimas trazas guardadas en este worker (exportador en memoria)"""
+    return {"traces": span_exporter.list_traces()}
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Árbol de spans y tiempos por etapa de una traza"""
+    trace = span_exporter.get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Traza no encontrada")
+    return trace
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
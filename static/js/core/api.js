@@ -90,6 +90,81 @@ class APIClient {
         return this.post('/summarization/compare', data);
     }
 
+    /**
+     * Summarization Module - Comparar resúmenes en streaming (SSE)
+     * Llama a onEvent(evento, datos) por cada evento recibido y
+     * retorna la ComparisonResponse final.
+     */
+    async compareSummariesStream(data, onEvent = () => {}) {
+        const response = await fetch(`${this.baseURL}/summarization/compare/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+            },
+            body: JSON.stringify(data),
+            signal: AbortSignal.timeout(this.timeout)
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let comparison = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Los eventos SSE se separan por una línea en blanco
+            let separator;
+            while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, separator);
+                buffer = buffer.slice(separator + 2);
+
+                const parsed = this.parseSSEEvent(rawEvent);
+                if (!parsed) continue; // Comentarios (ping)
+
+                if (parsed.event === 'error') {
+                    throw new Error(parsed.data.detail || 'Error en la comparación');
+                }
+                if (parsed.event === 'comparison') {
+                    comparison = parsed.data;
+                }
+                onEvent(parsed.event, parsed.data);
+            }
+        }
+
+        if (!comparison) {
+            throw new Error('El stream terminó sin resultado final');
+        }
+        return comparison;
+    }
+
+    /**
+     * Parsear un bloque de evento SSE ("event: x" + "data: {...}")
+     */
+    parseSSEEvent(rawEvent) {
+        let event = 'message';
+        const dataLines = [];
+
+        rawEvent.split('\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                event = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+
+        if (dataLines.length === 0) return null;
+        return { event, data: JSON.parse(dataLines.join('\n')) };
+    }
+
     /**
      * Summarization Module - Obtener configuración
      */
@@ -450,8 +450,16 @@ class SummarizationModule {
             console.log('🚀 Iniciando comparación:', request);
             console.log('⏱️ Timeout configurado:', apiClient.timeout / 1000, 'segundos');
 
-            // Llamar a la API con timeout personalizado
-            const result = await apiClient.compareSummaries(request);
+            // Llamar a la API en streaming para mostrar el progreso
+            const progress = {
+                samples: 0,
+                models: 0,
+                evaluations: 0,
+                totalModels: selectedModels.length
+            };
+            const result = await apiClient.compareSummariesStream(request, (event, data) => {
+                this.handleComparisonEvent(event, data, progress);
+            });
 
             // Actualizar estado con resultados
             stateManager.setSummarizationState({
@@ -485,6 +493,42 @@ class SummarizationModule {
         }
     }
 
+    /**
+     * Procesar un evento de progreso de la comparación en streaming
+     */
+    handleComparisonEvent(event, data, progress) {
+        if (event === 'sample') {
+            progress.samples += 1;
+        } else if (event === 'model_result') {
+            progress.models += 1;
+            console.log(`✅ Modelo ${data.model}: ${data.success_count} resúmenes (${data.execution_time.toFixed(1)}s)`);
+        } else if (event === 'evaluation') {
+            progress.evaluations += 1;
+            console.log(`🧪 Evaluación ${data.model}: ${data.average_score.toFixed(1)}/15`);
+        } else {
+            return;
+        }
+
+        this.updateComparisonProgress(progress);
+    }
+
+    /**
+     * Mostrar el progreso de la comparación en el botón
+     */
+    updateComparisonProgress(progress) {
+        const button = document.getElementById('compare-button');
+        if (!button || !button.disabled) return;
+
+        const label = button.querySelector('span');
+        if (!label) return;
+
+        if (progress.models < progress.totalModels) {
+            label.textContent = `Generating... ${progress.samples} summaries, ${progress.models}/${progress.totalModels} models done`;
+        } else {
+            label.textContent = `Evaluating... ${progress.evaluations}/${progress.totalModels} models evaluated`;
+        }
+    }
+
     /**
      * Actualizar botón de comparación
      */
@@ -666,10 +710,11 @@ class SummarizationModule {
         
         if (!winnerEval || !winnerResult) return;
 
-        // Calcular fortalezas del ganador
-        const avgPrecision = winnerEval.evaluation_details?.reduce((sum, d) => sum + (d.precision || 0), 0) / winnerEval.evaluation_details?.length || 0;
-        const avgCompleteness = winnerEval.evaluation_details?.reduce((sum, d) => sum + (d.completeness || 0), 0) / winnerEval.evaluation_details?.length || 0;
-        const avgClarity = winnerEval.evaluation_details?.reduce((sum, d) => sum + (d.clarity || 0), 0) / winnerEval.evaluation_details?.length || 0;
+        // Calcular fortalezas del ganador (solo evaluaciones parseadas)
+        const scoredDetails = (winnerEval.evaluation_details || []).filter(d => d.parsed !== false);
+        const avgPrecision = scoredDetails.reduce((sum, d) => sum + (d.precision || 0), 0) / scoredDetails.length || 0;
+        const avgCompleteness = scoredDetails.reduce((sum, d) => sum + (d.completeness || 0), 0) / scoredDetails.length || 0;
+        const avgClarity = scoredDetails.reduce((sum, d) => sum + (d.clarity || 0), 0) / scoredDetails.length || 0;
 
         const strengths = [];
         if (avgPrecision >= 4.5) strengths.push("Muy preciso");
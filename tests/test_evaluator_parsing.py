@@ -0,0 +1,194 @@
+"""
+Parser de las respuestas del evaluador y re-preguntas dirigidas.
+
+Las respuestas se generan con el proveedor simulado (mismo formato JSON o
+de texto que pide el prompt del evaluador) y se deforman a mano para los
+casos límite: JSON truncado, índices ausentes, puntuaciones fuera de rango.
+"""
+from typing import Any, Dict, List
+import asyncio
+import json
+import random
+
+import pytest
+
+from app.llm.config import llm_config
+from app.llm.fake import FakeProvider
+from app.llm.models import LLMRequestConfig
+from app.summarization.evaluator import SummarizationEvaluator
+
+SUMMARIES = [
+    "La inteligencia artificial transforma la industria europea.",
+    "Las empresas reducen costes con automatización y análisis de datos.",
+    "Los reguladores europeos preparan normas sobre sesgo y privacidad."
+]
+
+def _section(summaries: List[str]) -> str:
+    return "\n\n".join(f"RESUMEN {i+1}:\n{summary}" for i, summary in enumerate(summaries))
+
+def _fake_evaluation(summaries: List[str], json_mode: bool, **profile: Any) -> str:
+    """Respuesta del evaluador simulado para estos resúmenes"""
+    config = LLMRequestConfig(response_format="json" if json_mode else None)
+    return FakeProvider._evaluation(
+        _section(summaries), config, {**llm_config.get_fake_profile("fake-default"), **profile}, random.Random(0)
+    )
+
+@pytest.fixture
+def evaluator():
+    return SummarizationEvaluator()
+
+# ===== PARSER =====
+
+@pytest.mark.parametrize("json_mode", [True, False])
+def test_parses_fake_evaluator_output(evaluator, json_mode):
+    results = evaluator._parse_evaluation_response(_fake_evaluation(SUMMARIES, json_mode), len(SUMMARIES))
+
+    assert sorted(results) == [0, 1, 2]
+    for result in results.values():
+        assert set(result) == {"precision", "completeness", "clarity", "comment"}
+        assert all(1 <= result[field] <= 5 for field in ("precision", "completeness", "clarity"))
+        assert result["comment"] == "Evaluación simulada"
+
+def test_truncated_json_keeps_complete_objects(evaluator):
+    response = _fake_evaluation(SUMMARIES, json_mode=True)
+    truncated = response[:response.rindex('{"resumen": 3') + 20]
+
+    assert sorted(evaluator._parse_evaluation_response(truncated, len(SUMMARIES))) == [0, 1]
+
+def test_json_inside_code_block(evaluator):
+    response = f"Aquí tienes la evaluación:\n```json\n{_fake_evaluation(SUMMARIES, json_mode=True)}\n```"
+
+    assert sorted(evaluator._parse_evaluation_response(response, len(SUMMARIES))) == [0, 1, 2]
+
+def test_missing_index_uses_position(evaluator):
+    evaluations = [
+        {"precision": 4, "completitud": 3, "claridad": 5},
+        {"precision": 2, "completitud": 2, "claridad": 2}
+    ]
+    results = evaluator._parse_evaluation_response(json.dumps({"evaluaciones": evaluations}), 2)
+
+    assert results[0]["precision"] == 4
+    assert results[1]["clarity"] == 2
+
+def test_english_keys_and_string_scores(evaluator):
+    response = json.dumps([{"summary": 1, "precision": "4/5", "completeness": "3", "clarity": 5.0, "comment": " ok "}])
+
+    assert evaluator._parse_evaluation_response(response, 1) == {
+        0: {"precision": 4, "completeness": 3, "clarity": 5, "comment": "ok"}
+    }
+
+def test_out_of_range_scores_are_clamped(evaluator):
+    response = json.dumps({"evaluaciones": [{"resumen": 1, "precision": 9, "completitud": 0, "claridad": -3}]})
+
+    result = evaluator._parse_evaluation_response(response, 1)[0]
+    assert (result["precision"], result["completeness"], result["clarity"]) == (5, 1, 1)
+
+def test_rejects_missing_or_non_numeric_scores(evaluator):
+    evaluations = [
+        {"resumen": 1, "precision": 4, "completitud": 4},
+        {"resumen": 2, "precision": "alta", "completitud": 4, "claridad": 4},
+        {"resumen": 3, "precision": True, "completitud": 4, "claridad": 4}
+    ]
+
+    assert evaluator._parse_evaluation_response(json.dumps({"evaluaciones": evaluations}), 3) == {}
+
+def test_out_of_range_and_duplicate_indices_are_ignored(evaluator):
+    evaluations = [
+        {"resumen": 4, "precision": 5, "completitud": 5, "claridad": 5},
+        {"resumen": 1, "precision": 3, "completitud": 3, "claridad": 3},
+        {"resumen": 1, "precision": 5, "completitud": 5, "claridad": 5}
+    ]
+    results = evaluator._parse_evaluation_response(json.dumps({"evaluaciones": evaluations}), 2)
+
+    assert list(results) == [0]
+    assert results[0]["precision"] == 3
+
+def test_text_fallback_with_markdown(evaluator):
+    response = (
+        "**RESUMEN #2**\n- **Claridad**: 5\n- Precisión = 4/5\n- COMPLETITUD: 3\n- Comentario: Bien\n\n"
+        "RESUMEN 1:\nPRECISION: 2\nCOMPLETITUD: 2\n"
+    )
+    results = evaluator._parse_evaluation_response(response, 2)
+
+    assert list(results) == [1]
+    assert results[1] == {"precision": 4, "completeness": 3, "clarity": 5, "comment": "Bien"}
+
+def test_unparseable_response(evaluator):
+    assert evaluator._parse_evaluation_response("No puedo evaluar estos resúmenes.", 3) == {}
+
+# ===== RE-PREGUNTAS =====
+
+class ScriptedLLM:
+    """generate_text con respuestas del evaluador simulado, deformadas por `script`"""
+
+    def __init__(self, script: List[Any]):
+        self.script = list(script)
+        self.prompts: List[str] = []
+
+    async def generate_text(self, prompt: str, model: str, config: Dict[str, Any]) -> str:
+        self.prompts.append(prompt)
+        step = self.script.pop(0)
+        if isinstance(step, BaseException):
+            raise step
+        summaries = [s for s in SUMMARIES if s in prompt]
+        response = _fake_evaluation(summaries, config.get("response_format") == "json")
+        return step(response) if callable(step) else response
+
+def _drop_last_json_evaluation(response: str) -> str:
+    data = json.loads(response)
+    data["evaluaciones"].pop()
+    return json.dumps(data)
+
+def _evaluate(evaluator, script: List[Any]) -> List[Dict[str, Any]]:
+    evaluator.llm_service = ScriptedLLM(script)
+    return asyncio.run(evaluator._evaluate_summaries_simple("Texto original.", SUMMARIES, "fake-default"))
+
+def test_reask_only_unparsed_summaries(evaluator, monkeypatch):
+    monkeypatch.setattr(evaluator.config, "evaluation_max_reasks", 1)
+    results = _evaluate(evaluator, [_drop_last_json_evaluation, None])
+
+    assert [r["parsed"] for r in results] == [True, True, True]
+    assert all(r["reasks"] == 1 for r in results)
+    # La re-pregunta solo incluye el resumen sin parsear, renumerado como RESUMEN 1
+    reask_prompt = evaluator.llm_service.prompts[1]
+    assert SUMMARIES[2] in reask_prompt and SUMMARIES[0] not in reask_prompt
+    assert evaluator.get_stats()["summaries_requested"] == 3
+    assert evaluator.parsed_first_try == 2
+    assert evaluator.reasked_summaries == 1
+    assert evaluator.parse_failures == 0
+
+def test_unparsed_after_reasks_are_marked_without_scores(evaluator, monkeypatch):
+    monkeypatch.setattr(evaluator.config, "evaluation_max_reasks", 2)
+    results = _evaluate(evaluator, [_drop_last_json_evaluation, lambda _: "sin formato", lambda _: "sin formato"])
+
+    assert [r["parsed"] for r in results] == [True, True, False]
+    assert results[2]["precision"] is None
+    assert evaluator.reasks == 2
+    assert evaluator.parse_failures == 1
+
+def test_evaluator_error_stops_reasking(evaluator, monkeypatch):
+    monkeypatch.setattr(evaluator.config, "evaluation_max_reasks", 1)
+    results = _evaluate(evaluator, [ValueError("proveedor caído")])
+
+    assert not any(r["parsed"] for r in results)
+    assert len(evaluator.llm_service.prompts) == 1
+    assert evaluator.parse_failures == 3
+
+def test_deadline_before_any_answer_is_not_counted(evaluator, monkeypatch):
+    monkeypatch.setattr(evaluator.config, "evaluation_max_reasks", 1)
+    with pytest.raises(asyncio.TimeoutError):
+        _evaluate(evaluator, [asyncio.TimeoutError()])
+
+    stats = evaluator.get_stats()
+    assert stats["summaries_requested"] == 0
+    assert stats["parse_failures"] == 0
+
+def test_deadline_during_reask_counts_as_parse_failure(evaluator, monkeypatch):
+    monkeypatch.setattr(evaluator.config, "evaluation_max_reasks", 1)
+    with pytest.raises(asyncio.TimeoutError):
+        _evaluate(evaluator, [_drop_last_json_evaluation, asyncio.TimeoutError()])
+
+    stats = evaluator.get_stats()
+    assert stats["summaries_requested"] == 3
+    assert stats["parsed_first_try"] == 2
+    assert stats["parse_failures"] == 1
@@ -0,0 +1,89 @@
+"""
+Con FAKE_LLM=true los modelos de proveedores reales van al simulador y
+deben contarse como proveedor "fake": sin cuota del limitador compartido,
+sin coste y con las métricas y el planificador del simulador. Los errores
+simulados son transitorios también con temperatura 0.
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.llm.config import llm_config
+from app.llm.fake import FakeProvider, FakeProviderError
+from app.llm.models import LLMRequestConfig
+from app.llm.ratelimit import RateLimiter
+from app.llm.service import LLMService
+
+@pytest.fixture
+def fake_service(monkeypatch, tmp_path):
+    """LLMService con FAKE_LLM=true, simulador sin esperas y limitador activo en una BD temporal"""
+    monkeypatch.setattr(settings, "fake_llm", True)
+    monkeypatch.setitem(llm_config.fake_profiles, "default", {
+        **llm_config.fake_profiles["default"], "latency_median": 0.0, "tokens_per_second": 0.0
+    })
+    monkeypatch.setattr(llm_config, "rate_limit_enabled", True)
+    monkeypatch.setattr(llm_config, "rate_limit_db_path", str(tmp_path / "rate_limits.sqlite3"))
+
+    service = LLMService()
+    service.rate_limiter = RateLimiter(llm_config)
+    return service
+
+def test_real_model_names_are_routed_as_fake(fake_service):
+    assert fake_service._get_provider_from_model("gpt-3.5-turbo") == "fake"
+    assert fake_service._get_provider_from_model("claude-3-haiku-20240307") == "fake"
+
+def test_simulated_calls_skip_rate_limiter_and_cost(fake_service, tmp_path):
+    response = asyncio.run(fake_service.generate("Texto de prueba.", "gpt-3.5-turbo", {"max_tokens": 50}))
+
+    assert response.text
+    assert response.cost == 0.0
+    assert fake_service.call_stats.recent[-1].provider == "fake"
+    assert fake_service.rate_limiter.acquisitions == 0
+    assert not (tmp_path / "rate_limits.sqlite3").exists()
+
+def test_simulated_streams_skip_rate_limiter_and_cost(fake_service):
+    async def consume():
+        stream = fake_service.stream_text("Texto de prueba.", "gpt-3.5-turbo", {"max_tokens": 50})
+        return "".join([chunk async for chunk in stream])
+
+    assert asyncio.run(consume())
+    assert fake_service.rate_limiter.acquisitions == 0
+    record = fake_service.call_stats.recent[-1]
+    assert record.streamed and record.success
+    assert record.provider == "fake"
+    assert record.cost == 0.0
+
+def test_rate_limit_at_temperature_zero_is_transient(monkeypatch):
+    """Un 429 con temperatura 0 no se repite en cada reintento; el texto sí es el mismo"""
+    monkeypatch.setitem(llm_config.fake_profiles, "test-429", {
+        "latency_median": 0.0, "tokens_per_second": 0.0, "rate_limit_rate": 0.3
+    })
+    provider = FakeProvider(llm_config)
+    config = LLMRequestConfig(temperature=0.0, max_tokens=50)
+
+    async def attempts(prompt: str, count: int):
+        outcomes = []
+        for _ in range(count):
+            try:
+                outcomes.append((await provider.complete("fake-test-429", prompt, config))[0])
+            except FakeProviderError as e:
+                assert e.status_code == 429
+                outcomes.append(None)
+        return outcomes
+
+    async def first_failing_prompt():
+        for i in range(100):
+            prompt = f"Texto de prueba número {i}."
+            if (await attempts(prompt, 1))[0] is None:
+                return prompt
+        raise AssertionError("ninguna llamada recibió un 429")
+
+    async def scenario():
+        prompt = await first_failing_prompt()
+        return await attempts(prompt, 6)
+
+    outcomes = asyncio.run(scenario())
+    texts = [text for text in outcomes if text is not None]
+    assert texts, "el 429 se repite en todos los reintentos"
+    assert len(set(texts)) == 1
@@ -0,0 +1,128 @@
+"""
+Regresión: las llamadas a Google no deben bloquear el event loop.
+
+Se sustituye google.generativeai por un SDK falso cuyas partes síncronas
+(configure, list_models, generate_content) bloquean el hilo, y se mide el
+lag del loop mientras corren _call_google_model y el refresco del catálogo.
+"""
+from typing import List
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+from app.config import settings
+from app.llm.catalog import ModelCatalog
+from app.llm.clients import ProviderClientRegistry
+from app.llm.models import LLMRequestConfig
+from app.llm.service import LLMService
+
+BLOCK_SECONDS = 0.2  # Lo que tarda cada llamada síncrona del SDK falso
+MAX_LAG_SECONDS = 0.05  # Lag máximo tolerado (muy por debajo de BLOCK_SECONDS)
+
+def _blocking_sdk() -> types.ModuleType:
+    """Módulo con la forma de google.generativeai y llamadas síncronas lentas"""
+    genai = types.ModuleType("google.generativeai")
+
+    def configure(api_key=None):
+        time.sleep(BLOCK_SECONDS)
+
+    def list_models():
+        time.sleep(BLOCK_SECONDS)
+        for name in ("gemini-1.5-flash", "gemini-1.5-pro"):
+            yield types.SimpleNamespace(name=f"models/{name}", supported_generation_methods=["generateContent"])
+
+    class GenerationConfig:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+    class GenerativeModel:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+        def _response(self, prompt):
+            usage = types.SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=3)
+            return types.SimpleNamespace(text=f"Respuesta de {self.model_name}", usage_metadata=usage, parts=[1])
+
+        def generate_content(self, prompt, generation_config=None, stream=False):
+            time.sleep(BLOCK_SECONDS)
+            return self._response(prompt)
+
+        async def generate_content_async(self, prompt, generation_config=None, stream=False):
+            # Como el SDK real (gRPC asyncio): espera sin bloquear el hilo
+            await asyncio.sleep(BLOCK_SECONDS)
+            return self._response(prompt)
+
+    genai.configure = configure
+    genai.list_models = list_models
+    genai.GenerativeModel = GenerativeModel
+    genai.types = types.SimpleNamespace(GenerationConfig=GenerationConfig)
+    return genai
+
+async def _max_loop_lag(work, interval: float = 0.005) -> float:
+    """Lanza work() y mide el mayor retraso de un sleep corto mientras dura"""
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    task = asyncio.ensure_future(work())
+    while not task.done():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+    await task
+    return max(lags, default=0.0)
+
+@pytest.fixture
+def google_service(monkeypatch):
+    """LLMService con Google como único proveedor y el SDK bloqueante"""
+    genai = _blocking_sdk()
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    if "google" in sys.modules:
+        monkeypatch.setattr(sys.modules["google"], "generativeai", genai, raising=False)
+    monkeypatch.setattr(settings, "openai_api_key", None)
+    monkeypatch.setattr(settings, "anthropic_api_key", None)
+    monkeypatch.setattr(settings, "google_api_key", "test-key")
+    monkeypatch.setattr(settings, "fake_llm", False)
+
+    service = LLMService()
+    service.clients = ProviderClientRegistry()
+    service.catalog = ModelCatalog(service._discover_models)
+    return service
+
+def test_probe_detects_blocking_calls():
+    """Control: el probe sí detecta un SDK llamado directamente en el loop"""
+    genai = _blocking_sdk()
+
+    async def blocking():
+        await asyncio.sleep(0.02)
+        list(genai.list_models())
+
+    lag = asyncio.run(_max_loop_lag(blocking))
+    assert lag >= BLOCK_SECONDS * 0.8
+
+def test_google_generation_does_not_block_loop(google_service):
+    """Primera llamada: import/configure, refresco del catálogo y generación"""
+    config = LLMRequestConfig(max_tokens=50)
+
+    async def work():
+        responses = await asyncio.gather(*[
+            google_service._call_google_model("gemini-pro", f"Texto {i}", config) for i in range(3)
+        ])
+        # Alias de modelo retirado resuelto desde el catálogo
+        assert all(response.model == "gemini-1.5-flash" for response in responses)
+
+    lag = asyncio.run(_max_loop_lag(work))
+    assert lag < MAX_LAG_SECONDS, f"Lag del event loop de {lag * 1000:.1f}ms durante llamadas a Google"
+
+def test_catalog_refresh_does_not_block_loop(google_service):
+    """Refresco del catálogo con list_models paginado y síncrono"""
+
+    async def work():
+        await google_service.catalog.refresh(wait=True)
+        assert await google_service.catalog.get_provider_models("google") == ["gemini-1.5-flash", "gemini-1.5-pro"]
+        google_service.catalog.invalidate()
+        await google_service.get_available_models()
+
+    lag = asyncio.run(_max_loop_lag(work))
+    assert lag < MAX_LAG_SECONDS, f"Lag del event loop de {lag * 1000:.1f}ms durante el refresco del catálogo"
@@ -0,0 +1,239 @@
+"""
+Clasificación de errores de los SDKs y calendario de reintentos.
+
+Los errores se construyen con las clases reales de cada SDK (y con el
+simulado, que imita sus atributos); las esperas se registran en vez de
+dormir, así el test no depende del reloj.
+"""
+from typing import List
+import asyncio
+import time
+import types
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import anthropic
+import httpx
+import openai
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.config import settings
+from app.llm import retry
+from app.llm.fake import FakeProviderError, FakeTimeoutError
+from app.llm.retry import RATE_LIMIT, OVERLOAD, TIMEOUT, FATAL, RetryPolicy, classify_error, get_retry_after
+from app.llm.stats import CallRecord
+
+_REQUEST = httpx.Request("POST", "https://api.example.com/v1/chat")
+
+def _response(status: int, headers=None) -> httpx.Response:
+    return httpx.Response(status, headers=headers or {}, request=_REQUEST)
+
+def _openai_error(cls, status: int, headers=None, body=None):
+    return cls("error", response=_response(status, headers), body=body)
+
+def _anthropic_error(cls, status: int, headers=None):
+    return cls("error", response=_response(status, headers), body=None)
+
+def _wrapped(error: Exception) -> ValueError:
+    """Como lo relanzan los _call_* del LLMService"""
+    try:
+        raise ValueError(f"Error llamando al proveedor: {error}") from error
+    except ValueError as wrapped:
+        return wrapped
+
+# ===== CLASIFICACIÓN =====
+
+@pytest.mark.parametrize("provider, error, expected", [
+    ("openai", _openai_error(openai.RateLimitError, 429), RATE_LIMIT),
+    ("openai", _openai_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"}), FATAL),
+    ("openai", _openai_error(openai.InternalServerError, 503), OVERLOAD),
+    ("openai", _openai_error(openai.InternalServerError, 500), OVERLOAD),
+    ("openai", _openai_error(openai.AuthenticationError, 401), FATAL),
+    ("openai", _openai_error(openai.BadRequestError, 400), FATAL),
+    ("openai", openai.APITimeoutError(request=_REQUEST), TIMEOUT),
+    ("openai", openai.APIConnectionError(request=_REQUEST), TIMEOUT),
+    ("anthropic", _anthropic_error(anthropic.RateLimitError, 429), RATE_LIMIT),
+    ("anthropic", _anthropic_error(anthropic.InternalServerError, 529), OVERLOAD),
+    ("anthropic", _anthropic_error(anthropic.NotFoundError, 404), FATAL),
+    ("anthropic", anthropic.APITimeoutError(request=_REQUEST), TIMEOUT),
+    ("google", google_exceptions.ResourceExhausted("cuota"), RATE_LIMIT),
+    ("google", google_exceptions.ServiceUnavailable("no disponible"), OVERLOAD),
+    ("google", google_exceptions.InternalServerError("interno"), OVERLOAD),
+    ("google", google_exceptions.DeadlineExceeded("plazo"), TIMEOUT),
+    ("google", google_exceptions.InvalidArgument("argumento"), FATAL),
+    ("fake", FakeProviderError("simulado", 429), RATE_LIMIT),
+    ("fake", FakeProviderError("simulado", 503), OVERLOAD),
+    ("fake", FakeTimeoutError("simulado"), TIMEOUT),
+    ("openai", asyncio.TimeoutError(), TIMEOUT),
+    ("openai", ValueError("Modelo no reconocido"), FATAL),
+])
+def test_classify_error(provider, error, expected):
+    assert classify_error(provider, error) == expected
+
+def test_classify_error_follows_wrapped_cause():
+    error = _wrapped(_anthropic_error(anthropic.RateLimitError, 429))
+
+    assert classify_error("anthropic", error) == RATE_LIMIT
+
+def test_retry_after_headers():
+    assert get_retry_after(_openai_error(openai.RateLimitError, 429, {"retry-after": "7"})) == 7.0
+    # retry-after-ms tiene prioridad (OpenAI)
+    assert get_retry_after(_openai_error(openai.RateLimitError, 429, {"retry-after-ms": "1500", "retry-after": "7"})) == 1.5
+    assert get_retry_after(_wrapped(_anthropic_error(anthropic.RateLimitError, 429, {"retry-after": "3"}))) == 3.0
+    assert get_retry_after(_openai_error(openai.RateLimitError, 429)) is None
+    assert get_retry_after(_openai_error(openai.RateLimitError, 429, {"retry-after": "pronto"})) is None
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    retry_after = get_retry_after(_openai_error(openai.RateLimitError, 429, {"retry-after": format_datetime(when, usegmt=True)}))
+
+    assert 25 <= retry_after <= 31
+
+# ===== CALENDARIO DE REINTENTOS =====
+
+@pytest.fixture
+def sleeps(monkeypatch) -> List[float]:
+    """
+    Esperas entre reintentos (registradas, sin dormir) y jitter en su máximo.
+    El reloj de retry avanza lo que se habría dormido, para los deadlines.
+    """
+    recorded: List[float] = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    def monotonic():
+        return time.monotonic() + sum(recorded)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(retry, "time", types.SimpleNamespace(monotonic=monotonic, time=time.time))
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(settings, "max_retries", 3)
+    monkeypatch.setattr(settings, "retry_delay", 1.0)
+    monkeypatch.setattr(settings, "request_timeout", 60)
+    return recorded
+
+def _failing(*errors: Exception, result: str = "ok"):
+    """Función que lanza los errores en orden y después retorna result"""
+    calls = []
+
+    async def func():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    func.calls = calls
+    return func
+
+def _run(policy: RetryPolicy, func, provider: str = "openai", record=None, deadline=None):
+    return asyncio.run(policy.run(func, provider, record, deadline))
+
+def test_exponential_backoff_until_success(sleeps):
+    error = _openai_error(openai.InternalServerError, 503)
+    func = _failing(error, error, error)
+    record = CallRecord("gpt-4o-mini", "openai")
+
+    assert _run(RetryPolicy(), func, record=record) == "ok"
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert record.retries == 3
+    assert record.error_class == OVERLOAD
+
+def test_backoff_jitter_and_cap(monkeypatch):
+    policy = RetryPolicy()
+    monkeypatch.setattr(settings, "retry_delay", 1.0)
+    monkeypatch.setattr(policy.config, "max_retry_delay", 5.0)
+    monkeypatch.setattr(policy.config, "exponential_backoff", True)
+
+    # Equal jitter: entre la mitad y el total de la espera, con tope max_retry_delay
+    for retry_number, full in ((0, 1.0), (2, 4.0), (6, 5.0)):
+        for _ in range(20):
+            assert full / 2 <= policy.backoff_delay(retry_number) <= full
+
+    monkeypatch.setattr(policy.config, "exponential_backoff", False)
+    assert policy.backoff_delay(4) <= 1.0
+
+def test_gives_up_after_max_retries(sleeps):
+    error = _anthropic_error(anthropic.RateLimitError, 429)
+    func = _failing(*[error] * 5)
+
+    with pytest.raises(anthropic.RateLimitError):
+        _run(RetryPolicy(), func, provider="anthropic")
+    assert len(func.calls) == settings.max_retries + 1
+    assert sleeps == [1.0, 2.0, 4.0]
+
+def test_fatal_errors_are_not_retried(sleeps):
+    func = _failing(_wrapped(_openai_error(openai.AuthenticationError, 401)))
+
+    with pytest.raises(ValueError):
+        _run(RetryPolicy(), func)
+    assert len(func.calls) == 1
+    assert sleeps == []
+
+def test_insufficient_quota_is_not_retried(sleeps):
+    func = _failing(_openai_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"}))
+
+    with pytest.raises(openai.RateLimitError):
+        _run(RetryPolicy(), func)
+    assert sleeps == []
+
+def test_retry_flags(sleeps, monkeypatch):
+    policy = RetryPolicy()
+    monkeypatch.setattr(policy.config, "retry_on_rate_limit", False)
+    func = _failing(google_exceptions.ResourceExhausted("cuota"))
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        _run(policy, func, provider="google")
+    assert sleeps == []
+
+    monkeypatch.setattr(policy.config, "retry_on_timeout", False)
+    with pytest.raises(google_exceptions.DeadlineExceeded):
+        _run(policy, _failing(google_exceptions.DeadlineExceeded("plazo")), provider="google")
+    assert sleeps == []
+
+def test_retry_after_extends_backoff(sleeps):
+    func = _failing(_wrapped(_openai_error(openai.RateLimitError, 429, {"retry-after": "10"})))
+
+    assert _run(RetryPolicy(), func) == "ok"
+    assert sleeps == [10.0]
+
+def test_retry_after_shorter_than_backoff_is_ignored(sleeps):
+    error = _openai_error(openai.RateLimitError, 429, {"retry-after-ms": "100"})
+
+    assert _run(RetryPolicy(), _failing(error, error)) == "ok"
+    assert sleeps == [1.0, 2.0]
+
+def test_no_retry_when_wait_passes_deadline(sleeps):
+    func = _failing(_openai_error(openai.RateLimitError, 429, {"retry-after": "30"}))
+
+    with pytest.raises(openai.RateLimitError):
+        _run(RetryPolicy(), func, deadline=time.monotonic() + 5)
+    assert len(func.calls) == 1
+    assert sleeps == []
+
+def test_request_timeout_caps_total_time(sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "request_timeout", 2.5)
+    error = _openai_error(openai.InternalServerError, 503)
+    func = _failing(error, error, error)
+
+    # La espera de 1s cabe en los 2.5s; tras ella, la de 2s ya no
+    with pytest.raises(openai.InternalServerError):
+        _run(RetryPolicy(), func)
+    assert sleeps == [1.0]
+
+def test_expired_deadline_raises_timeout_without_calling(sleeps):
+    func = _failing()
+
+    with pytest.raises(asyncio.TimeoutError):
+        _run(RetryPolicy(), func, deadline=time.monotonic() - 1)
+    assert func.calls == []
+
+def test_slow_attempt_is_cut_at_deadline():
+    async def slow():
+        await asyncio.sleep(5)
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        _run(RetryPolicy(), slow, deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - start < 1
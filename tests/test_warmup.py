@@ -0,0 +1,74 @@
+"""
+El warm-up siempre termina marcando el worker como listo: /ready no puede
+quedarse en 503 aunque falle algo fuera de los pasos individuales.
+"""
+import asyncio
+import types
+
+from app.llm.config import llm_config
+from app.llm.warmup import WarmupManager
+
+class _Service:
+    """LLMService mínimo: sin proveedores reales, catálogo configurable"""
+
+    def __init__(self, providers=None, catalog_error=None):
+        self.providers = providers
+        self.catalog_error = catalog_error
+
+    def get_available_providers(self):
+        if self.providers is None:
+            raise RuntimeError("configuración de proveedores corrupta")
+        return self.providers
+
+    async def get_available_models(self):
+        if self.catalog_error:
+            raise self.catalog_error
+        return ["fake-instant"]
+
+def _manager(service) -> WarmupManager:
+    config = types.SimpleNamespace(**{**vars(llm_config), "warmup_enabled": True, "warmup_probe_enabled": False})
+    return WarmupManager(config=config, service=service)
+
+def test_ready_after_successful_warmup():
+    manager = _manager(_Service(providers=["fake"]))
+    asyncio.run(manager.run())
+
+    stats = manager.get_stats()
+    assert stats["ready"]
+    assert stats["steps"]["catalog"]["ok"]
+    assert stats["error"] is None
+
+def test_failed_step_does_not_block_readiness():
+    manager = _manager(_Service(providers=["fake"], catalog_error=ValueError("sin red")))
+    asyncio.run(manager.run())
+
+    stats = manager.get_stats()
+    assert stats["ready"]
+    assert stats["steps"]["catalog"] == {"ok": False, "seconds": stats["steps"]["catalog"]["seconds"], "error": "sin red"}
+
+def test_error_outside_steps_still_sets_ready(capsys):
+    manager = _manager(_Service(providers=None))
+    asyncio.run(manager.run())
+
+    stats = manager.get_stats()
+    assert stats["ready"]
+    assert stats["startup_seconds"] is not None
+    assert "configuración de proveedores corrupta" in stats["error"]
+    assert "Warm-up interrumpido" in capsys.readouterr().out
+
+def test_hung_step_times_out(monkeypatch):
+    manager = _manager(_Service(providers=["openai"]))
+    manager.config.warmup_timeout = 0.05
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(manager, "_build_client", hang)
+    asyncio.run(manager.run())
+
+    stats = manager.get_stats()
+    assert stats["ready"]
+    assert stats["startup_seconds"] < 5
+    assert stats["steps"]["client:openai"]["ok"] is False
+    assert "sin terminar" in stats["steps"]["client:openai"]["error"]
+    assert stats["steps"]["catalog"]["ok"]